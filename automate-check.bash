@@ -595,8 +595,9 @@ enable-i2c-all-services(){
   systemctl enable i2c_channel.service
   echo "systemctl enable custom-startup.service"
   systemctl enable custom-startup.service
-  echo "systemctl enable postcode.service"
-  systemctl enable postcode.service
+  # Post-codes are captured by kvmd itself, serialfile must not hold /dev/ttyAMA0
+  echo "systemctl disable postcode.service"
+  systemctl disable postcode.service
   echo "systemctl enable postcodelogs.service"
   systemctl enable postcodelogs.service
   echo "systemctl enable postcodelogs.timer"
@@ -609,8 +610,8 @@ enable-i2c-all-services(){
   systemctl start i2c_channel.service
   echo "systemctl start custom-startup.service"
   systemctl start custom-startup.service
-  echo "systemctl start postcode.service"
-  systemctl start postcode.service
+  echo "systemctl stop postcode.service"
+  systemctl stop postcode.service
   echo "systemctl start postcodelogs.service"
   systemctl start postcodelogs.service
   echo "systemctl start postcodelogs.timer"
@@ -789,9 +790,11 @@ atx-custom-mux-startupfile(){
   
   cp /usr/local/bin/kvm-files-bck/i2c_channel.service .
   cp /usr/local/bin/kvm-files-bck/custom-startup.service .
-  cp /usr/local/bin/kvm-files-bck/select_mux.service .
+  # The mux channel is managed by kvmd itself, select_mux is not needed anymore
+  systemctl disable --now select_mux.service 2>/dev/null || true
+  rm -f select_mux.service
   
-  echo " i2c service file,custom startup and select_mux file uploaded"
+  echo " i2c service file and custom startup file uploaded"
 }
 
 postcode-files(){
@@ -807,8 +810,8 @@ upload-i2c-acm-ncm-mux-file(){
   cp /usr/local/bin/kvm-files-bck/i2c_channel_set.py .
   cp /usr/local/bin/kvm-files-bck/enable_acm.sh .
   cp /usr/local/bin/kvm-files-bck/enable_ncm.sh .
-  cp /usr/local/bin/kvm-files-bck/select_mux.py .
-  echo " i2c python file and acm,ncm,select_mux file uploaded"
+  rm -f select_mux.py
+  echo " i2c python file and acm,ncm file uploaded"
 }
 
 
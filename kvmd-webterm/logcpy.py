@@ -1,45 +1,96 @@
 import os
+import re
+import json
+import argparse
 from datetime import datetime, timedelta
 
-def delete_old_logs(archived_file_path):
-    current_date = datetime.now().date()
-    one_day_ago = current_date - timedelta(days=1)
+# The archive is a directory of day segments: postcodes-YYYY-MM-DD.log.
+# Each line is "YYYY-MM-DD HH:MM:SS --- <post-code line>", where the time is the copy time.
+# KVMD reads the same layout for /postcode/get_logs, so keep them in sync.
+SEGMENT_PREFIX = 'postcodes-'
+SEGMENT_SUFFIX = '.log'
+SEGMENT_RE = re.compile(r'^postcodes-(\d{4}-\d{2}-\d{2})\.log$')
+CHECKPOINT_NAME = 'checkpoint.json'
 
-    # Read existing logs and filter out old logs
-    with open(archived_file_path, 'r',encoding='utf-8', errors='ignore') as archived_file:
-        lines = archived_file.readlines()
 
-    with open(archived_file_path, 'w') as archived_file:
-        for line in lines:
-            # Extract the date from the log line
-            date_str = line.split(' --- ')[0]
-            log_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+def load_checkpoint(checkpoint_path):
+    try:
+        with open(checkpoint_path, 'r') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        return (int(checkpoint['dev']), int(checkpoint['ino']), int(checkpoint['offset']))
+    except (IOError, ValueError, KeyError, TypeError):
+        return (0, 0, 0)
 
-            # Write back logs that are not older than one day
-            if log_date >= one_day_ago:
-                archived_file.write(line)
 
-def run(source_file_path, destination_file_path):
-    try:
-        with open(source_file_path, 'r', encoding='utf-8', errors='ignore') as source_file:
-            lines = source_file.readlines()  # Read all lines from the source file
+def save_checkpoint(checkpoint_path, dev, ino, offset):
+    # Atomic replace, so a crash never leaves a broken checkpoint
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as checkpoint_file:
+        json.dump({'dev': dev, 'ino': ino, 'offset': offset}, checkpoint_file)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def copy_new_lines(source_file_path, archive_dir_path, now):
+    checkpoint_path = os.path.join(archive_dir_path, CHECKPOINT_NAME)
+    (dev, ino, offset) = load_checkpoint(checkpoint_path)
+
+    st = os.stat(source_file_path)
+    if (st.st_dev, st.st_ino) != (dev, ino) or st.st_size < offset:
+        # The log was recreated or truncated, start from the beginning
+        offset = 0
+    if st.st_size == offset:
+        return 0
 
-            if lines:
-                with open(destination_file_path, 'a') as destination_file:
-                    current_date = datetime.now().strftime('%Y-%m-%d')  # Only the date is written
-                    for line in lines:
-                        # Write each entry with the current date
-                        destination_file.write(f"{current_date} --- {line.strip()}\n")
+    with open(source_file_path, 'rb') as source_file:
+        source_file.seek(offset)
+        data = source_file.read(st.st_size - offset)
+    end = data.rfind(b'\n') + 1  # The incomplete last line will be copied on the next run
+    if end == 0:
+        return 0
 
-        # Clear the source file after appending
-       # with open(source_file_path, 'w') as source_file:
-       #     source_file.truncate(0)  # Clear the file contents
+    timestamp = now.strftime('%Y-%m-%d %H:%M:%S')
+    records = [
+        f"{timestamp} --- {line.strip()}\n"
+        for line in data[:end].decode('utf-8', errors='ignore').splitlines()
+        if line.strip()
+    ]
+    if records:
+        segment_path = os.path.join(archive_dir_path, SEGMENT_PREFIX + now.strftime('%Y-%m-%d') + SEGMENT_SUFFIX)
+        with open(segment_path, 'a') as segment_file:
+            segment_file.writelines(records)
+            segment_file.flush()
+            os.fsync(segment_file.fileno())
 
-        # Immediately delete old logs after processing
-        delete_old_logs(destination_file_path)
+    # At-least-once: a crash right here may copy the last batch twice, but never loses it
+    save_checkpoint(checkpoint_path, st.st_dev, st.st_ino, offset + end)
+    return len(records)
 
+
+def delete_old_segments(archive_dir_path, keep_days, now):
+    oldest_date = now.date() - timedelta(days=keep_days)
+    for name in os.listdir(archive_dir_path):
+        match = SEGMENT_RE.match(name)
+        if match and datetime.strptime(match.group(1), '%Y-%m-%d').date() < oldest_date:
+            os.remove(os.path.join(archive_dir_path, name))
+
+
+def run(source_file_path, archive_dir_path, keep_days):
+    try:
+        os.makedirs(archive_dir_path, exist_ok=True)
+        now = datetime.now()
+        copied = copy_new_lines(source_file_path, archive_dir_path, now)
+        delete_old_segments(archive_dir_path, keep_days, now)
+        print(f"Archived {copied} new post-code lines")
     except IOError as e:
         print(f"An I/O error occurred: {e}")
 
+
 if __name__ == "__main__":
-    run('/home/kvmd-webterm/postcodelog.txt', '/home/kvmd-webterm/archived_logs.txt')
+    parser = argparse.ArgumentParser(description='Copy new post-code log lines to the day-segmented archive')
+    parser.add_argument('--source', default='/home/kvmd-webterm/postcodelog.txt')
+    parser.add_argument('--archive', default='/home/kvmd-webterm/archive')
+    parser.add_argument('--keep-days', type=int, default=1)
+    options = parser.parse_args()
+    run(options.source, options.archive, options.keep_days)
@@ -86,11 +86,14 @@ from ..validators.hid import valid_hid_key
 from ..validators.hid import valid_hid_mouse_output
 from ..validators.hid import valid_hid_mouse_move
 
+from ..validators.kvm import valid_stream_id
 from ..validators.kvm import valid_stream_quality
 from ..validators.kvm import valid_stream_fps
 from ..validators.kvm import valid_stream_resolution
 from ..validators.kvm import valid_stream_h264_bitrate
 from ..validators.kvm import valid_stream_h264_gop
+from ..validators.kvm import valid_pdu_type
+from ..validators.kvm import valid_pdu_outlet
 
 from ..validators.ugpio import valid_ugpio_driver
 from ..validators.ugpio import valid_ugpio_channel
@@ -144,6 +147,7 @@ def init(
             load_atx=True,
             load_msd=True,
             load_gpio=True,
+            load_streamers=True,
         ))
         raise SystemExit()
     config = _init_config(options.config, options.set_options, **load)
@@ -245,6 +249,22 @@ def _patch_raw(raw_config: dict) -> None:  # pylint: disable=too-many-branches
             streamer_config["resolution"]["available"] = available_resolutions
             del streamer_config["available_resolutions"]
 
+    if isinstance(raw_config.get("kvmd"), dict) and isinstance(raw_config["kvmd"].get("streamers"), dict):
+        raw_config["kvmd"]["streamers"] = {  # YAML turns numeric keys into ints
+            str(stream_id): streamer_config
+            for (stream_id, streamer_config) in raw_config["kvmd"]["streamers"].items()
+        }
+
+    if isinstance(raw_config.get("kvmd"), dict):
+        for (old, stream_id) in [("streamer2", "2"), ("streamer3", "3"), ("streamer4", "4")]:
+            if isinstance(raw_config["kvmd"].get(old), dict):
+                if not isinstance(raw_config["kvmd"].get("streamers"), dict):
+                    raw_config["kvmd"]["streamers"] = {}
+                streamers = raw_config["kvmd"]["streamers"]
+                if not isinstance(streamers.get(stream_id), dict):
+                    streamers[stream_id] = {}
+                yaml_merge(streamers[stream_id], raw_config["kvmd"].pop(old), f"kvmd/{old}")
+
 
 def _patch_dynamic(  # pylint: disable=too-many-locals
     raw_config: dict,
@@ -255,6 +275,7 @@ def _patch_dynamic(  # pylint: disable=too-many-locals
     load_atx: bool=False,
     load_msd: bool=False,
     load_gpio: bool=False,
+    load_streamers: bool=False,
 ) -> bool:
 
     rebuild = False
@@ -274,6 +295,19 @@ def _patch_dynamic(  # pylint: disable=too-many-locals
             scheme["kvmd"][section].update(get_class(getattr(config.kvmd, section).type).get_plugin_options())
             rebuild = True
 
+    if load_streamers:
+        path = ("kvmd", "streamers")
+        for stream_id in tools.rget(raw_config, *path):
+            with manual_validated(stream_id, *path, "<key>"):
+                stream_id = valid_stream_id(stream_id)
+                if stream_id == "1":
+                    raise ValueError("the primary stream is configured by kvmd/streamer")
+            scheme["kvmd"]["streamers"][stream_id] = {
+                **_make_streamer_scheme(stream_id),
+                "snapshot": _make_snapshot_scheme(),
+            }
+        rebuild = True
+
     if load_gpio:
         driver: str
         drivers: dict[str, type[BaseUserGpioDriver]] = {}  # Name to drivers
@@ -343,6 +377,81 @@ def _dump_config(config: Section) -> None:
     print(dump)
 
 
+def _make_streamer_scheme(stream_id: str) -> dict:
+    # The primary stream has an empty suffix: /run/kvmd/ustreamer.sock, kvmd::ustreamer::jpeg, etc
+    return {
+        "forever": Option(False, type=valid_bool),
+
+        "reset_delay":    Option(1.0,  type=valid_float_f0),
+        "shutdown_delay": Option(10.0, type=valid_float_f01),
+        "state_poll":     Option(1.0,  type=valid_float_f01),
+
+        "quality": Option(80, type=valid_stream_quality, if_empty=0),
+
+        "resolution": {
+            "default":   Option("", type=valid_stream_resolution, if_empty="", unpack_as="resolution"),
+            "available": Option(
+                [],
+                type=functools.partial(valid_string_list, subval=valid_stream_resolution),
+                unpack_as="available_resolutions",
+            ),
+        },
+
+        "desired_fps": {
+            "default": Option(40, type=valid_stream_fps, unpack_as="desired_fps"),
+            "min":     Option(0,  type=valid_stream_fps, unpack_as="desired_fps_min"),
+            "max":     Option(70, type=valid_stream_fps, unpack_as="desired_fps_max"),
+        },
+
+        "h264_bitrate": {
+            "default": Option(0,     type=valid_stream_h264_bitrate, if_empty=0, unpack_as="h264_bitrate"),
+            "min":     Option(25,    type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_min"),
+            "max":     Option(20000, type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_max"),
+        },
+
+        "h264_gop": {
+            "default": Option(30, type=valid_stream_h264_gop, unpack_as="h264_gop"),
+            "min":     Option(0,  type=valid_stream_h264_gop, unpack_as="h264_gop_min"),
+            "max":     Option(60, type=valid_stream_h264_gop, unpack_as="h264_gop_max"),
+        },
+
+        "unix":    Option(f"/run/kvmd/ustreamer{stream_id}.sock", type=valid_abs_path, unpack_as="unix_path"),
+        "timeout": Option(2.0, type=valid_float_f01),
+
+        "snapshot_fresh":     Option(0.5,     type=valid_float_f0),  # 0 to share only the in-flight requests
+        "preview_cache_size": Option(4194304, type=valid_int_f0),
+
+        "process_name_prefix": Option(f"kvmd/streamer{stream_id}"),
+        "sink":                Option(f"kvmd::ustreamer{stream_id}::jpeg", type=valid_stripped_string_not_empty),
+
+        "pre_start_cmd":        Option(["/bin/true", "pre-start"], type=valid_command),
+        "pre_start_cmd_remove": Option([], type=valid_options),
+        "pre_start_cmd_append": Option([], type=valid_options),
+
+        "cmd":        Option(["/bin/true"], type=valid_command),
+        "cmd_remove": Option([], type=valid_options),
+        "cmd_append": Option([], type=valid_options),
+
+        "post_stop_cmd":        Option(["/bin/true", "post-stop"], type=valid_command),
+        "post_stop_cmd_remove": Option([], type=valid_options),
+        "post_stop_cmd_append": Option([], type=valid_options),
+    }
+
+
+def _make_snapshot_scheme() -> dict:
+    return {
+        "idle_interval": Option(0.0, type=valid_float_f0),
+        "live_interval": Option(0.0, type=valid_float_f0),
+
+        "wakeup_key":  Option("", type=valid_hid_key, if_empty=""),
+        "wakeup_move": Option(0,  type=valid_hid_mouse_move),
+
+        "online_delay":  Option(5.0, type=valid_float_f0),
+        "retries":       Option(10,  type=valid_int_f1),
+        "retries_delay": Option(3.0, type=valid_float_f01),
+    }
+
+
 def _get_config_scheme() -> dict:
     return {
         "logging": Option({}),
@@ -353,6 +462,8 @@ def _get_config_scheme() -> dict:
                 "unix_rm":           Option(True,  type=valid_bool),
                 "unix_mode":         Option(0o660, type=valid_unix_mode),
                 "heartbeat":         Option(15.0,  type=valid_float_f01),
+                "ws_queue":          Option(256,   type=valid_int_f1),
+                "ws_lag":            Option(10.0,  type=valid_float_f01),
                 "access_log_format": Option("[%P / %{X-Real-IP}i] '%r' => %s; size=%b ---"
                                             " referer='%{Referer}i'; user_agent='%{User-Agent}i'"),
             },
@@ -376,6 +487,16 @@ def _get_config_scheme() -> dict:
                         "file": Option("/etc/kvmd/totp.secret", type=valid_abs_path, if_empty=""),
                     },
                 },
+
+                "cache": {
+                    "ttl": Option(10.0, type=valid_float_f0),  # 0 to disable the credentials cache
+                },
+
+                "tokens": {
+                    "idle_ttl": Option(0.0, type=valid_float_f0),  # 0 for the infinite tokens
+                    "max_ttl":  Option(0.0, type=valid_float_f0),
+                    "file":     Option("/run/kvmd/auth-tokens.json", type=valid_abs_path, if_empty="", unpack_as="path"),
+                },
             },
 
             "info": {  # Accessed via global config, see kvmd/info for details
@@ -432,238 +553,109 @@ def _get_config_scheme() -> dict:
                 # Dynamic content
             },
 
-            "streamer": {
-                "forever": Option(False, type=valid_bool),
-
-                "reset_delay":    Option(1.0,  type=valid_float_f0),
-                "shutdown_delay": Option(10.0, type=valid_float_f01),
-                "state_poll":     Option(1.0,  type=valid_float_f01),
-
-                "quality": Option(80, type=valid_stream_quality, if_empty=0),
-
-                "resolution": {
-                    "default":   Option("", type=valid_stream_resolution, if_empty="", unpack_as="resolution"),
-                    "available": Option(
-                        [],
-                        type=functools.partial(valid_string_list, subval=valid_stream_resolution),
-                        unpack_as="available_resolutions",
-                    ),
-                },
-
-                "desired_fps": {
-                    "default": Option(40, type=valid_stream_fps, unpack_as="desired_fps"),
-                    "min":     Option(0,  type=valid_stream_fps, unpack_as="desired_fps_min"),
-                    "max":     Option(70, type=valid_stream_fps, unpack_as="desired_fps_max"),
-                },
-
-                "h264_bitrate": {
-                    "default": Option(0,     type=valid_stream_h264_bitrate, if_empty=0, unpack_as="h264_bitrate"),
-                    "min":     Option(25,    type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_min"),
-                    "max":     Option(20000, type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_max"),
-                },
+            "streamer": _make_streamer_scheme(""),
+            "streamers": {},  # Dynamic content, stream id -> streamer + snapshot section
 
-                "h264_gop": {
-                    "default": Option(30, type=valid_stream_h264_gop, unpack_as="h264_gop"),
-                    "min":     Option(0,  type=valid_stream_h264_gop, unpack_as="h264_gop_min"),
-                    "max":     Option(60, type=valid_stream_h264_gop, unpack_as="h264_gop_max"),
+            "ocr": {
+                "langs":    Option(["eng"], type=valid_string_list, unpack_as="default_langs"),
+                "tessdata": Option("/usr/share/tessdata", type=valid_stripped_string_not_empty, unpack_as="data_dir_path"),
+                "engines":  Option(4, type=valid_int_f1, unpack_as="max_engines"),
+                "workers":  Option(0, type=valid_int_f0),  # 0 for the number of CPUs
+                "cache": {
+                    "size": Option(64,   type=valid_int_f0, unpack_as="cache_size"),
+                    "ttl":  Option(60.0, type=valid_float_f01, unpack_as="cache_ttl"),
                 },
-
-                "unix":    Option("/run/kvmd/ustreamer.sock", type=valid_abs_path, unpack_as="unix_path"),
-                "timeout": Option(2.0, type=valid_float_f01),
-
-                "process_name_prefix": Option("kvmd/streamer"),
-
-                "pre_start_cmd":        Option(["/bin/true", "pre-start"], type=valid_command),
-                "pre_start_cmd_remove": Option([], type=valid_options),
-                "pre_start_cmd_append": Option([], type=valid_options),
-
-                "cmd":        Option(["/bin/true"], type=valid_command),
-                "cmd_remove": Option([], type=valid_options),
-                "cmd_append": Option([], type=valid_options),
-
-                "post_stop_cmd":        Option(["/bin/true", "post-stop"], type=valid_command),
-                "post_stop_cmd_remove": Option([], type=valid_options),
-                "post_stop_cmd_append": Option([], type=valid_options),
             },
 
-             "streamer2": {
-                "forever": Option(False, type=valid_bool),
-
-                "reset_delay":    Option(1.0,  type=valid_float_f0),
-                "shutdown_delay": Option(10.0, type=valid_float_f01),
-                "state_poll":     Option(1.0,  type=valid_float_f01),
-
-                "quality": Option(80, type=valid_stream_quality, if_empty=0),
-
-                "resolution": {
-                    "default":   Option("", type=valid_stream_resolution, if_empty="", unpack_as="resolution"),
-                    "available": Option(
-                        [],
-                        type=functools.partial(valid_string_list, subval=valid_stream_resolution),
-                        unpack_as="available_resolutions",
-                    ),
-                },
-
-                "desired_fps": {
-                    "default": Option(40, type=valid_stream_fps, unpack_as="desired_fps"),
-                    "min":     Option(0,  type=valid_stream_fps, unpack_as="desired_fps_min"),
-                    "max":     Option(70, type=valid_stream_fps, unpack_as="desired_fps_max"),
-                },
-
-                "h264_bitrate": {
-                    "default": Option(0,     type=valid_stream_h264_bitrate, if_empty=0, unpack_as="h264_bitrate"),
-                    "min":     Option(25,    type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_min"),
-                    "max":     Option(20000, type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_max"),
-                },
-
-                "h264_gop": {
-                    "default": Option(30, type=valid_stream_h264_gop, unpack_as="h264_gop"),
-                    "min":     Option(0,  type=valid_stream_h264_gop, unpack_as="h264_gop_min"),
-                    "max":     Option(60, type=valid_stream_h264_gop, unpack_as="h264_gop_max"),
-                },
-
-                "unix":    Option("/run/kvmd/ustreamer2.sock", type=valid_abs_path, unpack_as="unix_path"),
-                "timeout": Option(2.0, type=valid_float_f01),
-
-                "process_name_prefix": Option("kvmd/streamer2"),
-
-                "pre_start_cmd":        Option(["/bin/true", "pre-start"], type=valid_command),
-                "pre_start_cmd_remove": Option([], type=valid_options),
-                "pre_start_cmd_append": Option([], type=valid_options),
-
-                "cmd":        Option(["/bin/true"], type=valid_command),
-                "cmd_remove": Option([], type=valid_options),
-                "cmd_append": Option([], type=valid_options),
-
-                "post_stop_cmd":        Option(["/bin/true", "post-stop"], type=valid_command),
-                "post_stop_cmd_remove": Option([], type=valid_options),
-                "post_stop_cmd_append": Option([], type=valid_options),
+            "serial": {
+                "device":          Option("/dev/ttyGS0", type=valid_abs_path, unpack_as="device_path"),
+                "speed":           Option(115200, type=valid_tty_speed),
+                "prompt":          Option(r"(Shell> |:\\> |[$#] )$"),
+                "eol":             Option(""),
+                "timeout":         Option(10.0, type=valid_float_f01),
+                "reconnect_delay": Option(1.0,  type=valid_float_f01),
             },
 
-            "streamer3": {
-                "forever": Option(False, type=valid_bool),
-
-                "reset_delay":    Option(1.0,  type=valid_float_f0),
-                "shutdown_delay": Option(10.0, type=valid_float_f01),
-                "state_poll":     Option(1.0,  type=valid_float_f01),
-
-                "quality": Option(80, type=valid_stream_quality, if_empty=0),
-
-                "resolution": {
-                    "default":   Option("", type=valid_stream_resolution, if_empty="", unpack_as="resolution"),
-                    "available": Option(
-                        [],
-                        type=functools.partial(valid_string_list, subval=valid_stream_resolution),
-                        unpack_as="available_resolutions",
-                    ),
-                },
-
-                "desired_fps": {
-                    "default": Option(40, type=valid_stream_fps, unpack_as="desired_fps"),
-                    "min":     Option(0,  type=valid_stream_fps, unpack_as="desired_fps_min"),
-                    "max":     Option(70, type=valid_stream_fps, unpack_as="desired_fps_max"),
-                },
-
-                "h264_bitrate": {
-                    "default": Option(0,     type=valid_stream_h264_bitrate, if_empty=0, unpack_as="h264_bitrate"),
-                    "min":     Option(25,    type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_min"),
-                    "max":     Option(20000, type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_max"),
-                },
-
-                "h264_gop": {
-                    "default": Option(30, type=valid_stream_h264_gop, unpack_as="h264_gop"),
-                    "min":     Option(0,  type=valid_stream_h264_gop, unpack_as="h264_gop_min"),
-                    "max":     Option(60, type=valid_stream_h264_gop, unpack_as="h264_gop_max"),
+            "postcode": {
+                "log":     Option("/home/kvmd-webterm/postcodelog.txt", type=valid_abs_path, unpack_as="log_path"),
+                "archive": Option("/home/kvmd-webterm/archive", type=valid_abs_path, unpack_as="archive_path"),
+                "capture": {
+                    "enabled":         Option(True, type=valid_bool),
+                    "device":          Option("/dev/ttyAMA0", type=valid_abs_path, unpack_as="device_path"),
+                    "speed":           Option(115200, type=valid_tty_speed),
+                    "ring":            Option(4096, type=valid_int_f1, unpack_as="ring_size"),
+                    "flush_interval":  Option(1.0,  type=valid_float_f01),
+                    "reconnect_delay": Option(1.0,  type=valid_float_f01),
                 },
-
-                "unix":    Option("/run/kvmd/ustreamer3.sock", type=valid_abs_path, unpack_as="unix_path"),
-                "timeout": Option(2.0, type=valid_float_f01),
-
-                "process_name_prefix": Option("kvmd/streamer3"),
-
-                "pre_start_cmd":        Option(["/bin/true", "pre-start"], type=valid_command),
-                "pre_start_cmd_remove": Option([], type=valid_options),
-                "pre_start_cmd_append": Option([], type=valid_options),
-
-                "cmd":        Option(["/bin/true"], type=valid_command),
-                "cmd_remove": Option([], type=valid_options),
-                "cmd_append": Option([], type=valid_options),
-
-                "post_stop_cmd":        Option(["/bin/true", "post-stop"], type=valid_command),
-                "post_stop_cmd_remove": Option([], type=valid_options),
-                "post_stop_cmd_append": Option([], type=valid_options),
             },
 
-            "streamer4": {
-                "forever": Option(False, type=valid_bool),
-
-                "reset_delay":    Option(1.0,  type=valid_float_f0),
-                "shutdown_delay": Option(10.0, type=valid_float_f01),
-                "state_poll":     Option(1.0,  type=valid_float_f01),
-
-                "quality": Option(80, type=valid_stream_quality, if_empty=0),
-
-                "resolution": {
-                    "default":   Option("", type=valid_stream_resolution, if_empty="", unpack_as="resolution"),
-                    "available": Option(
-                        [],
-                        type=functools.partial(valid_string_list, subval=valid_stream_resolution),
-                        unpack_as="available_resolutions",
-                    ),
-                },
-
-                "desired_fps": {
-                    "default": Option(40, type=valid_stream_fps, unpack_as="desired_fps"),
-                    "min":     Option(0,  type=valid_stream_fps, unpack_as="desired_fps_min"),
-                    "max":     Option(70, type=valid_stream_fps, unpack_as="desired_fps_max"),
-                },
-
-                "h264_bitrate": {
-                    "default": Option(0,     type=valid_stream_h264_bitrate, if_empty=0, unpack_as="h264_bitrate"),
-                    "min":     Option(25,    type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_min"),
-                    "max":     Option(20000, type=valid_stream_h264_bitrate, unpack_as="h264_bitrate_max"),
-                },
-
-                "h264_gop": {
-                    "default": Option(30, type=valid_stream_h264_gop, unpack_as="h264_gop"),
-                    "min":     Option(0,  type=valid_stream_h264_gop, unpack_as="h264_gop_min"),
-                    "max":     Option(60, type=valid_stream_h264_gop, unpack_as="h264_gop_max"),
-                },
-
-                "unix":    Option("/run/kvmd/ustreamer4.sock", type=valid_abs_path, unpack_as="unix_path"),
-                "timeout": Option(2.0, type=valid_float_f01),
-
-                "process_name_prefix": Option("kvmd/streamer4"),
-
-                "pre_start_cmd":        Option(["/bin/true", "pre-start"], type=valid_command),
-                "pre_start_cmd_remove": Option([], type=valid_options),
-                "pre_start_cmd_append": Option([], type=valid_options),
+            "i2c": {
+                "bus":          Option(1,    type=valid_int_f0),
+                "mux_address":  Option(0x72, type=valid_int_f0),
+                "idle_mask":    Option(0x01, type=functools.partial(valid_number, min=-1, max=0xFF)),  # -1 to keep the last channel
+                "gpio_address": Option(0x24, type=valid_int_f0),
+                "gpio_channel": Option(1,    type=functools.partial(valid_number, min=0, max=7)),
+                "state_poll":   Option(1.0,  type=valid_float_f01),
+            },
 
-                "cmd":        Option(["/bin/true"], type=valid_command),
-                "cmd_remove": Option([], type=valid_options),
-                "cmd_append": Option([], type=valid_options),
+            "firmware": {
+                "path":   Option("/binfile", type=valid_abs_path),
+                "suffix": Option(".bin",     type=valid_stripped_string_not_empty),
+            },
 
-                "post_stop_cmd":        Option(["/bin/true", "post-stop"], type=valid_command),
-                "post_stop_cmd_remove": Option([], type=valid_options),
-                "post_stop_cmd_append": Option([], type=valid_options),
+            "battery": {
+                "device":          Option("/dev/ttyAMA0", type=valid_abs_path, unpack_as="device_path"),
+                "speed":           Option(115200, type=valid_tty_speed),
+                "tag":             Option(15,     type=valid_int_f0),
+                "ack_prefix":      Option("ACK",  type=valid_stripped_string_not_empty),
+                "nak_prefix":      Option("NAK",  type=valid_stripped_string_not_empty),
+                "ack_timeout":     Option(0.5,    type=valid_float_f0),
+                "window":          Option(8,      type=valid_int_f1),
+                "reconnect_delay": Option(1.0,    type=valid_float_f01),
             },
-            "ocr": {
-                "langs":    Option(["eng"], type=valid_string_list, unpack_as="default_langs"),
-                "tessdata": Option("/usr/share/tessdata", type=valid_stripped_string_not_empty, unpack_as="data_dir_path")
+
+            "pdu": {
+                "type":           Option("apc",  type=valid_pdu_type),
+                "outlet":         Option("1",    type=valid_pdu_outlet),
+                "port":           Option(22,     type=valid_port),
+                "known_hosts":    Option("",     type=valid_abs_path, if_empty=""),
+                "timeout":        Option(10.0,   type=valid_float_f01),
+                "switch_timeout": Option(300.0,  type=valid_float_f01),
+                "state_poll":     Option(2.0,    type=valid_float_f01),
+                "gpio_pin":       Option(8,      type=valid_int_f0),
+                "history":        Option(20,     type=valid_int_f0),
             },
 
-            "snapshot": {
-                "idle_interval": Option(0.0, type=valid_float_f0),
-                "live_interval": Option(0.0, type=valid_float_f0),
+            "flash": {
+                "programmer":      Option("linux_spi:dev=/dev/spidev0.0,spispeed=5000", type=valid_stripped_string_not_empty),
+                "spi_device":      Option("/dev/spidev0.0", type=valid_abs_path),
+                "gpio_pin":        Option(8, type=valid_int_f0),
+                "spi_restart_cmd": Option(["/usr/bin/sudo", "/usr/bin/systemctl", "restart", "spi"], type=valid_command),
+                "settle_delay":    Option(2.0, type=valid_float_f0),
+                "settle_timeout":  Option(5.0, type=valid_float_f01),
+                "progress":        Option(False, type=valid_bool),  # flashrom --progress, since 1.4
+                "log_dir":         Option("/home/kvmd-webterm", type=valid_abs_path, if_empty=""),
+                "history":         Option(20, type=valid_int_f0),
+            },
 
-                "wakeup_key":  Option("", type=valid_hid_key, if_empty=""),
-                "wakeup_move": Option(0,  type=valid_hid_mouse_move),
+            "camera": {
+                "i2c_bus":       Option(1,   type=valid_int_f0),
+                "i2c_channel":   Option(0,   type=functools.partial(valid_number, min=-1, max=7)),  # -1 if not behind the mux
+                "frame_timeout": Option(5.0, type=valid_float_f01),
+            },
 
-                "online_delay":  Option(5.0, type=valid_float_f0),
-                "retries":       Option(10,  type=valid_int_f1),
-                "retries_delay": Option(3.0, type=valid_float_f01),
+            "usbethernet": {
+                "host":       Option("190.20.20.2", type=valid_ip_or_host),
+                "port":       Option(4444,  type=valid_port),
+                "timeout":       Option(5.0,   type=valid_float_f01),
+                "reply_timeout": Option(1.0,   type=valid_float_f01),  # Untagged mode: no reply at all
+                "quiet":         Option(0.3,   type=valid_float_f01),  # Untagged mode: reply is done after this silence
+                "end_marker":    Option("<END>", type=valid_stripped_string_not_empty),
+                "tagged":        Option(False, type=valid_bool),  # Required for the pipelining, see UdpHandler
             },
 
+            "snapshot": _make_snapshot_scheme(),
+
             "gpio": {
                 "state_poll": Option(0.1, type=valid_float_f01),
                 "drivers": {},  # Dynamic content
@@ -683,6 +675,8 @@ def _get_config_scheme() -> dict:
                 "unix_rm":           Option(True,  type=valid_bool),
                 "unix_mode":         Option(0o660, type=valid_unix_mode),
                 "heartbeat":         Option(15.0,  type=valid_float_f01),
+                "ws_queue":          Option(256,   type=valid_int_f1),
+                "ws_lag":            Option(10.0,  type=valid_float_f01),
                 "access_log_format": Option("[%P / %{X-Real-IP}i] '%r' => %s; size=%b ---"
                                             " referer='%{Referer}i'; user_agent='%{User-Agent}i'"),
             },
@@ -22,6 +22,9 @@
 
 from ...logging import get_logger
 
+from ...yamlconf import Section
+
+from ...plugins.hid import BaseHid
 from ...plugins.hid import get_hid_class
 from ...plugins.atx import get_atx_class
 from ...plugins.msd import get_msd_class
@@ -30,15 +33,24 @@ from .. import init
 
 from .auth import AuthManager
 from .info import InfoManager
-from .info import InfoManager2
 from .logreader import LogReader
 from .ugpio import UserGpio
 from .streamer import Streamer
-from .streamer2 import Streamer2
-from .streamer3 import Streamer3
-from .streamer4 import Streamer4
 from .snapshoter import Snapshoter
+from .streamerpool import StreamerPoolItem
+from .streamerpool import StreamerPool
 from .ocr import Ocr
+from .serialbroker import SerialBroker
+from .postcode import PostcodeReader
+from .postcodecapture import PostcodeCapture
+from .camera import CameraController
+from .i2cmux import I2cMux
+from .blockdevs import BlockDevicesInventory
+from .firmware import FirmwareCatalog
+from .flasher import FlashJobQueue
+from .pdu import PduSwitcher
+from .battery import BatteryLink
+from .api.usbethernet import UdpHandler
 from .server import KvmdServer
 
 
@@ -54,6 +66,7 @@ def main(argv: (list[str] | None)=None) -> None:
         load_atx=True,
         load_msd=True,
         load_gpio=True,
+        load_streamers=True,
     )[2]
 
     msd_kwargs = config.kvmd.msd._unpack(ignore=["type"])
@@ -68,37 +81,17 @@ def main(argv: (list[str] | None)=None) -> None:
     config = config.kvmd
     get_logger().info(str(config))
     hid = get_hid_class(config.hid.type)(**hid_kwargs)
-    streamer = Streamer(
-        **config.streamer._unpack(ignore=["forever", "desired_fps", "resolution", "h264_bitrate", "h264_gop"]),
-        **config.streamer.resolution._unpack(),
-        **config.streamer.desired_fps._unpack(),
-        **config.streamer.h264_bitrate._unpack(),
-        **config.streamer.h264_gop._unpack(),
-    )
-    #streamer2 = None
-    streamer2 = Streamer2(
-        **config.streamer2._unpack(ignore=["forever", "desired_fps", "resolution", "h264_bitrate", "h264_gop"]),
-        **config.streamer2.resolution._unpack(),
-        **config.streamer2.desired_fps._unpack(),
-        **config.streamer2.h264_bitrate._unpack(),
-        **config.streamer2.h264_gop._unpack(),
-    )
+    streamers = StreamerPool({
+        stream_id: _make_streamer_pool_item(hid, streamer_config, snapshot_config)
+        for (stream_id, streamer_config, snapshot_config) in [
+            (StreamerPool.PRIMARY_ID, config.streamer, config.snapshot),
+            *[
+                (stream_id, streamer_config, streamer_config.snapshot)
+                for (stream_id, streamer_config) in config.streamers.items()
+            ],
+        ]
+    })
 
-    streamer3 = Streamer3(
-        **config.streamer3._unpack(ignore=["forever", "desired_fps", "resolution", "h264_bitrate", "h264_gop"]),
-        **config.streamer3.resolution._unpack(),
-        **config.streamer3.desired_fps._unpack(),
-        **config.streamer3.h264_bitrate._unpack(),
-        **config.streamer3.h264_gop._unpack(),
-    )
-
-    streamer4 = Streamer4(
-        **config.streamer4._unpack(ignore=["forever", "desired_fps", "resolution", "h264_bitrate", "h264_gop"]),
-        **config.streamer4.resolution._unpack(),
-        **config.streamer4.desired_fps._unpack(),
-        **config.streamer4.h264_bitrate._unpack(),
-        **config.streamer4.h264_gop._unpack(),
-    )
 	# Modified code block for MSD initialization
     try:
         msd = get_msd_class(config.msd.type)(**msd_kwargs)
@@ -115,6 +108,13 @@ def main(argv: (list[str] | None)=None) -> None:
         # Log other exceptions
         get_logger(0).error(f"Error initializing MSD: {e}")
         msd = None
+    firmware_catalog = FirmwareCatalog(**config.firmware._unpack())
+    i2c_mux = I2cMux(**config.i2c._unpack())
+    flasher = FlashJobQueue(catalog=firmware_catalog, **config.flash._unpack())
+    postcode_capture = (PostcodeCapture(
+        log_path=config.postcode.log,
+        **config.postcode.capture._unpack(ignore=["enabled"]),
+    ) if config.postcode.capture.enabled else None)
     KvmdServer(
         auth_manager=AuthManager(
             enabled=config.auth.enabled,
@@ -128,38 +128,54 @@ def main(argv: (list[str] | None)=None) -> None:
             external_kwargs=(config.auth.external._unpack(ignore=["type"]) if config.auth.external.type else {}),
 
             totp_secret_path=config.auth.totp.secret.file,
+
+            cache_ttl=config.auth.cache.ttl,
+            tokens_kwargs=config.auth.tokens._unpack(),
         ),
         info_manager=InfoManager(global_config),
-        #info_manager2=InfoManager2(global_config),
-        info_manager2=None,
-        info_manager3=None,
-        info_manager4=None,
         log_reader=(LogReader() if config.log_reader.enabled else None),
         user_gpio=UserGpio(config.gpio, global_config.otg),
-        ocr=Ocr(**config.ocr._unpack()),
+        ocr=Ocr(**config.ocr._unpack(ignore=["cache"]), **config.ocr.cache._unpack()),
+        serial_broker=SerialBroker(**config.serial._unpack()),
+        postcode_reader=PostcodeReader(**config.postcode._unpack(ignore=["capture"])),
+        postcode_capture=postcode_capture,
+        i2c_mux=i2c_mux,
+        block_devices=BlockDevicesInventory(),
+        firmware_catalog=firmware_catalog,
+        flasher=flasher,
+        pdu=PduSwitcher(flasher=flasher, **config.pdu._unpack()),
+        battery=BatteryLink(capture=postcode_capture, **config.battery._unpack()),
+        camera=CameraController(i2c_mux=i2c_mux, **config.camera._unpack()),
+        udp_handler=UdpHandler(**config.usbethernet._unpack()),
 
         hid=hid,
         atx=get_atx_class(config.atx.type)(**config.atx._unpack(ignore=["type"])),
         msd=msd,
-        streamer=streamer,
-        streamer2 = streamer2,
-        streamer3 = streamer3,
-        streamer4 = streamer4,
-        snapshoter=Snapshoter(
-            hid=hid,
-            streamer=streamer,
-            **config.snapshot._unpack(),
-        ),
-        
+        streamers=streamers,
+
         keymap_path=config.hid.keymap,
         ignore_keys=config.hid.ignore_keys,
         mouse_x_range=(config.hid.mouse_x_range.min, config.hid.mouse_x_range.max),
         mouse_y_range=(config.hid.mouse_y_range.min, config.hid.mouse_y_range.max),
-
-        stream_forever=config.streamer.forever,
-        stream_forever2=config.streamer2.forever,
-        stream_forever3=config.streamer3.forever,
-        stream_forever4=config.streamer4.forever,
     ).run(**config.server._unpack())
 
     get_logger(0).info("Bye-bye")
+
+
+def _make_streamer_pool_item(hid: BaseHid, streamer_config: Section, snapshot_config: Section) -> StreamerPoolItem:
+    streamer = Streamer(
+        **streamer_config._unpack(ignore=["forever", "desired_fps", "resolution", "h264_bitrate", "h264_gop", "snapshot"]),
+        **streamer_config.resolution._unpack(),
+        **streamer_config.desired_fps._unpack(),
+        **streamer_config.h264_bitrate._unpack(),
+        **streamer_config.h264_gop._unpack(),
+    )
+    return StreamerPoolItem(
+        streamer=streamer,
+        snapshoter=Snapshoter(
+            hid=hid,
+            streamer=streamer,
+            **snapshot_config._unpack(),
+        ),
+        forever=streamer_config.forever,
+    )
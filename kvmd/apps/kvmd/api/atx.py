@@ -19,11 +19,11 @@
 #                                                                            #
 # ========================================================================== #
 
-import subprocess
-import time
 from aiohttp.web import Request
 from aiohttp.web import Response
 
+from ....logging import get_logger
+
 from ....htserver import exposed_http
 from ....htserver import make_json_response
 
@@ -33,20 +33,17 @@ from ....validators.basic import valid_bool
 from ....validators.kvm import valid_atx_power_action
 from ....validators.kvm import valid_atx_button
 
+from ..i2cmux import I2cMux
+
 
 # =====
 class AtxApi:
-    def __init__(self, atx: BaseAtx) -> None:
+    def __init__(self, atx: BaseAtx, i2c_mux: I2cMux) -> None:
         self.__atx = atx
+        self.__i2c_mux = i2c_mux
 
     # =====
         
-    def execute_i2cset(self, address, register, value):
-        subprocess.run(["i2cset", "-y", "1", hex(address), hex(register), hex(value)])
-
-    def select_mux_channel(self, channel):
-        subprocess.run(["i2cset", "-y", "1", "0x72", "0x00", hex(1 << channel)])
-
     @exposed_http("GET", "/atx")
     async def __state_handler(self, _: Request) -> Response:
         return make_json_response(await self.__atx.get_state())
@@ -66,16 +63,10 @@ class AtxApi:
     @exposed_http("GET", "/atx/power")
     async def power_operation_handler(self, request: Request) -> Response:
         try:
-            self.select_mux_channel(1)
-            self.execute_i2cset(0x24, 0x00, 0x3f)
-            self.execute_i2cset(0x24, 0x0c, 0xc0)
-           
-            self.execute_i2cset(0x24, 0x12, 0x80 | 0x00)  
-            time.sleep(3)
-            self.execute_i2cset(0x24, 0x12, 0x00)
+            await self.__i2c_mux.pulse_gpio(0x80, 3)
             return make_json_response({"message": "Power operation done"})
         except Exception as e:
-            print("Error during power operation:", e)
+            get_logger(0).error("Error during power operation: %s", e)
             return make_json_response({"message": "Power operation failed."})
 
     # @exposed_http("POST", "/atx/click")
@@ -92,15 +83,9 @@ class AtxApi:
     @exposed_http("GET", "/atx/reset")
     async def reset_operation_handler(self, request: Request) -> Response:
         try:
-            self.select_mux_channel(1)
-            self.execute_i2cset(0x24, 0x00, 0x3f)
-            self.execute_i2cset(0x24, 0x0c, 0xc0)
-           
-            self.execute_i2cset(0x24, 0x12, 0x40 | 0x00)  
-            time.sleep(10)
-            self.execute_i2cset(0x24, 0x12, 0x00)
+            await self.__i2c_mux.pulse_gpio(0x40, 10)
             return make_json_response({"message": "Reset operation done"})
         except Exception as e:
-            print("Error during reset operation:", e)
+            get_logger(0).error("Error during reset operation: %s", e)
             return make_json_response({"message": "Reset operation failed."})
 
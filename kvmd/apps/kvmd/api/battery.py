@@ -20,15 +20,8 @@
 # ========================================================================== #
 
 
-import os
-import stat
-import functools
-import struct
-import serial
-import asyncio
-import subprocess
 
-from .batterysimulator  import write
+from typing import Any
 
 from aiohttp.web import Request
 from aiohttp.web import Response
@@ -36,83 +29,71 @@ from aiohttp.web import Response
 from ....htserver import exposed_http
 from ....htserver import make_json_response
 
-from .Focuser import Focuser
-from ....logging import get_logger
-from .AutoFocus import AutoFocus
-from .RpiCamera import Camera
+from ....validators import raise_error
+from ....validators.basic import valid_number
+
+from ..battery import BatteryLink
+
 
 # =====
+_MAX_PROFILE_POINTS = 10000
+
+
+def _valid_percent(arg: Any) -> int:
+    return int(valid_number(arg, min=0, max=100, name="battery percent"))
+
+
+def _valid_profile(arg: Any) -> list[tuple[float, int]]:
+    name = "battery profile"
+    if not isinstance(arg, list) or not (0 < len(arg) <= _MAX_PROFILE_POINTS):
+        raise_error(arg, name)
+    points: list[tuple[float, int]] = []
+    prev_offset = 0.0
+    for point in arg:
+        if not isinstance(point, (list, tuple)) or len(point) != 2:
+            raise_error(point, f"{name} point")
+        offset = float(valid_number(point[0], min=prev_offset, type=float, name=f"{name} time offset"))
+        points.append((offset, _valid_percent(point[1])))
+        prev_offset = offset
+    return points
+
+
 class BatteryApi:
-    def __init__(
-        self,
-       
-    ) -> None:
-        pass
+    def __init__(self, battery: BatteryLink) -> None:
+        self.__battery = battery
 
-     # =====
+    # =====
 
-   
     @exposed_http("POST", "/battery/set_simulation_percent")
     async def set_simulation_percent(self, request: Request) -> Response:
-        data = await request.json()
-        percent = data.get('percent')
-        hex_value = hex(percent // 10)
-        formatted_str = '0x' + hex_value[2:].zfill(1)
-        write(15,percent,"simulated")
-        return make_json_response({"ok": True, "message": "Simulation Percentage set!", "percent": [formatted_str, percent]})
+        percent = _valid_percent((await request.json()).get("percent"))
+        await self.__battery.set_percent(percent)
+        return make_json_response({"ok": True, "message": "Simulation Percentage set!", "percent": [hex(percent // 10), percent]})
 
     @exposed_http("POST", "/battery/simulated")
-    async def set_simulated_battery_mode(self, request: Request) -> Response:
-        write(None,None,"simulated-attach")
+    async def set_simulated_battery_mode(self, _: Request) -> Response:
+        await self.__battery.set_mode("simulated")
         return make_json_response({"ok": True, "message": "Mode set to Simulated battery"})
-    
+
     @exposed_http("POST", "/battery/real")
-    async def set_real_battery_mode(self, request: Request) -> Response:
-        write(None,None,"real-attach")
+    async def set_real_battery_mode(self, _: Request) -> Response:
+        await self.__battery.set_mode("real")
         return make_json_response({"ok": True, "message": "Mode set to real battery"})
-    
+
     @exposed_http("POST", "/battery/ac-source")
-    async def set_ac_source_battery_mode(self, request: Request) -> Response:
-        commands = [
-            ["raspi-gpio", "set", "24", "op", "dl"],
-            ["raspi-gpio", "set", "13", "op", "dl"]
-
-        ]
-        for command_args in commands:
-            subprocess.run(command_args)
+    async def set_ac_source_battery_mode(self, _: Request) -> Response:
+        await self.__battery.set_mode("ac_source")
         return make_json_response({"ok": True, "message": "Mode set to AC source"})
 
-    
-
-   
-
-    @exposed_http("GET", "/postcode/get_data")
-    async def __getData_handler(self, request: Request) -> Response:
-        ser = serial.Serial('/dev/ttyAMA0', 115200, timeout=1)
-        iteration_count = 0  
- 
-        try:
-            while True:
-                line = await asyncio.to_thread(ser.readline)
-                if line:
-                    line = line.decode('utf-8', errors='replace').strip()
-                    result = {"data": line}
-                    return make_json_response(result)
-                iteration_count += 1
-                if iteration_count >= 50:
-                    break
- 
-        except asyncio.TimeoutError:
-            pass
-        finally:
-            ser.close()
- 
-        iteration_count = 0
-
-   
-    
- 
-    
-
-
-    
\ No newline at end of file
+    # The discharge curve is a list of [seconds from the start, percent], it's played
+    # by the server and the progress is reported as battery_state on /ws.
+    @exposed_http("POST", "/battery/profile")
+    async def start_profile(self, request: Request) -> Response:
+        points = _valid_profile((await request.json()).get("points"))
+        await self.__battery.start_profile(points)
+        return make_json_response()
+
+    @exposed_http("POST", "/battery/profile/stop")
+    async def stop_profile(self, _: Request) -> Response:
+        await self.__battery.stop_profile()
+        return make_json_response()
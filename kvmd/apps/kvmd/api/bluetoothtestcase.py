@@ -1,42 +1,17 @@
-import asyncio
 import aiohttp
 from .usbserial import UsbserialApi
 from aiohttp.web import Request
 from aiohttp.web import Response
 from ....htserver import exposed_http
 from ....htserver import make_json_response
-from serial import SerialException, SerialTimeoutException
 
 class BluetoothApi:
-    def __init__(self, usb_serial_api=None) -> None:
-        self.usb_serial_api = usb_serial_api or UsbserialApi()  # Assuming UsbserialApi can handle Bluetooth as well
+    def __init__(self, usb_serial_api: UsbserialApi) -> None:
+        self.usb_serial_api = usb_serial_api
 
     async def send_serial_command(self, command):
         """Send a command to the serial API and return the response."""
-        try:
-            await self.usb_serial_api.init_serial_connection()
-            if not self.usb_serial_api.serial_reader or not self.usb_serial_api.serial_writer:
-                return {"error": "Failed to open serial connection"}
-
-            # Write the command to the serial port
-            await self.usb_serial_api.serial_write(command)
-            await asyncio.sleep(10)
-
-            async with self.usb_serial_api.lock:
-                response = self.usb_serial_api.response_data.strip()
-                self.usb_serial_api.response_data = ""  # Clear for the next command
-
-            if not response:
-                return {"error": "No response from serial device"}
-
-            return {"message": "Command processed successfully", "response": response}
-
-        except SerialException as e:
-            return {"error": f"Serial communication error: {str(e)}"}
-
-        finally:
-            if self.usb_serial_api.serial_writer:
-                self.usb_serial_api.serial_writer.close()
+        return await self.usb_serial_api.send_serial_command(command)
 
     async def enumerate_bluetooth_device_logic(self, os, location):
         """Enumerate Bluetooth devices based on OS over serial"""
@@ -155,6 +130,16 @@ class BluetoothApi:
             return make_json_response(result)
         return make_json_response({"error": "Endpoint applicable only for target location"})
 
+    def get_testcases(self) -> dict:
+        """Test cases runnable through /testcases/run, keyed by their endpoint name."""
+        return {
+            "enumerate_bluetooth_device": (lambda os, location, params: self.enumerate_bluetooth_device_logic(os, location)),
+            "bluetooth_driver_information": (lambda os, location, params: self.bluetooth_driver_information_logic(os, location)),
+            "check_bluetooth_status": (lambda os, location, params: self.check_bluetooth_status_logic(os, location)),
+            "bluetooth_error_handling": (lambda os, location, params: self.bluetooth_error_handling_logic(os, location)),
+            "bluetooth_power_management": (lambda os, location, params: self.bluetooth_power_management_logic(os, location)),
+        }
+
     async def get_params(self, request: Request) -> Response:
         location = request.rel_url.query.get('location', 'target')
         os = request.rel_url.query.get('os', 'windows').lower()
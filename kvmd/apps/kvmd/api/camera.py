@@ -20,172 +20,108 @@
 # ========================================================================== #
 
 
-import os
-import stat
-import functools
-import struct
-import serial
-import asyncio
-import subprocess
-
-
 from aiohttp.web import Request
 from aiohttp.web import Response
 
 from ....htserver import exposed_http
 from ....htserver import make_json_response
+from ....htserver import exposed_ws
+from ....htserver import WsSession
 
-from .Focuser import Focuser
 from ....logging import get_logger
-from .AutoFocus import AutoFocus
-from .RpiCamera import Camera
+
+from ....errors import IsBusyError
+
+from ....validators.basic import valid_bool
+from ....validators.basic import valid_number
+
+from ..camera import CameraController
 
 # =====
+_MOTOR_STEP = 5
+_LENS_STEP = 100
+
+_WS_MOVE_LIMITS = {
+    "pan":   180,
+    "tilt":  180,
+    "zoom":  20000,
+    "focus": 20000,
+}
+
+
 class CameraApi:
-    def __init__(
-        self,
-       
-    ) -> None:
-        pass
-
-     # =====
-    
-
-    def move_right(self):
-        motor_step=5
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_MOTOR_Y,focuser.get(Focuser.OPT_MOTOR_Y) + motor_step)
-        get_logger(0).info("Right Camera api call ")
- 
+    def __init__(self, camera: CameraController) -> None:
+        self.__camera = camera
+
+    # =====
+
     @exposed_http("GET", "/camera/right")
     async def __right_handler(self, _: Request) -> Response:
-        self.move_right()
-        return make_json_response({"ok":True })
-   
-    def move_left(self):
-        motor_step=5
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_MOTOR_Y,focuser.get(Focuser.OPT_MOTOR_Y) - motor_step)
-        get_logger(0).info("Left Camera api call ")
- 
+        await self.__camera.move({"pan": _MOTOR_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/left")
     async def __left_handler(self, _: Request) -> Response:
-        self.move_left()
-        return make_json_response({"ok":True })
-   
-    def move_down(self):
-        motor_step=5
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_MOTOR_X,focuser.get(Focuser.OPT_MOTOR_X)- motor_step)
-        get_logger(0).info("Camera down api call")
- 
+        await self.__camera.move({"pan": -_MOTOR_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/down")
     async def __down_handler(self, _: Request) -> Response:
-        self.move_down()
-        return make_json_response({"ok":True })
-   
-    def move_up(self):
-        motor_step=5
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_MOTOR_X,focuser.get(Focuser.OPT_MOTOR_X)+ motor_step)
-        get_logger(0).info("Camera up api call")
- 
+        await self.__camera.move({"tilt": -_MOTOR_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/up")
     async def __up_handler(self, _: Request) -> Response:
-        self.move_up()
-        return make_json_response({"ok":True })
-   
-    def zoom_in(self):
-        zoom_step = 100
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_ZOOM,focuser.get(Focuser.OPT_ZOOM) + zoom_step)
-        get_logger(0).info("Camera zoom-in api call")
- 
+        await self.__camera.move({"tilt": _MOTOR_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/zoomin")
     async def __zoomin_handler(self, _: Request) -> Response:
-        self.zoom_in()
-        return make_json_response({"ok":True })
-   
-    def zoom_out(self):
-        zoom_step = 100
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_ZOOM,focuser.get(Focuser.OPT_ZOOM) - zoom_step)
-        get_logger(0).info("Camera zoom-in api call")
- 
+        await self.__camera.move({"zoom": _LENS_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/zoomout")
     async def __zoomout_handler(self, _: Request) -> Response:
-        self.zoom_out()
-        return make_json_response({"ok":True })
-   
-    def focus_in(self):
-        focus_step = 100
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_FOCUS,focuser.get(Focuser.OPT_FOCUS)+ focus_step)
-        get_logger(0).info("Camera focus-in api call")
- 
+        await self.__camera.move({"zoom": -_LENS_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/focusin")
     async def __focusin_handler(self, _: Request) -> Response:
-        self.focus_in()
-        return make_json_response({"ok":True })
-   
-    def focus_out(self):
-        focus_step = 100
-        i2c_bus=1
-        focuser = Focuser(i2c_bus)
-        focuser.set(Focuser.OPT_FOCUS,focuser.get(Focuser.OPT_FOCUS)- focus_step)
-        get_logger(0).info("Camera focus-out api call")
- 
+        await self.__camera.move({"focus": _LENS_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
     @exposed_http("GET", "/camera/focusout")
     async def __focusout_handler(self, _: Request) -> Response:
-        self.focus_out()
-        return make_json_response({"ok":True })
-    
-
-    @exposed_http("GET", "/postcode/get_data")
-    async def __getData_handler(self, request: Request) -> Response:
-        ser = serial.Serial('/dev/ttyAMA0', 115200, timeout=1)
-        iteration_count = 0  
- 
+        await self.__camera.move({"focus": -_LENS_STEP}, wait=True)
+        return make_json_response({"ok": True})
+
+    @exposed_ws("camera_move")
+    async def __ws_move_handler(self, _: WsSession, event: dict) -> None:
+        # Continuous PTZ: the client sends relative deltas while a control is held,
+        # they are coalesced by the controller and don't block the websocket loop.
         try:
-            while True:
-                line = await asyncio.to_thread(ser.readline)
-                if line:
-                    line = line.decode('utf-8', errors='replace').strip()
-                    result = {"data": line}
-                    return make_json_response(result)
-                iteration_count += 1
-                if iteration_count >= 50:
-                    break
- 
-        except asyncio.TimeoutError:
-            pass
-        finally:
-            ser.close()
- 
-        iteration_count = 0
-
-   
-    def auto_focus(self):
-        focuser = Focuser(1)
-        camera = Camera()
-        auto_focus = AutoFocus(focuser,camera)
-        auto_focus.startFocus()
-        get_logger(0).info("Autofocus api call")
- 
- 
- 
-    @exposed_http("GET", "/camera/autofocus")
-    async def __autofocus_handler(self, _: Request) -> Response:
-        self.auto_focus()
-        return make_json_response({"ok":True })
+            deltas = {
+                axis: valid_number(event.get(axis, 0), min=-limit, max=limit, type=int, name=axis)
+                for (axis, limit) in _WS_MOVE_LIMITS.items()
+            }
+            await self.__camera.move(deltas, wait=False)
+        except IsBusyError:
+            pass  # The moves are sent continuously, they are just ignored during the autofocus
+        except Exception as err:
+            get_logger(0).error("Can't handle camera_move event: %s", err)
 
+    # =====
+
+    @exposed_http("GET", "/camera/autofocus")
+    async def __autofocus_handler(self, request: Request) -> Response:
+        await self.__camera.autofocus(valid_bool(request.query.get("wait", False)))
+        return make_json_response()
 
+    @exposed_http("GET", "/camera/autofocus/status")
+    async def __autofocus_status_handler(self, _: Request) -> Response:
+        return make_json_response(await self.__camera.get_state())
 
-    
\ No newline at end of file
+    @exposed_http("POST", "/camera/autofocus/cancel")
+    async def __autofocus_cancel_handler(self, _: Request) -> Response:
+        self.__camera.cancel_autofocus()
+        return make_json_response()
@@ -22,6 +22,7 @@
 
 import asyncio
 
+from typing import Callable
 from typing import Any
 
 import async_lru
@@ -42,10 +43,18 @@ from ..ugpio import UserGpio
 
 # =====
 class ExportApi:
-    def __init__(self, info_manager: InfoManager, atx: BaseAtx, user_gpio: UserGpio) -> None:
+    def __init__(
+        self,
+        info_manager: InfoManager,
+        atx: BaseAtx,
+        user_gpio: UserGpio,
+        get_ws_stats: Callable[[], dict],
+    ) -> None:
+
         self.__info_manager = info_manager
         self.__atx = atx
         self.__user_gpio = user_gpio
+        self.__get_ws_stats = get_ws_stats
 
     # =====
 
@@ -74,6 +83,7 @@ class ExportApi:
 
         self.__append_prometheus_rows(rows, hw_state["health"], "pikvm_hw")  # type: ignore
         self.__append_prometheus_rows(rows, fan_state, "pikvm_fan")
+        self.__append_prometheus_rows(rows, self.__get_ws_stats(), "pikvm_ws")
 
         return "\n".join(rows)
 
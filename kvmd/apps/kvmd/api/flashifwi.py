@@ -1,148 +1,61 @@
-import aiohttp
-import asyncio
-import os
-from aiohttp import web
-from datetime import datetime
-import subprocess
-from functools import wraps
-import aiofiles
 from aiohttp.web import Request
 from aiohttp.web import Response
+from aiohttp.web import StreamResponse
+
 from ....htserver import exposed_http
-from ....htserver import exposed_ws
 from ....htserver import make_json_response
-from ....htserver import WsSession
-from ....logging import get_logger
-from ....validators import raise_error
-import shutil
-class FlashifwiApi:
-    def __init__(self) -> None:
-        pass
-    # Asynchronous function to run shell commands
-    async def run_command(self,command):
-        try:
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            output, error = await process.communicate()
-            return process.returncode, output.decode('utf-8'), error.decode('utf-8')
-        except Exception as e:
-            return 1, "", str(e)
-
-    # Asynchronous function to identify the flash chip
-    async def identify_flash_chip(self, programmer):
-        command = f"flashrom -p {programmer}"
-        return await self.run_command(command)
-
-    # Asynchronous function to flash firmware (commented section added)
-    async def flash_firmware(self, programmer, firmware_file):
-        command = f"flashrom -p {programmer} -w {firmware_file}"
-        return await self.run_command(command)
-
-    # Asynchronous function to verify flashing (commented section added)
-    async def verify_flashing(self, programmer, firmware_file):
-        command = f"flashrom -p {programmer} -r readback.bin && diff {firmware_file} readback.bin"
-        return await self.run_command(command)
-
-    # Asynchronous function to reset SPI
-    async def reset_spi(self):
-        await self.run_command("sudo systemctl restart spi")
-        await asyncio.sleep(2)  # Increase delay to ensure SPI is reset
-
-    # Asynchronous function to save output to a file
-    async def save_output_to_file(self, file_path, content):
-        async with aiofiles.open(file_path, 'a') as f:
-            await f.write(content + '\n')
-
-    async def has_enough_space(self, path, required_space_mb):
-        total, used, free= shutil.disk_usage(path)
-        return free // (1024 * 1024) >= required_space_mb
-
-    # Exposed endpoint for flashing IFWI
-    @exposed_http('GET', '/flash_ifwi')
-    async def flash_ifwi(self, request):
-        try:
-            #log_dir= "/binfile"
-            #if not await self.has_enough_space(log_dir, 10):
-            #    raise Exception("no enough space in dir")
-            # Extract the IFWI file path from the GET request query parameters
-            firmware_file = request.query.get('ifwi_file')
+from ....htserver import start_streaming
+from ....htserver import stream_json
 
-            # Programmer setup
-            programmer = "linux_spi:dev=/dev/spidev0.0,spispeed=5000"
+from ....validators.basic import valid_bool
+from ....validators.basic import valid_stripped_string
+from ....validators.basic import valid_stripped_string_not_empty
 
-            # Create a timestamped log file
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_log = f"/home/kvmd-webterm/output_log_{timestamp}.txt"
+from ..flasher import FlashJobQueue
 
-            # Check if the firmware file exists
-            if not os.path.exists(firmware_file):
-                error_message = f"Firmware file {firmware_file} does not exist."
-                await self.save_output_to_file(output_log, error_message)
-                return make_json_response({"error": error_message}, status=400)
 
-            # Set GPIO 8 to output mode
-            ret_code, output, error = await self.run_command("raspi-gpio set 8 op")
-            if ret_code != 0:
-                error_message = f"Error setting GPIO 8 to output mode: {error}"
-                await self.save_output_to_file(output_log, error_message)
-                return make_json_response({"error": error_message}, status=500)
-            await self.save_output_to_file(output_log, "GPIO 8 set to output mode.")
-
-            # Identify Flash Chip
-            await self.reset_spi()  # Reset SPI interface before identifying the flash chip
-            ret_code, output, error = await self.identify_flash_chip(programmer)
-            await self.save_output_to_file(output_log, output)
-            if "unknown SPI chip" in output or "NOT WORKING" in output:
-                error_message = "Error: Unknown or unsupported SPI chip detected."
-                await self.save_output_to_file(output_log, error_message)
-                return make_json_response({"error": error_message}, status=400)
-            if ret_code != 0:
-                error_message = f"Error identifying flash chip: {error}"
-                await self.save_output_to_file(output_log, error_message)
-                return make_json_response({"error": error_message}, status=500)
-            await self.save_output_to_file(output_log, "Flash chip identified successfully.")
-            '''# Flash IFWI Firmware until "Erase/write done" is encountered
-            flash_successful = False
-            while not flash_successful:
-                await self.reset_spi()  # Reset SPI interface before flashing the firmware
-                await asyncio.sleep(5)  # Additional delay to ensure SPI is ready
-                ret_code, output, error = await self.flash_firmware(programmer, firmware_file)
-                await self.save_output_to_file(output_log, output)
-                if "Erase/write done" in output:
-                    flash_successful = True
-                if ret_code != 0:
-                    error_message = f"Error flashing firmware: {error}"
-                    await self.save_output_to_file(output_log, error_message)
-                    return web.json_response({"error": error_message}, status=500)
-
-            success_message = "Firmware flashing successful."
-            await self.save_output_to_file(output_log, success_message)
-
-            # Verify Flashing
-            await self.reset_spi()  # Reset SPI interface before verifying the flashing
-            await asyncio.sleep(5)  # Additional delay to ensure SPI is ready
-            ret_code, output, error = await self.verify_flashing(programmer, firmware_file)
-            await self.save_output_to_file(output_log, output)
-            if ret_code != 0:
-                error_message = f"Error verifying flashing: {error}"
-                await self.save_output_to_file(output_log, error_message)
-                return web.json_response({"error": error_message}, status=500)
-
-            success_message = "Flashing verification successful."
-            await self.save_output_to_file(output_log, success_message)'''
-
-            # Set GPIO 8 to input mode
-            ret_code, output, error = await self.run_command("raspi-gpio set 8 ip")
-            if ret_code != 0:
-                error_message = f"Error setting GPIO 8 to input mode: {error}"
-                await self.save_output_to_file(output_log, error_message)
-                return make_json_response({"error": error_message}, status=500)
-            await self.save_output_to_file(output_log, "GPIO 8 set to input mode.")
-
-            return make_json_response({"message": "Operation successful"}, status=200)
-
-        except Exception as e:
-            return make_json_response({"Space error": str(e)}, status=500)
+class FlashifwiApi:
+    def __init__(self, flasher: FlashJobQueue) -> None:
+        self.__flasher = flasher
+
+    # Queues the flash job and returns its id immediately. With ?stream=1 the progress
+    # is streamed as NDJSON until the job is finished. It's also available as flash_state on /ws.
+    # It's a POST since it rewrites the target's SPI flash, a prefetched link must not trigger it.
+    @exposed_http('POST', '/flash_ifwi')
+    async def flash_ifwi(self, request: Request) -> StreamResponse:
+        job = await self.__flasher.add_job(
+            path=valid_stripped_string_not_empty(request.query.get('ifwi_file'), name="ifwi_file"),
+            sha256=valid_stripped_string(request.query.get('sha256', '')),
+        )
+        if valid_bool(request.query.get('stream', False)):
+            return (await self.__stream_job(request, job.job_id))
+        return make_json_response({"message": "Job is queued", "job": job.get_state()})
+
+    @exposed_http('GET', '/flash_ifwi/jobs')
+    async def get_jobs(self, _: Request) -> Response:
+        return make_json_response({"jobs": [job.get_state() for job in self.__flasher.get_jobs()]})
+
+    @exposed_http('GET', '/flash_ifwi/job')
+    async def get_job(self, request: Request) -> Response:
+        job = self.__flasher.get_job(valid_stripped_string_not_empty(request.query.get('id'), name="job id"))
+        return make_json_response({
+            **job.get_state(),
+            "log": list(job.log),
+        })
+
+    @exposed_http('GET', '/flash_ifwi/progress')
+    async def get_progress(self, request: Request) -> StreamResponse:
+        job_id = valid_stripped_string_not_empty(request.query.get('id'), name="job id")
+        self.__flasher.get_job(job_id)  # Check it before the streaming
+        return (await self.__stream_job(request, job_id))
+
+    @exposed_http('POST', '/flash_ifwi/cancel')
+    async def cancel_job(self, request: Request) -> Response:
+        await self.__flasher.cancel_job(valid_stripped_string_not_empty(request.query.get('id'), name="job id"))
+        return make_json_response()
+
+    async def __stream_job(self, request: Request, job_id: str) -> StreamResponse:
+        response = await start_streaming(request, "application/x-ndjson")
+        async for state in self.__flasher.watch_job(job_id):
+            await stream_json(response, state, (state["state"] not in ["failed", "cancelled"]))
+        return response
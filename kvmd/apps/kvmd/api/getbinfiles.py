@@ -1,35 +1,73 @@
-import os
-from aiohttp import web
 from aiohttp.web import Request
 from aiohttp.web import Response
+
 from ....logging import get_logger
 from ....htserver import exposed_http
-from ....htserver import exposed_ws
 from ....htserver import make_json_response
-from ....htserver import WsSession
-from ....logging import get_logger
-from ....validators import raise_error
 
-class GetbinfilesApi:
+from ....errors import OperationError
+
+from ....validators import ValidatorError
+from ....validators.basic import valid_int_f0
+from ....validators.basic import valid_stripped_string
+
+from ..firmware import FirmwareCatalog
+from ..firmware import FirmwareImage
+
+
+class FirmwareImageNotFoundError(OperationError):
     def __init__(self) -> None:
-        pass
-    async def find_bin_files(self,start_directory='/binfile'):
-        bin_files = []
-        for dirpath, _, filenames in os.walk(start_directory):
-            for filename in filenames:
-                if filename.endswith('.bin'):
-                    full_path = os.path.join(dirpath, filename)
-                    bin_files.append(full_path)
-        get_logger(0).info(f"Found bin files: {bin_files}")
-        return bin_files
+        super().__init__("Firmware image is not found")
+
+
+class GetbinfilesApi:
+    def __init__(self, catalog: FirmwareCatalog) -> None:
+        self.__catalog = catalog
+
+    async def find_bin_files(self, request: Request) -> tuple[int, int, list[FirmwareImage]]:
+        # Filters: ?prefix=IFWI/ and/or ?glob=*/MTL*.bin (both are relative to the catalog root),
+        # paging: ?offset=N&limit=M (limit=0 for everything).
+        offset = valid_int_f0(request.query.get("offset", 0))
+        (total, images) = await self.__catalog.get_images(
+            prefix=valid_stripped_string(request.query.get("prefix", "")),
+            pattern=valid_stripped_string(request.query.get("glob", "")),
+            offset=offset,
+            limit=valid_int_f0(request.query.get("limit", 0)),
+        )
+        return (total, offset, images)
 
     @exposed_http('GET', '/bin-files')
-    async def get_bin_files(self,request: Request) -> Response:
+    async def get_bin_files(self, request: Request) -> Response:
         try:
-            bin_files = await self.find_bin_files()
-            return make_json_response(bin_files,wrap_result=False)
-            # return make_json_response({"ok": True, "result": bin_files})
-            #return make_json_response(result=bin_files, wrap_result=False)
+            (_, _, images) = await self.find_bin_files(request)
+            return make_json_response([image.path for image in images], wrap_result=False)  # type: ignore
+        except (ValidatorError, OperationError):
+            raise  # 400 like /bin-files/info
         except Exception as e:
             get_logger(0).error(f"Request processing error: {str(e)}", exc_info=True)
             return make_json_response({"error": "An error occurred processing the request."}, status=500)
+
+    @exposed_http('GET', '/bin-files/info')
+    async def get_bin_files_info(self, request: Request) -> Response:
+        (total, offset, images) = await self.find_bin_files(request)
+        return make_json_response({
+            "total": total,
+            "offset": offset,
+            "files": [
+                {
+                    "path": image.path,
+                    "name": image.name,
+                    "size": image.size,
+                    "mtime": image.mtime,
+                    "sha256": self.__catalog.get_cached_sha256(image),
+                }
+                for image in images
+            ],
+        })
+
+    @exposed_http('GET', '/bin-files/sha256')
+    async def get_bin_file_sha256(self, request: Request) -> Response:
+        image = await self.__catalog.get_image(valid_stripped_string(request.query.get("path", "")))
+        if image is None:
+            raise FirmwareImageNotFoundError()
+        return make_json_response({"path": image.path, "sha256": (await self.__catalog.get_sha256(image))})
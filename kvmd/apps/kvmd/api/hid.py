@@ -26,9 +26,7 @@ import functools
 import struct
 import serial
 import asyncio
-import subprocess
 from typing import Callable
-import re
 from aiohttp.web import Request
 from aiohttp.web import Response
 from .simulationPercent  import write
@@ -56,6 +54,9 @@ from ....validators.hid import valid_hid_mouse_move
 from ....validators.hid import valid_hid_mouse_button
 from ....validators.hid import valid_hid_mouse_delta
 
+from ..i2cmux import I2cMux
+from ..i2cmux import make_input_status
+
 
 
 
@@ -64,6 +65,7 @@ class HidApi:
     def __init__(
         self,
         hid: BaseHid,
+        i2c_mux: I2cMux,
 
         keymap_path: str,
         ignore_keys: list[str],
@@ -73,6 +75,7 @@ class HidApi:
     ) -> None:
 
         self.__hid = hid
+        self.__i2c_mux = i2c_mux
 
         self.__keymaps_dir_path = os.path.dirname(keymap_path)
         self.__default_keymap_name = os.path.basename(keymap_path)
@@ -85,41 +88,14 @@ class HidApi:
 
     # =====
 
-    def execute_i2cset(self, address, register, value):
-
-        # subprocess.run(["i2cset", "-y", "1", str(address), str(register), str(value)])
-        subprocess.run(["i2cset", "-y", "1", hex(address), hex(register), hex(value)])
-
-
-    def execute_i2cget(self, address, register):
-        #result = subprocess.run(["i2cget", "-y", "1", hex(address), hex(register)], capture_output=True, text=True)
-        #result = subprocess.run(["i2cget", "-y", "1", str(address), str(register)], capture_output=True, text=True)
-        result = subprocess.run(["i2cget", "-y", "1", hex(address), hex(register)], capture_output=True, text=True)
-        return result.stdout.strip()
-
-    # def prepare_device(self, channel):
-    #     self.execute_i2cset(0x72, 0x00, 0x03)
-    #     # self.execute_i2cset(0x72, 0x00, 1 << channel)
-    #     self.execute_i2cset(0x24, 0x12, 0x00)
-
-    def select_mux_channel(self,channel):
-        subprocess.run(["i2cset", "-y", "1", "0x72", "0x00", hex(1 << channel)])
-
     @exposed_http("GET", "/hid/system_state")
     async def __system_state(self, _: Request) -> Response:
-        # self.prepare_device(1)
-        self.select_mux_channel(1)
-        self.execute_i2cset(0x24, 0x00, 0x3f)
-        self.execute_i2cset(0x24, 0x0c, 0xff)
-        input_status_hex = self.execute_i2cget(0x24, 0x12)
-        input_status_bin = bin(int(input_status_hex, 16))[2:].zfill(8)
-        self.execute_i2cset(0x24, 0x12, 0x00)
+        input_status = make_input_status(await self.__i2c_mux.get_input_status())
         return make_json_response({
-            'input_status_binary': input_status_bin,
-            'input_status_hexadecimal': input_status_hex
+            "input_status_binary": input_status["binary"],
+            "input_status_hexadecimal": input_status["hexadecimal"],
         })
 
-
     @exposed_http("GET", "/hid")
     async def __state_handler(self, _: Request) -> Response:
         return make_json_response(await self.__hid.get_state())
@@ -300,64 +276,7 @@ class HidApi:
         self.__send_mouse_delta_event(deltas, squash, handler)
 
     # =====
-    def is_integer(self, s):
-        try:
-            int(s)
-            return True
-        except ValueError:
-            return False
-
-    @exposed_http("GET", "/postcode/get_data")
-    async def __getData_handler(self, request: Request) -> Response:
-        values = request.query.get('lastline')
-       # with open('/output/minicom_output.txt', 'r') as file:
-        with open('/home/kvmd-webterm/postcodelog.txt', 'r', encoding='utf-8', errors='ignore') as file:
-            line_number = 1
-            api_line_number = int(values) if values and self.is_integer(values) else 1
-            pattern = re.compile(r"--- (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) ---")
-            last_match = None
-            match_line = 1
-            hex_data = []
-            for line in file:
-                if line_number >= api_line_number:
-                    match = pattern.search(line.strip())
-
-                    # If a match is found, update last_match
-                    if match:
-                        last_match = match
-                        match_line = line_number
-                        hex_data = []
-                    #else:
-                    elif line.strip():
-                        print(f"Line {line_number}: {line.strip()}")
-                        hex_data.append(f"{line.strip()[-4:]}")
-
-                # Increment line number
-                line_number += 1
-
-                # If a match was found, print the last occurrence
-        if last_match:
-                #print("Last occurrence found on " + str(match_line) + " : ", last_match.group(1))
-                #print(line_number, hex_data)
-            return make_json_response({"Linenumber":line_number,"hexdata":hex_data})
-        else:
-                #print("Pattern not found in the file.")
-                #print(line_number, hex_data)
-            return make_json_response({"Linenumber":line_number,"hexdata":hex_data})
-
-    @exposed_http("GET", "/postcode/get_logs")
-    async def __getlog_handler(self, request: Request) -> Response:
-        api_response = []
-        with open('/home/kvmd-webterm/archived_logs.txt', 'r', encoding='utf-8', errors='ignore') as file:
-            for line in file:
-                if not line.startswith('---'):
-                    value = re.sub(r'^\d+\) |[\r]', '', line)
-                    cleaned_value = value.strip()
-                    if cleaned_value:
-
-                        api_response.append(cleaned_value)
-
-        return make_json_response({"Logs":api_response})
+
     @exposed_http("POST", "/hid/events/send_key")
     async def __events_send_key_handler(self, request: Request) -> Response:
         key = valid_hid_key(request.query.get("key"))
@@ -1,39 +1,14 @@
-import asyncio
 from .usbserial import UsbserialApi
 from aiohttp.web import Request, Response
 from ....htserver import exposed_http, make_json_response
-from serial import SerialException
 
 class LanApi:
-    def __init__(self, usb_serial_api=None) -> None:
-        self.usb_serial_api = usb_serial_api or UsbserialApi()
+    def __init__(self, usb_serial_api: UsbserialApi) -> None:
+        self.usb_serial_api = usb_serial_api
 
     async def send_serial_command(self, command):
         """Send a command to the serial API and return the response."""
-        try:
-            await self.usb_serial_api.init_serial_connection()
-            if not self.usb_serial_api.serial_reader or not self.usb_serial_api.serial_writer:
-                return {"error": "Failed to open serial connection"}
-
-            # Write the command to the serial port
-            await self.usb_serial_api.serial_write(command)
-            await asyncio.sleep(10)
-
-            async with self.usb_serial_api.lock:
-                response = self.usb_serial_api.response_data.strip()
-                self.usb_serial_api.response_data = ""  # Clear for the next command
-
-            if not response:
-                return {"error": "No response from serial device"}
-
-            return {"message": "Command processed successfully", "response": response}
-
-        except SerialException as e:
-            return {"error": f"Serial communication error: {str(e)}"}
-
-        finally:
-            if self.usb_serial_api.serial_writer:
-                self.usb_serial_api.serial_writer.close()
+        return await self.usb_serial_api.send_serial_command(command)
 
     # Retrieve LAN Adapter Information
     async def lan_adapter_information_logic(self, os, location, interface):
@@ -237,6 +212,19 @@ class LanApi:
             return make_json_response(result)
         return make_json_response({"error": "Endpoint applicable only for target location"})
 
+    def get_testcases(self) -> dict:
+        """Test cases runnable through /testcases/run, keyed by their endpoint name."""
+        return {
+            "lan_adapter_information": (lambda os, location, params: self.lan_adapter_information_logic(os, location, params.get('interface', 'enp1s0'))),
+            "lan_adapter_driver_info": (lambda os, location, params: self.lan_adapter_driver_info_logic(os, location, params.get('interface', 'enp1s0'))),
+            "lan_adapter_status": (lambda os, location, params: self.lan_adapter_status_logic(os, location)),
+            "lan_ip_configuration": (lambda os, location, params: self.lan_ip_configuration_logic(os, location, params.get('interface', 'enp1s0'))),
+            "lan_power_management": (lambda os, location, params: self.lan_power_management_logic(os, location)),
+            "lan_mac_address": (lambda os, location, params: self.lan_mac_address_logic(os, location, params.get('interface', 'enp1s0'))),
+            "lan_static_ip_configuration": (lambda os, location, params: self.lan_static_ip_configuration_logic(os, location, params.get('interface', 'enp1s0'))),
+            "lan_ping": (lambda os, location, params: self.lan_ping_logic(os, location, params.get('target_ip'))),
+        }
+
     # Utility function to get parameters
     async def get_params(self, request: Request) -> Response:
         location = request.rel_url.query.get('location', 'target')
@@ -1,38 +1,14 @@
-import asyncio
 from .usbserial import UsbserialApi
 from aiohttp.web import Request, Response
 from ....htserver import exposed_http, make_json_response
-from serial import SerialException
 
 class SleepstateApi:
-    def __init__(self, usb_serial_api=None) -> None:
-        self.usb_serial_api = usb_serial_api or UsbserialApi()
+    def __init__(self, usb_serial_api: UsbserialApi) -> None:
+        self.usb_serial_api = usb_serial_api
 
     async def send_serial_command(self, command):
         """Send a command to the serial API and return the response."""
-        try:
-            await self.usb_serial_api.init_serial_connection()
-            if not self.usb_serial_api.serial_reader or not self.usb_serial_api.serial_writer:
-                return {"error": "Failed to open serial connection"}
-
-            await self.usb_serial_api.serial_write(command)
-            await asyncio.sleep(10)
-
-            async with self.usb_serial_api.lock:
-                response = self.usb_serial_api.response_data.strip()
-                self.usb_serial_api.response_data = ""
-
-            if not response:
-                return {"error": "No response from serial device"}
-
-            return {"message": "Command processed successfully", "response": response}
-
-        except SerialException as e:
-            return {"error": f"Serial communication error: {str(e)}"}
-
-        finally:
-            if self.usb_serial_api.serial_writer:
-                self.usb_serial_api.serial_writer.close()
+        return await self.usb_serial_api.send_serial_command(command)
 
     # Sleep State Logic
     async def manage_sleep_state_logic(self, os, state, location):
@@ -85,6 +61,12 @@ class SleepstateApi:
         result = await self.manage_sleep_state_logic(os, state, location)
         return make_json_response(result)
 
+    def get_testcases(self) -> dict:
+        """Test cases runnable through /testcases/run, keyed by their endpoint name."""
+        return {
+            "manage_sleep_state": (lambda os, location, params: self.manage_sleep_state_logic(os, params.get('state', 'S3').upper(), location)),
+        }
+
     # Utility function to get parameters (if reused elsewhere)
     async def get_params(self, request: Request) -> tuple:
         location = request.rel_url.query.get('location', 'target')
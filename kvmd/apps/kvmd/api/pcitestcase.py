@@ -1,47 +1,18 @@
-import asyncio
 import aiohttp
 from .usbserial import UsbserialApi
 from aiohttp.web import Request
 from aiohttp.web import Response
 from ....htserver import exposed_http
 from ....htserver import make_json_response
-from serial import SerialException, SerialTimeoutException
 
 # PCIe API class
-# class PciApi:
-#     def __init__(self, usb_serial_api=None) -> None:
-#         if usb_serial_api is not None:
-#             self.usb_serial_api = UsbserialApi()
 class PciApi:
-    def __init__(self, usb_serial_api=None) -> None:
-        self.usb_serial_api = usb_serial_api or UsbserialApi() # Create a new instance if none is passed
+    def __init__(self, usb_serial_api: UsbserialApi) -> None:
+        self.usb_serial_api = usb_serial_api
+
     async def send_serial_command(self, command):
         """Send a command to the serial API and return the response."""
-        try:
-            await self.usb_serial_api.init_serial_connection()
-            if not self.usb_serial_api.serial_reader or not self.usb_serial_api.serial_writer:
-                return {"error": "Failed to open serial connection"}
-
-            # Write the command to the serial port
-            await self.usb_serial_api.serial_write(command)
-            await asyncio.sleep(10)  # Wait for the command to be processed
-
-            async with self.usb_serial_api.lock:
-                response = self.usb_serial_api.response_data.strip()
-                self.usb_serial_api.response_data = ""  # Clear for the next command
-
-            if not response:
-                return {"error": "No response from serial device"}
-
-            return {"message": "Command processed successfully", "response": response}
-
-        except (SerialException) as e:
-            return {"error": f"Serial communication error: {str(e)}"}
-
-        finally:
-            # Close the connection if open
-            if self.usb_serial_api.serial_writer:
-                self.usb_serial_api.serial_writer.close()
+        return await self.usb_serial_api.send_serial_command(command)
 
     async def enumerate_device_logic(self, os, location):
         """Enumerate PCI devices based on OS over serial"""
@@ -257,6 +228,20 @@ class PciApi:
             return make_json_response(result)
         return make_json_response({"error": "Endpoint applicable only for target location"})
 
+    def get_testcases(self) -> dict:
+        """Test cases runnable through /testcases/run, keyed by their endpoint name."""
+        return {
+            "pci_enumerate_device": (lambda os, location, params: self.enumerate_device_logic(os, location)),
+            "pci_description_filter": (lambda os, location, params: self.pci_description_filter_logic(os, location)),
+            "pci_check_driver_info": (lambda os, location, params: self.check_driver_info_logic(os, location)),
+            "pci_error_handling": (lambda os, location, params: self.error_handling_logic(os, location)),
+            "pci_power_management": (lambda os, location, params: self.power_management_logic(os, location)),
+            "pci_memory_info": (lambda os, location, params: self.memory_info_logic(os, location)),
+            "pci_baseboard_info": (lambda os, location, params: self.baseboard_info_logic(os, location)),
+            "pci_check_configuration_space": (lambda os, location, params: self.check_configuration_space_logic(os, location)),
+            "pci_check_configuration_space_segment": (lambda os, location, params: self.check_configuration_space_segment_logic(os, location)),
+        }
+
     # Helper to get parameters
     async def get_params(self, request: Request) -> Response:
         location = request.rel_url.query.get('location', 'target')
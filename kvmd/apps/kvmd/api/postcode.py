@@ -0,0 +1,84 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+import dataclasses
+
+from aiohttp.web import Request
+from aiohttp.web import Response
+
+from ....errors import OperationError
+
+from ....htserver import exposed_http
+from ....htserver import make_json_response
+
+from ....validators.basic import valid_int_f0
+from ....validators.basic import valid_int_f1
+from ....validators.kvm import valid_postcode_time
+
+from ..postcode import PostcodeReader
+from ..postcodecapture import PostcodeCapture
+
+
+# =====
+class PostcodeCaptureDisabledError(OperationError):
+    def __init__(self) -> None:
+        super().__init__("Post-codes capture is disabled")
+
+
+class PostcodeApi:
+    def __init__(self, postcode_reader: PostcodeReader, postcode_capture: (PostcodeCapture | None)) -> None:
+        self.__postcode_reader = postcode_reader
+        self.__postcode_capture = postcode_capture
+
+    # =====
+
+    @exposed_http("GET", "/postcode/get_data")
+    async def __get_data_handler(self, request: Request) -> Response:
+        try:
+            line = max(int(request.query.get("lastline", 1)), 1)
+        except ValueError:
+            line = 1
+        (next_line, codes) = await self.__postcode_reader.get_codes(line)
+        return make_json_response({"Linenumber": next_line, "hexdata": codes})
+
+    @exposed_http("GET", "/postcode/get_logs")
+    async def __get_logs_handler(self, request: Request) -> Response:
+        since = request.query.get("since")
+        until = request.query.get("until")
+        logs = await self.__postcode_reader.read_archive(
+            since=(valid_postcode_time(since) if since else None),
+            until=(valid_postcode_time(until) if until else None),
+        )
+        return make_json_response({"Logs": logs})
+
+    @exposed_http("GET", "/postcode/codes")
+    async def __codes_handler(self, request: Request) -> Response:
+        if self.__postcode_capture is None:
+            raise PostcodeCaptureDisabledError()
+        if "since" in request.query:
+            records = self.__postcode_capture.get_since(valid_int_f0(request.query["since"]))
+        else:
+            records = self.__postcode_capture.get_latest(valid_int_f1(request.query.get("limit", 100)))
+        return make_json_response({
+            "seq": self.__postcode_capture.get_seq(),
+            "codes": [dataclasses.asdict(record) for record in records],
+        })
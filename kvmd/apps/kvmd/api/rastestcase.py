@@ -1,38 +1,14 @@
-import asyncio
 from .usbserial import UsbserialApi
 from aiohttp.web import Request, Response
 from ....htserver import exposed_http, make_json_response
-from serial import SerialException
 
 class RasApi:
-    def __init__(self, usb_serial_api=None) -> None:
-        self.usb_serial_api = usb_serial_api or UsbserialApi()
+    def __init__(self, usb_serial_api: UsbserialApi) -> None:
+        self.usb_serial_api = usb_serial_api
 
     async def send_serial_command(self, command):
         """Send a command to the serial API and return the response."""
-        try:
-            await self.usb_serial_api.init_serial_connection()
-            if not self.usb_serial_api.serial_reader or not self.usb_serial_api.serial_writer:
-                return {"error": "Failed to open serial connection"}
-
-            await self.usb_serial_api.serial_write(command)
-            await asyncio.sleep(10)
-
-            async with self.usb_serial_api.lock:
-                response = self.usb_serial_api.response_data.strip()
-                self.usb_serial_api.response_data = ""
-
-            if not response:
-                return {"error": "No response from serial device"}
-
-            return {"message": "Command processed successfully", "response": response}
-
-        except SerialException as e:
-            return {"error": f"Serial communication error: {str(e)}"}
-
-        finally:
-            if self.usb_serial_api.serial_writer:
-                self.usb_serial_api.serial_writer.close()
+        return await self.usb_serial_api.send_serial_command(command)
 
     # CPU Load and Status
     async def check_cpu_status_logic(self, os, location):
@@ -195,6 +171,18 @@ class RasApi:
         result = await self.check_system_events_logic(os, location)
         return make_json_response(result)
 
+    def get_testcases(self) -> dict:
+        """Test cases runnable through /testcases/run, keyed by their endpoint name."""
+        return {
+            "check_cpu_status": (lambda os, location, params: self.check_cpu_status_logic(os, location)),
+            "check_fan_status": (lambda os, location, params: self.check_fan_status_logic(os, location)),
+            "check_memory_info": (lambda os, location, params: self.check_memory_info_logic(os, location)),
+            "check_disk_status": (lambda os, location, params: self.check_disk_status_logic(os, location)),
+            "check_network_status": (lambda os, location, params: self.check_network_status_logic(os, location, params.get('interface', 'enp1s0'))),
+            "check_battery_status": (lambda os, location, params: self.check_battery_status_logic(os, location)),
+            "check_system_events": (lambda os, location, params: self.check_system_events_logic(os, location)),
+        }
+
     # Utility function to get parameters
     async def get_params(self, request: Request) -> tuple:
         location = request.rel_url.query.get('location', 'target')
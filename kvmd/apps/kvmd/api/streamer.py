@@ -20,9 +20,14 @@
 # ========================================================================== #
 
 
+import asyncio
+import time
+
 from aiohttp.web import Request
 from aiohttp.web import Response
 
+from ....errors import OperationError
+
 from ....htserver import UnavailableError
 from ....htserver import exposed_http
 from ....htserver import make_json_response
@@ -32,56 +37,72 @@ from ....validators.basic import valid_bool
 from ....validators.basic import valid_number
 from ....validators.basic import valid_int_f0
 from ....validators.basic import valid_string_list
+from ....validators.kvm import valid_ocr_regex
 from ....validators.kvm import valid_stream_quality
+from ....validators.kvm import valid_stream_fps
+from ....validators.kvm import valid_stream_resolution
+from ....validators.kvm import valid_stream_h264_bitrate
+from ....validators.kvm import valid_stream_h264_gop
 
 from ..streamer import Streamer
-from ..streamer2 import Streamer2
+from ..streamerpool import StreamerPool
 from ..ocr import Ocr
 
-from ....logging import get_logger
 
 # =====
+class StreamerQualityNotSupported(OperationError):
+    def __init__(self) -> None:
+        super().__init__("This streamer does not support quality settings")
+
+
+class StreamerResolutionNotSupported(OperationError):
+    def __init__(self) -> None:
+        super().__init__("This streamer does not support resolution settings")
+
+
+class StreamerH264NotSupported(OperationError):
+    def __init__(self) -> None:
+        super().__init__("This streamer does not support H264")
+
+
+# =====
+# Matches /streamer (the primary stream), /streamer/<id> and the legacy /streamer<id>
+_STREAM_PATH = "/streamer{stream_id:(/?[1-9][0-9]*)?}"
+
+
 class StreamerApi:
-    def __init__(self, streamer: Streamer, ocr: Ocr) -> None:
-        self.__streamer = streamer
+    def __init__(self, streamers: StreamerPool, ocr: Ocr) -> None:
+        self.__streamers = streamers
         self.__ocr = ocr
 
     # =====
 
-    @exposed_http("GET", "/streamer")
-    async def __state_handler(self, _: Request) -> Response:
-        logger = get_logger(0)
-        logger.info("Streamer response check",await self.__streamer.get_state())
-        return make_json_response(await self.__streamer.get_state())
+    @exposed_http("GET", _STREAM_PATH)
+    async def __state_handler(self, request: Request) -> Response:
+        return make_json_response(await self.__get_streamer(request).get_state())
 
-    @exposed_http("GET", "/streamer/snapshot")
+    @exposed_http("GET", f"{_STREAM_PATH}/snapshot")
     async def __take_snapshot_handler(self, request: Request) -> Response:
-        snapshot = await self.__streamer.take_snapshot(
+        streamer = self.__get_streamer(request)
+        snapshot = await streamer.take_snapshot(
             save=valid_bool(request.query.get("save", False)),
             load=valid_bool(request.query.get("load", False)),
             allow_offline=valid_bool(request.query.get("allow_offline", False)),
         )
         if snapshot:
             if valid_bool(request.query.get("ocr", False)):
-                langs = self.__ocr.get_available_langs()
                 return Response(
                     body=(await self.__ocr.recognize(
-                        data=snapshot.data,
-                        langs=valid_string_list(
-                            arg=str(request.query.get("ocr_langs", "")).strip(),
-                            subval=(lambda lang: check_string_in_list(lang, "OCR lang", langs)),
-                            name="OCR langs list",
-                        ),
-                        left=int(valid_number(request.query.get("ocr_left", -1))),
-                        top=int(valid_number(request.query.get("ocr_top", -1))),
-                        right=int(valid_number(request.query.get("ocr_right", -1))),
-                        bottom=int(valid_number(request.query.get("ocr_bottom", -1))),
+                        snapshot.data,
+                        self.__valid_ocr_langs(request),
+                        *self.__valid_ocr_roi(request),
                     )),
                     headers=dict(snapshot.headers),
                     content_type="text/plain",
                 )
             elif valid_bool(request.query.get("preview", False)):
-                data = await snapshot.make_preview(
+                data = await streamer.make_preview(
+                    snapshot=snapshot,
                     max_width=valid_int_f0(request.query.get("preview_max_width", 0)),
                     max_height=valid_int_f0(request.query.get("preview_max_height", 0)),
                     quality=valid_stream_quality(request.query.get("preview_quality", 80)),
@@ -95,11 +116,46 @@ class StreamerApi:
             )
         raise UnavailableError()
 
-    @exposed_http("DELETE", "/streamer/snapshot")
-    async def __remove_snapshot_handler(self, _: Request) -> Response:
-        self.__streamer.remove_snapshot()
+    @exposed_http("DELETE", f"{_STREAM_PATH}/snapshot")
+    async def __remove_snapshot_handler(self, request: Request) -> Response:
+        self.__get_streamer(request).remove_snapshot()
+        return make_json_response()
+
+    @exposed_http("POST", f"{_STREAM_PATH}/set_params")
+    async def __set_params_handler(self, request: Request) -> Response:
+        stream_id = self.__get_stream_id(request)
+        current_params = self.__streamers.get_streamer(stream_id).get_params()
+        new_params: dict = {}
+        for (name, validator, exc_cls) in [
+            ("quality", valid_stream_quality, StreamerQualityNotSupported),
+            ("desired_fps", valid_stream_fps, None),
+            ("resolution", valid_stream_resolution, StreamerResolutionNotSupported),
+            ("h264_bitrate", valid_stream_h264_bitrate, StreamerH264NotSupported),
+            ("h264_gop", valid_stream_h264_gop, StreamerH264NotSupported),
+        ]:
+            value = request.query.get(name)
+            if value:
+                if name not in current_params:
+                    assert exc_cls is not None, name
+                    raise exc_cls()
+                value = validator(value)  # type: ignore
+                if current_params[name] != value:
+                    new_params[name] = value
+        self.__streamers.set_params(stream_id, new_params)
         return make_json_response()
 
+    @exposed_http("POST", f"{_STREAM_PATH}/reset")
+    async def __reset_handler(self, request: Request) -> Response:
+        self.__streamers.reset(self.__get_stream_id(request))
+        return make_json_response()
+
+    def __get_stream_id(self, request: Request) -> str:
+        stream_id = (request.match_info["stream_id"].lstrip("/") or StreamerPool.PRIMARY_ID)
+        return check_string_in_list(stream_id, "Stream id", self.__streamers.get_ids())
+
+    def __get_streamer(self, request: Request) -> Streamer:
+        return self.__streamers.get_streamer(self.__get_stream_id(request))
+
     # =====
 
     async def get_ocr(self) -> dict:  # XXX: Ugly hack
@@ -122,3 +178,65 @@ class StreamerApi:
     @exposed_http("GET", "/streamer/ocr")
     async def __ocr_handler(self, _: Request) -> Response:
         return make_json_response(await self.get_ocr())
+
+    @exposed_http("GET", "/streamer/ocr/wait")
+    async def __ocr_wait_handler(self, request: Request) -> Response:
+        stream_id = check_string_in_list(
+            arg=request.query.get("stream", StreamerPool.PRIMARY_ID),
+            name="Stream id",
+            variants=self.__streamers.get_ids(),
+        )
+        regex = valid_ocr_regex(request.query.get("regex"))
+        timeout = valid_number(request.query.get("timeout", 10), min=0, max=600, type=float, name="OCR wait timeout")
+        interval = valid_number(request.query.get("interval", 0.2), min=0.05, max=10, type=float, name="OCR wait interval")
+        langs = self.__valid_ocr_langs(request)
+        roi = self.__valid_ocr_roi(request)
+
+        streamer = self.__streamers.get_streamer(stream_id)
+        started_ts = time.monotonic()
+        prev_thumbnail = b""
+        text = ""
+        recognitions = 0
+        while True:
+            snapshot = await streamer.take_snapshot(save=False, load=False, allow_offline=False)
+            if snapshot:
+                # OCR is expensive, so it runs only if the region has really changed since the last recognition
+                thumbnail = await self.__ocr.make_roi_thumbnail(snapshot.data, *roi)
+                if not prev_thumbnail or self.__ocr.is_roi_changed(prev_thumbnail, thumbnail):
+                    prev_thumbnail = thumbnail
+                    text = await self.__ocr.recognize(snapshot.data, langs, *roi)
+                    recognitions += 1
+                    match = regex.search(text)
+                    if match:
+                        return make_json_response({
+                            "matched": True,
+                            "match": match.group(0),
+                            "text": text,
+                            "recognitions": recognitions,
+                            "duration": round(time.monotonic() - started_ts, 3),
+                        })
+
+            remaining = timeout - (time.monotonic() - started_ts)
+            if remaining <= 0:
+                return make_json_response({
+                    "matched": False,
+                    "match": None,
+                    "text": text,
+                    "recognitions": recognitions,
+                    "duration": round(time.monotonic() - started_ts, 3),
+                })
+            await asyncio.sleep(min(interval, remaining))
+
+    def __valid_ocr_langs(self, request: Request) -> list[str]:
+        langs = self.__ocr.get_available_langs()
+        return valid_string_list(
+            arg=str(request.query.get("ocr_langs", "")).strip(),
+            subval=(lambda lang: check_string_in_list(lang, "OCR lang", langs)),
+            name="OCR langs list",
+        )
+
+    def __valid_ocr_roi(self, request: Request) -> tuple[int, int, int, int]:
+        return tuple(  # type: ignore
+            int(valid_number(request.query.get(f"ocr_{side}", -1)))
+            for side in ["left", "top", "right", "bottom"]
+        )
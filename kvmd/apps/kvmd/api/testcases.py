@@ -0,0 +1,103 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+import time
+
+from typing import Callable
+from typing import Awaitable
+
+from aiohttp.web import Request
+from aiohttp.web import Response
+from aiohttp.web import StreamResponse
+
+from ....logging import get_logger
+
+from ....htserver import exposed_http
+from ....htserver import make_json_response
+from ....htserver import start_streaming
+from ....htserver import stream_json
+
+from ....validators import check_string_in_list
+from ....validators.basic import valid_string_list
+
+from ..serialbroker import SerialBroker
+
+
+# =====
+class TestcasesApi:
+    def __init__(self, serial_broker: SerialBroker, *apis: object) -> None:
+        self.__serial_broker = serial_broker
+        self.__cases: dict[str, Callable[[str, str, dict], Awaitable[dict]]] = {}
+        for api in apis:
+            cases = getattr(api, "get_testcases")()
+            assert not (set(cases) & set(self.__cases)), cases
+            self.__cases.update(cases)
+
+    # =====
+
+    @exposed_http("GET", "/testcases")
+    async def __state_handler(self, _: Request) -> Response:
+        return make_json_response({"testcases": sorted(self.__cases)})
+
+    @exposed_http("POST", "/testcases/run")
+    async def __run_handler(self, request: Request) -> StreamResponse:
+        cases = valid_string_list(
+            request.query.get("cases"),
+            subval=(lambda arg: check_string_in_list(arg, "Test case", self.__cases)),
+            name="test cases list",
+        )
+        # The same fallbacks as get_params() of the per-case endpoints
+        os = request.query.get("os", "windows").lower()
+        if os not in ["windows", "linux", "edk"]:
+            os = "windows"
+        location = request.query.get("location", "target")
+        if location not in ["host", "target"]:
+            location = "target"
+        params = dict(request.query)
+
+        get_logger(0).info("Running %d test cases for os=%s, location=%s ...", len(cases), os, location)
+        response = await start_streaming(request, "application/x-ndjson")
+        passed = 0
+        started_ts = time.monotonic()
+        async with self.__serial_broker.session():  # Don't let the other clients interleave with the cases
+            for case in cases:
+                case_ts = time.monotonic()
+                try:
+                    result = await self.__cases[case](os, location, params)
+                except Exception as err:
+                    get_logger(0).exception("Test case %s failed", case)
+                    result = {"error": type(err).__name__, "error_msg": str(err)}
+                ok = ("error" not in result)
+                passed += int(ok)
+                await stream_json(response, {
+                    "case": case,
+                    "duration": round(time.monotonic() - case_ts, 3),
+                    **result,
+                }, ok)
+
+        await stream_json(response, {"summary": {
+            "total": len(cases),
+            "passed": passed,
+            "failed": (len(cases) - passed),
+            "duration": round(time.monotonic() - started_ts, 3),
+        }})
+        return response
@@ -1,162 +1,225 @@
 import asyncio
+import itertools
 import re
-import socket
-import threading
-import serial
-import os
-from aiohttp import web
-from functools import wraps
 from aiohttp.web import Request, Response
 from ....htserver import exposed_http, make_json_response
+from ....errors import OperationError
+from ....logging import get_logger
+from .usbserial import UsbserialApi
 
-serial_port_path = "/dev/ttyGS0"
-if os.path.exists(serial_port_path):
-    port = serial.Serial(serial_port_path, baudrate=115200, timeout=2, xonxoff=False)
-else:
-    print(f"Serial port {serial_port_path} not found.")
-# Initialize the serial port
-#port = serial.Serial("/dev/ttyGS0", baudrate=115200, timeout=2, xonxoff=False)
 
-# Regex to remove ANSI escape sequences
-regex = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+class UdpPeerUnavailableError(OperationError):
+    def __init__(self) -> None:
+        super().__init__("USB-Ethernet target is not synced")
 
-# Static nav value
-nav = '1'
-cond_var = 0
 
-# UDP Handler class (moved outside)
-class UdpHandler:
-    def __init__(self):
-        self.message = ""
-        self.port = None
-        self.address = None
-        self.lock = threading.Lock()
-        self.start_udp_server()
+_TAG_RE = re.compile(r"^#([0-9a-f]+) ?(.*)$", re.DOTALL)
+
 
-    def start_udp_server(self):
-        threading.Thread(target=self.udp_server, daemon=True).start()
+class _UdpRequest:
+    def __init__(self, rid: str) -> None:
+        self.rid = rid
+        self.lines: list[str] = []
+        self.done = asyncio.get_running_loop().create_future()
+        self.__quiet_timer: (asyncio.TimerHandle | None) = None
 
-    def set_port(self, port):
-        self.port = port
+    def finish(self, completed: bool=True) -> None:
+        if self.__quiet_timer is not None:
+            self.__quiet_timer.cancel()
+            self.__quiet_timer = None
+        if not self.done.done():
+            self.done.set_result(completed)
 
-    def set_address(self, address):
-        self.address = address
+    def finish_after(self, delay: float, completed: bool=True) -> None:
+        if self.__quiet_timer is not None:
+            self.__quiet_timer.cancel()
+        self.__quiet_timer = asyncio.get_running_loop().call_later(delay, self.finish, completed)
 
-    def set_message(self, message):
-        with self.lock:
-            self.message += message + '\n'
 
-    def get_message(self):
-        with self.lock:
-            return self.message
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, handler: "UdpHandler") -> None:
+        self.__handler = handler
 
-    def clear_message(self):
-        with self.lock:
-            self.message = ""
+    def datagram_received(self, data: bytes, addr: tuple) -> None:  # type: ignore
+        self.__handler._on_datagram(data, addr)  # pylint: disable=protected-access
 
-    def get_port(self):
-        return self.port
+    def error_received(self, exc: Exception) -> None:
+        get_logger(0).error("USB-Ethernet UDP error: %s", exc)
 
-    def get_address(self):
-        return self.address
+    def connection_lost(self, exc: (Exception | None)) -> None:
+        self.__handler._on_closed()  # pylint: disable=protected-access
 
-    # UDP server method
-    def udp_server(self):
-        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        udp_sock.bind(('190.20.20.2', 4444))  # Bind to the specified IP and port
 
+class UdpHandler:
+    """
+    Asynchronous command channel to the target's agent over the NCM link.
+
+    The target announces itself with a "SYNC" datagram and gets "SYNC" back.
+    A reply datagram may carry several lines, and a line equal to the end marker
+    (<END> by default) completes the request. The rest of the datagram is ignored.
+
+    In untagged mode (the default, the protocol of the existing agents) the command is sent as is.
+    The replies can't be told apart, so the commands are sent one by one and not pipelined.
+    The legacy agents never send the end marker, so the request also completes when no new
+    datagrams arrive within the quiet period after the reply, or within the reply timeout
+    if there is no reply at all.
+
+    The pipelining needs tagged mode (tagged: true) and an agent that supports it. Every command
+    is sent as "#<id> <cmd>" and the agent prefixes each reply line with the same "#<id> ",
+    so many commands can be in flight at once. Such agents must finish every reply
+    with "#<id> <END>", otherwise the request waits for the full timeout.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host: str,
+        port: int,
+        timeout: float,
+        reply_timeout: float,
+        quiet: float,
+        end_marker: str,
+        tagged: bool,
+    ) -> None:
+
+        self.__host = host
+        self.__port = port
+        self.__timeout = timeout
+        self.__reply_timeout = reply_timeout
+        self.__quiet = quiet
+        self.__end_marker = end_marker
+        self.__tagged = tagged
+
+        self.__transport: (asyncio.DatagramTransport | None) = None
+        self.__closed: (asyncio.Future | None) = None
+        self.__peer: (tuple | None) = None
+        self.__requests: dict[str, _UdpRequest] = {}
+        self.__ids = itertools.count(1)
+        self.__untagged_lock = asyncio.Lock()
+
+    def get_peer(self) -> (tuple | None):
+        return self.__peer
+
+    async def execute(self, cmd: str, timeout: float=0.0) -> tuple[list[str], bool]:
+        if self.__tagged:
+            return (await self.__inner_execute(cmd, timeout))
+        async with self.__untagged_lock:
+            return (await self.__inner_execute(cmd, timeout))
+
+    async def __inner_execute(self, cmd: str, timeout: float) -> tuple[list[str], bool]:
+        if self.__transport is None or self.__peer is None:
+            raise UdpPeerUnavailableError()
+        request = _UdpRequest(f"{next(self.__ids):x}")
+        self.__requests[request.rid] = request
+        try:
+            payload = (f"#{request.rid} {cmd}" if self.__tagged else cmd)
+            self.__transport.sendto(payload.encode("utf-8"), self.__peer)
+            if not self.__tagged:
+                request.finish_after(self.__reply_timeout, completed=False)  # Rescheduled by the replies
+            try:
+                completed = await asyncio.wait_for(asyncio.shield(request.done), timeout=(timeout or self.__timeout))
+                return (request.lines, bool(completed))
+            except asyncio.TimeoutError:
+                return (request.lines, False)
+        finally:
+            request.finish()
+            self.__requests.pop(request.rid, None)
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        loop = asyncio.get_running_loop()
+        prev_error = ""
         while True:
-            data, addr = udp_sock.recvfrom(1024)
-            message = data.decode('utf-8').strip()
-            print(f"Received message: {message} from {addr}")
-
-            if message == "SYNC":
-                self.set_port(addr[1])
-                self.set_address(addr[0])
-                udp_sock.sendto(b"SYNC", addr)
+            try:
+                (transport, _) = await loop.create_datagram_endpoint(
+                    (lambda: _UdpProtocol(self)),
+                    local_addr=(self.__host, self.__port),
+                )
+            except OSError as err:
+                if str(err) != prev_error:
+                    logger.error("Can't bind USB-Ethernet UDP channel to %s:%d: %s", self.__host, self.__port, err)
+                    prev_error = str(err)
+                await asyncio.sleep(1)
+                continue
+            prev_error = ""
+
+            logger.info("USB-Ethernet UDP channel is listening on %s:%d", self.__host, self.__port)
+            self.__closed = loop.create_future()
+            self.__transport = transport
+            try:
+                await self.__closed
+            finally:
+                self.__transport = None
+                transport.close()
+                for request in self.__requests.values():
+                    request.finish(completed=False)
+            await asyncio.sleep(1)
+
+    def _on_closed(self) -> None:
+        if self.__closed is not None and not self.__closed.done():
+            self.__closed.set_result(None)
+
+    def _on_datagram(self, data: bytes, addr: tuple) -> None:
+        text = data.decode("utf-8", errors="ignore").strip()
+        if text == "SYNC":
+            if self.__peer != addr:
+                get_logger(0).info("USB-Ethernet target synced from %s:%d", addr[0], addr[1])
+            self.__peer = addr
+            assert self.__transport is not None
+            self.__transport.sendto(b"SYNC", addr)
+            return
+
+        untagged: (_UdpRequest | None) = None
+        if not self.__tagged:
+            untagged = next((request for request in self.__requests.values() if not request.done.done()), None)
+
+        for line in text.splitlines():
+            request = untagged
+            if self.__tagged:
+                match = _TAG_RE.match(line)
+                if match:
+                    request = self.__requests.get(match.group(1))
+                    line = match.group(2)
+
+            if request is None or request.done.done():
+                get_logger(0).debug("Dropped unexpected USB-Ethernet reply: %r", line)
+            elif line.strip() == self.__end_marker:
+                request.finish()
             else:
-                self.set_message(message)
+                request.lines.append(line.rstrip("\r"))
+
+        if untagged is not None and not untagged.done.done():
+            untagged.finish_after(self.__quiet)
 
 
 # Main UsbethernetApi class
 class UsbethernetApi:
-    def __init__(self,udphandler_api=None) -> None:
-        self.udp_handler = UdpHandler()
-        if udphandler_api is not None:
-            self.udp_handler = udphandler_api
-
-    async def taskRead(self):
-        global cond_var
-        cond_var = 1
-        data = port.readline()
-        while len(nav) != 0 and len(data) != 0:
-            data = regex.sub('', data.decode('ascii'))
-            if data == nav:
-                port.readall()
-                break
-            data = port.readline()
-        while len(nav) == 0 and len(data) != 0:
-            print(regex.sub('', data.decode('ascii')))
-            data = port.readline()
-        cond_var = 0
-
-    async def taskWrite(self, cmd):
-        global cond_var
-        port.flush()
-        if len(nav) == 0:
-            for byteChr in cmd:
-                port.write(str.encode(byteChr, 'ascii'))
-                await asyncio.sleep(0.25)
-            await asyncio.sleep(1)
-            port.write(str.encode('\r\n', 'ascii'))
-            await asyncio.sleep(1)
-        else:
-            port.write(str.encode(cmd, 'utf-8'))
-        while cond_var != 0:
-            await asyncio.sleep(0.1)
+    def __init__(self, usb_serial_api: UsbserialApi, udp_handler: UdpHandler) -> None:
+        self.usb_serial_api = usb_serial_api
+        self.udp_handler = udp_handler
 
     @exposed_http('GET', '/send_command')
     async def send_command(self, request: Request) -> Response:
-        global cond_var
         cmd = request.query.get('cmd')
 
         if not cmd:
             return make_json_response({"error": "No command provided"}, status=400)
 
-        read_thread = threading.Thread(target=asyncio.run, args=(self.taskRead(),))
-        write_thread = threading.Thread(target=asyncio.run, args=(self.taskWrite(cmd),))
+        result = await self.usb_serial_api.send_serial_command(cmd)
+        if "error" in result:
+            return make_json_response(result, status=500)
 
-        read_thread.start()
-        write_thread.start()
-
-        read_thread.join()
-        write_thread.join()
-
-        return make_json_response({"status": "Command processed successfully"})
+        return make_json_response({"status": "Command processed successfully", "response": result["response"]})
 
     @exposed_http('GET', '/ethernet')
     async def ethernet_usb(self, request: Request) -> Response:
         reqcmd = request.query.get('reqcmd')
 
         if reqcmd and reqcmd != "SYNC":
-            port = self.udp_handler.get_port()
-            address = self.udp_handler.get_address()
-
-            if port and address:
-                udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                udp_sock.sendto(reqcmd.encode('utf-8'), (address, port))
-
-                self.udp_handler.clear_message()  # Clear previous messages
-
-                # Wait for responses
-                await asyncio.sleep(1)  # 1 second delay to accumulate responses
-
-                response = self.udp_handler.get_message()
-                return make_json_response({"stdout": response}, status=200)
-            else:
+            try:
+                (lines, completed) = await self.udp_handler.execute(reqcmd)
+            except UdpPeerUnavailableError:
                 return make_json_response({"error": "Invalid port or address"}, status=400)
+            stdout = "".join(line + "\n" for line in lines)
+            return make_json_response({"stdout": stdout, "completed": completed}, status=200)
         else:
             return make_json_response({"error": "No command provided or SYNC message ignored"}, status=400)
-
-
-# The main entry point to register HTTP routes and run the web server can remain the same
@@ -20,11 +20,23 @@
 # ========================================================================== #
 
 
+import os
+import asyncio
+import hashlib
 import secrets
+import time
+
+from typing import Callable
+from typing import Coroutine
+from typing import Any
+
 import pyotp
 
 from ...logging import get_logger
 
+from ...inotify import InotifyMask
+from ...inotify import Inotify
+
 from ... import aiotools
 
 from ...plugins.auth import BaseAuthService
@@ -32,6 +44,8 @@ from ...plugins.auth import get_auth_service_class
 
 from ...htserver import HttpExposed
 
+from .tokens import TokenStore
+
 
 # =====
 class AuthManager:
@@ -48,6 +62,10 @@ class AuthManager:
         external_kwargs: dict,
 
         totp_secret_path: str,
+
+        cache_ttl: float,
+
+        tokens_kwargs: dict,
     ) -> None:
 
         self.__enabled = enabled
@@ -71,8 +89,15 @@ class AuthManager:
             get_logger().info("Using external auth service %r", self.__external_service.get_plugin_name())
 
         self.__totp_secret_path = totp_secret_path
+        self.__totp_secret = (self.__read_totp_secret() if enabled else "")
 
-        self.__tokens: dict[str, str] = {}  # {token: user}
+        # Verified credentials: {digest(user, passwd): expire_ts}. The salt is random
+        # for each process, so the digests are useless outside of it.
+        self.__cache_ttl = cache_ttl
+        self.__cache_salt = secrets.token_bytes(16)
+        self.__cache: dict[bytes, float] = {}
+
+        self.__tokens = TokenStore(**tokens_kwargs)
 
     def is_auth_enabled(self) -> bool:
         return self.__enabled
@@ -90,9 +115,19 @@ class AuthManager:
         assert self.__enabled
         assert self.__internal_service
 
+        cache_key = b""
+        if self.__cache_ttl > 0:
+            cache_key = hashlib.blake2b(
+                f"{user}\0{passwd}".encode("utf-8"),
+                key=self.__cache_salt,
+                digest_size=32,
+            ).digest()
+            expire_ts = self.__cache.get(cache_key, 0.0)
+            if expire_ts > time.monotonic():
+                return True
+
+        secret = self.__totp_secret
         if self.__totp_secret_path:
-            with open(self.__totp_secret_path) as file:
-                secret = file.read().strip()
             if secret:
                 code = passwd[-6:]
                 if not pyotp.TOTP(secret).verify(code):
@@ -108,6 +143,8 @@ class AuthManager:
         ok = (await service.authorize(user, passwd))
         if ok:
             get_logger().info("Authorized user %r via auth service %r", user, service.get_plugin_name())
+            if cache_key:
+                self.__put_cache(cache_key)
         else:
             get_logger().error("Got access denied for user %r from auth service %r", user, service.get_plugin_name())
         return ok
@@ -117,11 +154,7 @@ class AuthManager:
         assert user
         assert self.__enabled
         if (await self.authorize(user, passwd)):
-            for (token, token_user) in self.__tokens.items():
-                if user == token_user:
-                    return token
-            token = secrets.token_hex(32)
-            self.__tokens[token] = user
+            token = self.__tokens.issue(user)
             get_logger().info("Logged in user %r", user)
             return token
         else:
@@ -129,18 +162,95 @@ class AuthManager:
 
     def logout(self, token: str) -> None:
         assert self.__enabled
-        user = self.__tokens.pop(token, "")
+        user = self.__tokens.remove(token)
         if user:
             get_logger().info("Logged out user %r", user)
 
     def check(self, token: str) -> (str | None):
         assert self.__enabled
-        return self.__tokens.get(token)
+        return self.__tokens.check(token)
+
+    async def systask(self) -> None:
+        if not self.__enabled:
+            await aiotools.wait_infinite()
+        await asyncio.gather(self.__tokens.systask(), self.__watch_files_loop())
 
     @aiotools.atomic_fg
     async def cleanup(self) -> None:
         if self.__enabled:
+            await self.__tokens.flush()
             assert self.__internal_service
             await self.__internal_service.cleanup()
             if self.__external_service:
                 await self.__external_service.cleanup()
+
+    # =====
+
+    async def __watch_files_loop(self) -> None:
+        logger = get_logger(0)
+        while True:
+            try:
+                await self.__watch_files()
+            except Exception:
+                logger.exception("Unexpected auth files watcher error")
+            await asyncio.sleep(1)
+
+    async def __watch_files(self) -> None:
+        assert self.__internal_service
+        services = list(filter(None, [self.__internal_service, self.__external_service]))
+        reloaders = {
+            os.path.normpath(path): service.reload
+            for service in services
+            for path in service.get_watchable_paths()
+        }
+        if self.__totp_secret_path:
+            reloaders[os.path.normpath(self.__totp_secret_path)] = self.__reload_totp_secret
+        if not reloaders:
+            await aiotools.wait_infinite()
+
+        with Inotify() as inotify:
+            # The files are usually replaced by renaming, so the directories are watched
+            await inotify.watch(InotifyMask.ALL_MODIFY_EVENTS, *set(map(os.path.dirname, reloaders)))
+            for reload in reloaders.values():  # Don't miss the changes made before the watching
+                await self.__reload(reload)
+            while True:
+                event = await inotify.get_event(timeout=1)
+                if event is None:
+                    continue
+                if event.mask & (InotifyMask.DELETE_SELF | InotifyMask.MOVE_SELF | InotifyMask.UNMOUNT):
+                    get_logger(0).info("Got a big inotify event: %s; rewatching the auth files ...", event)
+                    return
+                reload = reloaders.get(event.path)
+                if reload is not None:
+                    get_logger(0).info("Auth file %s was changed, reloading ...", event.path)
+                    await self.__reload(reload)
+
+    async def __reload(self, reload: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        try:
+            await reload()
+        except Exception as err:
+            get_logger(0).error("Can't reload auth data, keeping the previous one: %s", err)
+        self.__cache.clear()  # The passwords or users may be changed, so drop everything anyway
+
+    async def __reload_totp_secret(self) -> None:
+        self.__totp_secret = await aiotools.run_async(self.__read_totp_secret)
+
+    def __read_totp_secret(self) -> str:
+        if not self.__totp_secret_path:
+            return ""
+        try:
+            with open(self.__totp_secret_path) as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return ""
+
+    def __put_cache(self, key: bytes) -> None:
+        now_ts = time.monotonic()
+        if len(self.__cache) >= 1024:
+            self.__cache = {
+                cached_key: expire_ts
+                for (cached_key, expire_ts) in self.__cache.items()
+                if expire_ts > now_ts
+            }
+        if len(self.__cache) < 1024:
+            self.__cache[key] = now_ts + self.__cache_ttl
@@ -0,0 +1,344 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+
+import asyncio
+import dataclasses
+import collections
+import time
+
+from typing import AsyncGenerator
+
+import serial_asyncio
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+
+from ... import aiotools
+from ... import aioproc
+
+from .postcodecapture import PostcodeCapture
+
+
+# =====
+class BatteryError(OperationError):
+    pass
+
+
+class BatteryLinkOfflineError(BatteryError):
+    def __init__(self) -> None:
+        super().__init__("Battery simulator link is offline")
+
+
+# =====
+def _make_crc16_table(poly: int) -> list[int]:
+    table: list[int] = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc >> 1) ^ poly if crc & 1 else crc >> 1)
+        table.append(crc)
+    return table
+
+
+_CRC16_DNP_TABLE = _make_crc16_table(0xA6BC)  # Reflected 0x3D65
+
+
+def crc16_dnp(data: bytes) -> int:
+    # The same as crcmod.mkCrcFun(0x13D65, 0xFFFF, True, 0xFFFF) used by the RP2040 side
+    crc = 0
+    for byte in data:
+        crc = (crc >> 8) ^ _CRC16_DNP_TABLE[(crc ^ byte) & 0xFF]
+    return (crc ^ 0xFFFF)
+
+
+_MAX_CAPACITY = 0x2303
+
+_MODE_FRAMES = {
+    "real": b"\x40\x01\n",
+    "detach": b"\x40\x03\n",
+    "simulated": b"\x40\x04\n",
+}
+
+
+def make_percent_frame(tag: int, percent: int) -> bytes:
+    value = f"{round(_MAX_CAPACITY * (percent / 100)):04x}"
+    payload = f"{tag}:{len(value)}:{value}"
+    return b"\x40\x02\x2C" + f"sta:2,{payload},{crc16_dnp(payload.encode()):04X}".encode("ascii") + b"\n"
+
+
+_AC_SOURCE_CMDS = [
+    ["raspi-gpio", "set", "24", "op", "dl"],
+    ["raspi-gpio", "set", "13", "op", "dl"],
+]
+
+
+# =====
+@dataclasses.dataclass
+class _FrameStats:
+    sent: int = 0
+    acked: int = 0
+    nacked: int = 0
+    lost: int = 0
+
+
+@dataclasses.dataclass
+class _Profile:
+    total: int
+    step: int = 0
+    state: str = "running"  # running, done, failed, stopped
+    error: str = ""
+    started_ts: float = dataclasses.field(default_factory=time.time)
+
+
+class BatteryLink:  # pylint: disable=too-many-instance-attributes
+    # The UART is kept opened, the frames are pipelined and the RP2040 acknowledgements
+    # are matched in order: at most "window" frames may be unacknowledged for "ack_timeout".
+    # If the port is the same as the post-codes one, it's shared with PostcodeCapture.
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        device_path: str,
+        speed: int,
+        tag: int,
+        ack_prefix: str,
+        nak_prefix: str,
+        ack_timeout: float,
+        window: int,
+        reconnect_delay: float,
+        capture: (PostcodeCapture | None),
+    ) -> None:
+
+        self.__device_path = device_path
+        self.__speed = speed
+        self.__tag = tag
+        self.__ack_prefix = ack_prefix.encode()
+        self.__nak_prefix = nak_prefix.encode()
+        self.__ack_timeout = ack_timeout
+        self.__reconnect_delay = reconnect_delay
+
+        self.__capture: (PostcodeCapture | None) = None
+        if capture is not None and capture.get_device_path() == device_path:
+            self.__capture = capture
+            capture.add_line_handler(self.__on_line)
+        self.__writer: (asyncio.StreamWriter | None) = None
+
+        self.__window = asyncio.Semaphore(window)
+        self.__pending: collections.deque[float] = collections.deque()  # Deadlines of the unacknowledged frames
+        self.__stats = _FrameStats()
+        self.__acks_missing = False
+        self.__ack_notifier = aiotools.AioNotifier()
+
+        self.__mode = ""
+        self.__percent: (int | None) = None
+        self.__profile: (_Profile | None) = None
+        self.__profile_task: (asyncio.Task | None) = None
+
+        self.__notifier = aiotools.AioNotifier()
+
+    def is_online(self) -> bool:
+        if self.__capture is not None:
+            return self.__capture.is_online()
+        return (self.__writer is not None)
+
+    async def set_mode(self, mode: str) -> None:
+        if mode == "ac_source":
+            for cmd in _AC_SOURCE_CMDS:
+                (proc, text) = await aioproc.read_process(cmd)
+                if proc.returncode != 0:
+                    raise BatteryError(f"Can't switch the AC source: {text}")
+        else:
+            await self.__send(_MODE_FRAMES[mode])
+        self.__mode = mode
+        self.__notifier.notify()
+
+    async def set_percent(self, percent: int) -> None:
+        assert 0 <= percent <= 100, percent
+        await self.__send(make_percent_frame(self.__tag, percent))
+        self.__percent = percent
+        self.__notifier.notify()
+
+    async def start_profile(self, points: list[tuple[float, int]]) -> None:
+        await self.stop_profile()
+        self.__profile = _Profile(total=len(points))
+        self.__profile_task = asyncio.create_task(self.__run_profile(self.__profile, points))
+        self.__notifier.notify()
+
+    async def stop_profile(self) -> None:
+        task = self.__profile_task
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    # =====
+
+    async def get_state(self) -> dict:
+        return {
+            "online": self.is_online(),
+            "mode": self.__mode,
+            "percent": self.__percent,
+            "frames": {
+                **dataclasses.asdict(self.__stats),
+                "pending": len(self.__pending),
+            },
+            "profile": (dataclasses.asdict(self.__profile) if self.__profile else None),
+        }
+
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
+        prev_state: dict = {}
+        while True:
+            state = await self.get_state()
+            if state != prev_state:
+                yield state
+                prev_state = state
+            await self.__notifier.wait()
+
+    async def systask(self) -> None:
+        acker = asyncio.create_task(self.__ack_timeout_loop())
+        try:
+            if self.__capture is not None:
+                while True:  # Follow the online state of the shared port
+                    await asyncio.sleep(self.__reconnect_delay)
+                    self.__notifier.notify()
+            else:
+                await self.__port_loop()
+        finally:
+            acker.cancel()
+            await asyncio.gather(acker, return_exceptions=True)
+
+    async def cleanup(self) -> None:
+        await self.stop_profile()
+
+    # =====
+
+    async def __run_profile(self, profile: _Profile, points: list[tuple[float, int]]) -> None:
+        # The steps are scheduled from the start time, so the slow writes don't accumulate a drift
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            for (offset, percent) in points:
+                delay = started + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await self.set_percent(percent)
+                profile.step += 1
+                self.__notifier.notify()
+            profile.state = "done"
+        except asyncio.CancelledError:
+            profile.state = "stopped"
+            raise
+        except Exception as err:
+            get_logger(0).error("Battery profile failed: %s", err)
+            profile.state = "failed"
+            profile.error = str(err)
+        finally:
+            self.__notifier.notify()
+
+    async def __send(self, frame: bytes) -> None:
+        if not self.is_online():
+            raise BatteryLinkOfflineError()
+        if self.__ack_timeout > 0:
+            await self.__window.acquire()
+        try:
+            if self.__capture is not None:
+                await self.__capture.write(frame)
+            else:
+                assert self.__writer is not None
+                self.__writer.write(frame)
+                await self.__writer.drain()
+        except Exception as err:
+            if self.__ack_timeout > 0:
+                self.__window.release()
+            raise BatteryError(f"Can't write to the battery simulator: {err}")
+        self.__stats.sent += 1
+        if self.__ack_timeout > 0:
+            self.__pending.append(asyncio.get_running_loop().time() + self.__ack_timeout)
+            self.__ack_notifier.notify()
+
+    def __on_line(self, line: bytes) -> bool:
+        line = line.strip()
+        if line.startswith(self.__ack_prefix):
+            self.__acks_missing = False
+            self.__complete("acked")
+            return True
+        if line.startswith(self.__nak_prefix):
+            get_logger(0).error("Battery simulator rejected the frame: %r", line)
+            self.__complete("nacked")
+            return True
+        return False
+
+    def __complete(self, result: str) -> None:
+        if self.__pending:
+            self.__pending.popleft()
+            self.__window.release()
+            setattr(self.__stats, result, getattr(self.__stats, result) + 1)
+            self.__notifier.notify()
+            self.__ack_notifier.notify()
+
+    async def __ack_timeout_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.__pending:
+                delay = self.__pending[0] - loop.time()
+                if delay <= 0:
+                    if not self.__acks_missing:  # Don't flood the log if the firmware doesn't ack at all
+                        get_logger(0).error("No acknowledgement from the battery simulator")
+                        self.__acks_missing = True
+                    self.__complete("lost")
+                    continue
+                await self.__ack_notifier.wait(delay)
+            else:
+                await self.__ack_notifier.wait()
+
+    async def __port_loop(self) -> None:
+        logger = get_logger(0)
+        prev_error = ""
+        while True:
+            try:
+                (reader, writer) = await serial_asyncio.open_serial_connection(
+                    url=self.__device_path,
+                    baudrate=self.__speed,
+                )
+            except Exception as err:
+                if str(err) != prev_error:
+                    logger.error("Can't open battery simulator port %s: %s", self.__device_path, err)
+                    prev_error = str(err)
+                await asyncio.sleep(self.__reconnect_delay)
+                continue
+            prev_error = ""
+
+            logger.info("Battery simulator port %s is opened", self.__device_path)
+            self.__writer = writer
+            self.__notifier.notify()
+            try:
+                while (line := await reader.readline()):
+                    self.__on_line(line)
+            except Exception as err:
+                logger.error("Battery simulator port %s error: %s", self.__device_path, err)
+            finally:
+                self.__writer = None
+                self.__notifier.notify()
+                await aiotools.close_writer(writer)
+            logger.error("Battery simulator port %s is closed, reconnecting ...", self.__device_path)
+            await asyncio.sleep(self.__reconnect_delay)
@@ -0,0 +1,236 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import re
+import socket
+import select
+import asyncio
+import dataclasses
+
+from ...logging import get_logger
+
+from ... import aiotools
+
+
+# =====
+@dataclasses.dataclass(frozen=True)
+class BlockDevice:
+    name: str
+    dev: str  # major:minor
+    removable: bool
+    readonly: bool
+    size: int
+    fstype: str
+    mounts: tuple[str, ...]
+    partitions: tuple["BlockDevice", ...] = ()
+
+
+@dataclasses.dataclass(frozen=True)
+class FsUsage:
+    size: int
+    used: int
+    avail: int
+
+
+def get_fs_usage(path: str) -> FsUsage:
+    st = os.statvfs(path)
+    return FsUsage(
+        size=(st.f_blocks * st.f_frsize),
+        used=((st.f_blocks - st.f_bfree) * st.f_frsize),
+        avail=(st.f_bavail * st.f_frsize),
+    )
+
+
+def format_size(size: int) -> str:
+    # Like lsblk and df -h: 1024-based, one decimal for the fractional values
+    value = float(size)
+    for unit in "BKMGTP":
+        if value < 1024 or unit == "P":
+            break
+        value /= 1024
+    if unit == "B" or value == int(value):
+        return f"{int(value)}{unit}"
+    return f"{value:.1f}{unit}"
+
+
+# =====
+_NETLINK_KOBJECT_UEVENT = 15
+_MOUNTINFO_ESCAPE_RE = re.compile(r"\\([0-7]{3})")
+
+
+class BlockDevicesInventory:
+    # The inventory is rebuilt from /sys/block and /proc/self/mountinfo only on the kernel events:
+    # block uevents from the netlink socket (hotplug, media change) and mountinfo changes (via epoll).
+
+    def __init__(
+        self,
+        sysfs_path: str="/sys/block",
+        mountinfo_path: str="/proc/self/mountinfo",
+        udev_data_path: str="/run/udev/data",
+    ) -> None:
+
+        self.__sysfs_path = sysfs_path
+        self.__mountinfo_path = mountinfo_path
+        self.__udev_data_path = udev_data_path
+
+        self.__devices: (dict[str, BlockDevice] | None) = None
+        self.__notifier = aiotools.AioNotifier()
+
+    async def get_devices(self) -> list[BlockDevice]:
+        if self.__devices is None:
+            await self.__refresh()
+        assert self.__devices is not None
+        return list(self.__devices.values())
+
+    async def get_device(self, name: str) -> (BlockDevice | None):
+        return {dev.name: dev for dev in (await self.get_devices())}.get(name)
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        prev_error = ""
+        while True:
+            try:
+                with self.__open_uevents() as uevents:
+                    with open(self.__mountinfo_path, "rb") as mountinfo:
+                        with select.epoll() as epoll:
+                            epoll.register(mountinfo.fileno(), select.EPOLLPRI | select.EPOLLERR)
+                            await self.__watch(uevents, epoll)
+            except Exception as err:
+                if str(err) != prev_error:
+                    logger.error("Can't watch the block devices: %s", err)
+                    prev_error = str(err)
+                self.__devices = None  # Will be rescanned on demand while the watcher is broken
+            await asyncio.sleep(5)
+
+    # =====
+
+    def __open_uevents(self) -> socket.socket:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, _NETLINK_KOBJECT_UEVENT)
+        try:
+            sock.bind((0, 1))  # Kernel events group, we don't need to wait for udevd
+            sock.setblocking(False)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    async def __watch(self, uevents: socket.socket, epoll: select.epoll) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_uevents() -> None:
+            changed = False
+            while True:
+                try:
+                    data = uevents.recv(65536)
+                except BlockingIOError:
+                    break
+                if b"\0SUBSYSTEM=block\0" in data:
+                    changed = True
+            if changed:
+                self.__notifier.notify()
+
+        def on_mounts() -> None:
+            # The outer poll of the epoll fd already consumes the mountinfo event,
+            # so the wakeup itself is the signal. Just drain the leftovers.
+            epoll.poll(0)
+            self.__notifier.notify()
+
+        loop.add_reader(uevents.fileno(), on_uevents)
+        loop.add_reader(epoll.fileno(), on_mounts)
+        try:
+            get_logger(0).info("Watching the block devices ...")
+            while True:
+                await self.__refresh()
+                await self.__notifier.wait()
+        finally:
+            loop.remove_reader(uevents.fileno())
+            loop.remove_reader(epoll.fileno())
+
+    async def __refresh(self) -> None:
+        self.__devices = await aiotools.run_async(self.__scan)
+
+    def __scan(self) -> dict[str, BlockDevice]:
+        mounts = self.__read_mounts()
+        devices: dict[str, BlockDevice] = {}
+        for name in sorted(os.listdir(self.__sysfs_path)):
+            try:
+                devices[name] = self.__read_device(os.path.join(self.__sysfs_path, name), mounts, True)
+            except FileNotFoundError:
+                pass  # Removed while scanning, there will be another event
+        return devices
+
+    def __read_device(self, path: str, mounts: dict[str, tuple[str, list[str]]], is_disk: bool) -> BlockDevice:
+        name = os.path.basename(path)
+        dev = _read_sysfs(path, "dev")
+        (fstype, mountpoints) = mounts.get(dev, ("", []))
+        partitions: list[BlockDevice] = []
+        if is_disk:
+            for child in sorted(os.listdir(path)):
+                if child.startswith(name) and os.path.exists(os.path.join(path, child, "partition")):
+                    partitions.append(self.__read_device(os.path.join(path, child), mounts, False))
+        return BlockDevice(
+            name=name,
+            dev=dev,
+            removable=(_read_sysfs(path if is_disk else os.path.dirname(path), "removable") == "1"),
+            readonly=(_read_sysfs(path, "ro") == "1"),
+            size=(int(_read_sysfs(path, "size") or 0) * 512),
+            fstype=(fstype or self.__read_udev_fstype(dev)),
+            mounts=tuple(mountpoints),
+            partitions=tuple(partitions),
+        )
+
+    def __read_mounts(self) -> dict[str, tuple[str, list[str]]]:
+        mounts: dict[str, tuple[str, list[str]]] = {}
+        with open(self.__mountinfo_path) as file:
+            for line in file:
+                # 36 35 98:0 /mnt1 /mnt2 rw,noatime master:1 - ext3 /dev/root rw,errors=continue
+                (left, _, right) = line.partition(" - ")
+                fields = left.split()
+                if len(fields) < 5 or not right:
+                    continue
+                dev = fields[2]
+                mountpoint = _MOUNTINFO_ESCAPE_RE.sub((lambda match: chr(int(match.group(1), 8))), fields[4])
+                fstype = right.split()[0]
+                mounts.setdefault(dev, (fstype, []))[1].append(mountpoint)
+        return mounts
+
+    def __read_udev_fstype(self, dev: str) -> str:
+        try:
+            with open(os.path.join(self.__udev_data_path, f"b{dev}")) as file:
+                for line in file:
+                    if line.startswith("E:ID_FS_TYPE="):
+                        return line.strip()[len("E:ID_FS_TYPE="):]
+        except FileNotFoundError:
+            pass
+        return ""
+
+
+def _read_sysfs(path: str, name: str) -> str:
+    try:
+        with open(os.path.join(path, name)) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        if name == "dev":
+            raise
+        return ""
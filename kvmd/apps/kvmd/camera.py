@@ -0,0 +1,293 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import asyncio
+import contextlib
+import threading
+import concurrent.futures
+import time
+
+from typing import Callable
+from typing import AsyncGenerator
+from typing import Any
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+from ...errors import IsBusyError
+
+from ... import aiotools
+
+from .i2cmux import I2cMux
+
+from .api.Focuser import Focuser
+from .api.AutoFocus import AutoFocus
+from .api.AutoFocus import AutoFocusCancelled
+from .api.RpiCamera import Camera
+
+
+# =====
+class CameraError(OperationError):
+    pass
+
+
+class CameraIsBusyError(IsBusyError):
+    def __init__(self) -> None:
+        super().__init__("Performing another camera operation, please try again later")
+
+
+# =====
+PTZ_AXES = {
+    "pan":   Focuser.OPT_MOTOR_Y,
+    "tilt":  Focuser.OPT_MOTOR_X,
+    "zoom":  Focuser.OPT_ZOOM,
+    "focus": Focuser.OPT_FOCUS,
+}
+
+
+class _MuxedFocuser(Focuser):
+    # The mux is taken for every single register access from the I2C thread,
+    # so the sweep doesn't hold it while waiting for the motor or grabbing the frames.
+
+    def __init__(self, bus: int, i2c_mux: I2cMux, channel: int, loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__(bus)
+        self.__i2c_mux = i2c_mux
+        self.__channel = channel
+        self.__loop = loop
+
+    def read(self, chip_addr: int, reg_addr: int) -> int:
+        return self.__run_selected(super().read, chip_addr, reg_addr)
+
+    def write(self, chip_addr: int, reg_addr: int, value: int) -> Any:
+        return self.__run_selected(super().write, chip_addr, reg_addr, value)
+
+    def __run_selected(self, func: Callable, *args: Any) -> Any:
+        async def select() -> contextlib.AsyncExitStack:
+            stack = contextlib.AsyncExitStack()
+            await stack.enter_async_context(self.__i2c_mux.selected(self.__channel))
+            return stack
+
+        stack = asyncio.run_coroutine_threadsafe(select(), self.__loop).result()
+        try:
+            return func(*args)
+        finally:
+            asyncio.run_coroutine_threadsafe(stack.aclose(), self.__loop).result()
+
+
+class CameraController:  # pylint: disable=too-many-instance-attributes
+    def __init__(self, i2c_bus: int, i2c_channel: int, frame_timeout: float, i2c_mux: I2cMux) -> None:
+        self.__i2c_bus = i2c_bus
+        self.__i2c_channel = i2c_channel
+        self.__frame_timeout = frame_timeout
+        self.__i2c_mux = i2c_mux
+
+        # All the I2C traffic goes through the single thread with the single bus handle
+        self.__loop: (asyncio.AbstractEventLoop | None) = None
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="kvmd-camera-i2c")
+        self.__focuser: (Focuser | None) = None
+        self.__positions: dict[str, int] = {}  # Cached absolute positions, dropped after autofocus
+
+        self.__moves: dict[str, int] = {}  # Queued relative moves, coalesced per axis
+        self.__moves_task: (asyncio.Task | None) = None
+
+        self.__notifier = aiotools.AioNotifier()
+        self.__region = aiotools.AioExclusiveRegion(CameraIsBusyError, self.__notifier)
+
+        self.__stop_event: (threading.Event | None) = None
+        self.__autofocus: dict = self.__make_autofocus_state()
+
+    async def get_state(self) -> dict:
+        return {
+            "autofocus": {**self.__autofocus, "running": self.__region.is_busy()},
+            "ptz": {axis: self.__positions.get(axis) for axis in PTZ_AXES},
+        }
+
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
+        prev_state: dict = {}
+        while True:
+            state = await self.get_state()
+            if state != prev_state:
+                yield state
+                prev_state = state
+            await self.__notifier.wait()
+
+    async def cleanup(self) -> None:
+        self.cancel_autofocus()
+        await aiotools.run_async(self.__executor.shutdown, True)  # Don't block the loop until the sweep is stopped
+
+    # =====
+
+    async def move(self, deltas: dict[str, int], wait: bool) -> None:
+        if self.__region.is_busy():
+            raise CameraIsBusyError()
+        for (axis, delta) in deltas.items():
+            assert axis in PTZ_AXES, axis
+            if delta:
+                self.__moves[axis] = self.__moves.get(axis, 0) + delta
+        if self.__moves and self.__moves_task is None:
+            self.__moves_task = asyncio.create_task(self.__apply_moves())
+            self.__moves_task.add_done_callback(self.__on_moves_done)
+        if wait and self.__moves_task is not None:
+            await asyncio.shield(self.__moves_task)
+
+    async def __apply_moves(self) -> None:
+        try:
+            while self.__moves:
+                # Everything queued while the previous write was in progress goes as a single write per axis
+                (moves, self.__moves) = (self.__moves, {})
+                try:
+                    self.__positions = await self.__run_i2c(self.__inner_move, moves)
+                except Exception as err:
+                    get_logger(0).error("Can't move the camera: %s", err)
+                    raise CameraError(f"Can't move the camera: {err}")
+                self.__notifier.notify()
+        finally:
+            self.__moves = {}
+            self.__moves_task = None
+
+    def __on_moves_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled():
+            task.exception()  # Already logged, nobody may wait for the WS moves
+
+    def __inner_move(self, moves: dict[str, int]) -> dict[str, int]:
+        focuser = self.__get_focuser()
+        positions = dict(self.__positions)
+        for (axis, delta) in moves.items():
+            opt = PTZ_AXES[axis]
+            if axis not in positions:
+                positions[axis] = focuser.get(opt)
+            info = Focuser.opts[opt]
+            value = min(max(positions[axis] + delta, info["MIN_VALUE"]), info["MAX_VALUE"])
+            if value != positions[axis]:
+                focuser.set(opt, value)
+                positions[axis] = value
+        return positions
+
+    # =====
+
+    async def autofocus(self, wait: bool) -> None:
+        if wait:
+            async with self.__region:
+                await self.__inner_autofocus()
+        else:
+            await aiotools.run_region_task(
+                "Can't perform camera autofocus",
+                self.__region, self.__inner_autofocus,
+            )
+
+    def cancel_autofocus(self) -> None:
+        if self.__stop_event is not None:
+            self.__stop_event.set()
+
+    async def __inner_autofocus(self) -> None:
+        logger = get_logger(0)
+        loop = asyncio.get_running_loop()
+
+        steps = 0
+
+        def on_step(focus: int, sharpness: float) -> None:
+            # Called from the I2C thread, the state is updated by the loop later
+            nonlocal steps
+            steps += 1
+            loop.call_soon_threadsafe(self.__update_autofocus, {
+                "focus": int(focus),
+                "sharpness": round(sharpness, 3),
+                "steps": steps,
+            })
+
+        stop_event = self.__stop_event = threading.Event()
+        self.__update_autofocus(self.__make_autofocus_state())
+        logger.info("Starting camera autofocus ...")
+        try:
+            (focus, sharpness) = await self.__run_i2c(self.__run_autofocus, stop_event, on_step)
+            self.__update_autofocus({"result": {"focus": int(focus), "sharpness": round(sharpness, 3)}})
+            logger.info("Camera autofocus is finished: focus=%d, sharpness=%.3f", focus, sharpness)
+        except AutoFocusCancelled:
+            self.__update_autofocus({"cancelled": True})
+            logger.info("Camera autofocus was cancelled")
+        except asyncio.CancelledError:
+            stop_event.set()  # The HTTP client is gone, stop the sweep too
+            raise
+        except Exception as err:
+            self.__update_autofocus({"error": str(err)})
+            raise
+        finally:
+            self.__stop_event = None
+            self.__positions = {}  # The lens was moved by the sweep
+            self.__notifier.notify()
+
+    def __run_autofocus(self, stop_event: threading.Event, on_step: Callable) -> tuple[int, float]:
+        focuser = self.__get_focuser()
+        camera = Camera()
+        preview = False
+        try:
+            if camera.getFrame() is None:
+                camera.start_preview()
+                preview = True
+                deadline_ts = time.monotonic() + self.__frame_timeout
+                while camera.getFrame() is None:
+                    if stop_event.is_set():
+                        raise AutoFocusCancelled()
+                    if time.monotonic() > deadline_ts:
+                        raise RuntimeError("No frames from the camera")
+                    time.sleep(0.05)
+            return AutoFocus(focuser, camera, on_step, stop_event).startFocus()
+        finally:
+            if preview:
+                camera.stop_preview()
+                camera.close()
+
+    def __update_autofocus(self, values: dict) -> None:
+        self.__autofocus.update(values)
+        self.__notifier.notify()
+
+    def __make_autofocus_state(self) -> dict:
+        return {
+            "focus": None,
+            "sharpness": None,
+            "steps": 0,
+            "result": None,
+            "cancelled": False,
+            "error": None,
+        }
+
+    # =====
+
+    async def __run_i2c(self, func: Callable, *args: Any) -> Any:
+        self.__loop = asyncio.get_running_loop()
+        return (await self.__loop.run_in_executor(self.__executor, func, *args))
+
+    def __get_focuser(self) -> Focuser:
+        # Called only from the I2C thread
+        if self.__focuser is None:
+            if self.__i2c_channel >= 0:
+                # The focuser is behind the mux, so nobody else may switch the channel
+                # (ATX pulses, input status polling) while we're talking to it.
+                assert self.__loop is not None
+                focuser: Focuser = _MuxedFocuser(self.__i2c_bus, self.__i2c_mux, self.__i2c_channel, self.__loop)
+            else:
+                focuser = Focuser(self.__i2c_bus)
+            if focuser.bus is None:
+                raise RuntimeError(f"Can't open I2C bus {self.__i2c_bus}")
+            self.__focuser = focuser
+        return self.__focuser
@@ -0,0 +1,225 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import stat
+import fnmatch
+import hashlib
+import asyncio
+import dataclasses
+
+from ...logging import get_logger
+
+from ...inotify import InotifyMask
+from ...inotify import Inotify
+
+from ... import aiotools
+
+
+# =====
+@dataclasses.dataclass(frozen=True)
+class FirmwareImage:
+    path: str
+    name: str  # Relative to the catalog root
+    size: int
+    mtime: float
+    dev: int
+    ino: int
+    mtime_ns: int
+
+    def get_hash_key(self) -> tuple[int, int, int, int]:
+        return (self.dev, self.ino, self.size, self.mtime_ns)
+
+
+class FirmwareCatalog:
+    # The index is built once and then updated by inotify events, so listing the images
+    # never walks the share. SHA-256 is computed lazily and cached by (dev, inode, size, mtime).
+
+    def __init__(self, path: str, suffix: str) -> None:
+        self.__root_path = os.path.normpath(path)
+        self.__suffix = suffix
+
+        self.__images: dict[str, FirmwareImage] = {}
+        self.__sorted: (list[FirmwareImage] | None) = None
+
+        self.__hashes: dict[tuple[int, int, int, int], str] = {}
+        self.__hashing: dict[tuple[int, int, int, int], asyncio.Task] = {}
+
+        self.__ready = asyncio.Event()
+
+    def get_root_path(self) -> str:
+        return self.__root_path
+
+    async def get_images(
+        self,
+        prefix: str="",
+        pattern: str="",
+        offset: int=0,
+        limit: int=0,
+    ) -> tuple[int, list[FirmwareImage]]:
+
+        await self.__wait_ready()
+        if self.__sorted is None:
+            self.__sorted = sorted(self.__images.values(), key=(lambda image: image.name))
+        images = self.__sorted
+        if prefix or pattern:
+            images = [
+                image for image in images
+                if image.name.startswith(prefix) and (not pattern or fnmatch.fnmatchcase(image.name, pattern))
+            ]
+        total = len(images)
+        return (total, images[offset:(offset + limit if limit > 0 else None)])
+
+    async def get_image(self, path: str) -> (FirmwareImage | None):
+        await self.__wait_ready()
+        return self.__images.get(os.path.normpath(path))
+
+    def get_cached_sha256(self, image: FirmwareImage) -> (str | None):
+        return self.__hashes.get(image.get_hash_key())
+
+    async def get_sha256(self, image: FirmwareImage) -> str:
+        key = image.get_hash_key()
+        digest = self.__hashes.get(key)
+        if digest is None:
+            task = self.__hashing.get(key)
+            if task is None:
+                # Single-flight: the concurrent requests for the same image share the hashing
+                task = self.__hashing[key] = asyncio.create_task(self.__hash_image(image))
+                task.add_done_callback(lambda _: self.__hashing.pop(key, None))
+            digest = await asyncio.shield(task)
+        return digest
+
+    async def verify(self, image: FirmwareImage, sha256: str) -> bool:
+        # The file must be the same as in the index, the hash is taken from the cache if possible
+        current = await aiotools.run_async(self.__make_image, image.path)
+        if current is None or current.get_hash_key() != image.get_hash_key():
+            return False
+        return ((await self.get_sha256(image)) == sha256.lower())
+
+    # =====
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        prev_error = ""
+        while True:
+            try:
+                with Inotify() as inotify:
+                    dirs = await aiotools.run_async(self.__find_dirs)
+                    await inotify.watch(InotifyMask.ALL_MODIFY_EVENTS, *dirs)
+                    # The files are scanned after the watchers are set, so nothing is lost
+                    await self.__rebuild()
+                    prev_error = ""
+                    while True:
+                        need_restart = False
+                        for event in (await inotify.get_series(timeout=1)):
+                            if event.mask & (InotifyMask.DELETE_SELF | InotifyMask.MOVE_SELF | InotifyMask.UNMOUNT | InotifyMask.ISDIR):
+                                logger.info("Got a big inotify event: %s; rebuilding the firmware catalog ...", event)
+                                need_restart = True
+                                break
+                            if not (event.mask & InotifyMask.MODIFY):  # Wait for CLOSE_WRITE while copying
+                                await self.__update_image(event.path)
+                        if need_restart:
+                            break
+            except Exception as err:
+                if str(err) != prev_error:
+                    logger.error("Can't watch the firmware catalog %s: %s", self.__root_path, err)
+                    prev_error = str(err)
+                self.__ready.set()  # Don't hang the requests while there is no catalog
+            await asyncio.sleep(1)
+
+    # =====
+
+    async def __wait_ready(self) -> None:
+        await self.__ready.wait()
+
+    async def __rebuild(self) -> None:
+        self.__images = await aiotools.run_async(self.__scan)
+        self.__sorted = None
+        self.__ready.set()
+        get_logger(0).info("Found %d firmware images in %s", len(self.__images), self.__root_path)
+
+    async def __update_image(self, path: str) -> None:
+        if not path.endswith(self.__suffix):
+            return
+        image = await aiotools.run_async(self.__make_image, path)
+        if image is None:
+            if self.__images.pop(path, None) is not None:
+                self.__sorted = None
+        elif self.__images.get(path) != image:
+            self.__images[path] = image
+            self.__sorted = None
+
+    def __find_dirs(self) -> list[str]:
+        dirs: list[str] = []
+        for (dir_path, _, _) in os.walk(self.__root_path, onerror=_raise_error):
+            dirs.append(dir_path)
+        return dirs
+
+    def __scan(self) -> dict[str, FirmwareImage]:
+        images: dict[str, FirmwareImage] = {}
+        for (dir_path, _, file_names) in os.walk(self.__root_path):
+            for file_name in file_names:
+                if file_name.endswith(self.__suffix):
+                    path = os.path.join(dir_path, file_name)
+                    image = self.__make_image(path)
+                    if image is not None:
+                        images[path] = image
+        return images
+
+    def __make_image(self, path: str) -> (FirmwareImage | None):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return FirmwareImage(
+            path=path,
+            name=os.path.relpath(path, self.__root_path),
+            size=st.st_size,
+            mtime=st.st_mtime,
+            dev=st.st_dev,
+            ino=st.st_ino,
+            mtime_ns=st.st_mtime_ns,
+        )
+
+    async def __hash_image(self, image: FirmwareImage) -> str:
+        digest = await aiotools.run_async(sha256_file, image.path)
+        current = await aiotools.run_async(self.__make_image, image.path)
+        if current is not None and current.get_hash_key() == image.get_hash_key():  # Not rewritten while hashing
+            if len(self.__hashes) >= 65536:
+                self.__hashes.clear()  # Too many rewritten images, just start over
+            self.__hashes[image.get_hash_key()] = digest
+        return digest
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while (chunk := file.read(1024 * 1024)):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _raise_error(err: OSError) -> None:
+    raise err
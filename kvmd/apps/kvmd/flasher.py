@@ -0,0 +1,443 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import re
+import signal
+import hashlib
+import asyncio
+import dataclasses
+import itertools
+import collections
+import time
+import datetime
+
+from typing import AsyncGenerator
+from typing import Callable
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+
+from ... import aiotools
+from ... import aioproc
+
+from .firmware import FirmwareCatalog
+from .firmware import sha256_file
+
+
+# =====
+class FlashError(OperationError):
+    pass
+
+
+class FlashJobNotFoundError(FlashError):
+    def __init__(self) -> None:
+        super().__init__("Flash job is not found")
+
+
+# =====
+_PERCENT_RE = re.compile(rb"(\d{1,3})%")
+_CHIP_RE = re.compile(r"Found .* flash chip \"(?P<chip>[^\"]+)\" \((?P<size>\d+) kB")
+_LOG_LINES = 1000
+
+
+@dataclasses.dataclass
+class FlashJob:  # pylint: disable=too-many-instance-attributes
+    job_id: str
+    path: str
+    sha256: str
+    state: str = "queued"  # queued, running, cancelling, done, failed, cancelled
+    stage: str = ""  # check, gpio, identify, write, verify
+    percent: int = 0  # Of the current stage
+    chip: str = ""
+    error: str = ""
+    created_ts: float = dataclasses.field(default_factory=time.time)
+    started_ts: float = 0.0
+    finished_ts: float = 0.0
+    log: collections.deque = dataclasses.field(default_factory=(lambda: collections.deque(maxlen=_LOG_LINES)))
+
+    def is_finished(self) -> bool:
+        return (self.state in ["done", "failed", "cancelled"])
+
+    def get_state(self) -> dict:
+        return {
+            "id": self.job_id,
+            "path": self.path,
+            "state": self.state,
+            "stage": self.stage,
+            "percent": self.percent,
+            "chip": self.chip,
+            "error": self.error,
+            "created_ts": self.created_ts,
+            "started_ts": self.started_ts,
+            "finished_ts": self.finished_ts,
+        }
+
+
+class _JobCancelled(Exception):
+    pass
+
+
+class FlashJobQueue:  # pylint: disable=too-many-instance-attributes
+    # Jobs are flashed one at a time by the single worker, it owns the SPI bus and the GPIO mux.
+    # Every stage runs as an async process, so the HTTP requests return immediately.
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        catalog: FirmwareCatalog,
+        programmer: str,
+        spi_device: str,
+        gpio_pin: int,
+        spi_restart_cmd: list[str],
+        settle_delay: float,
+        settle_timeout: float,
+        progress: bool,
+        log_dir: str,
+        history: int,
+    ) -> None:
+
+        self.__catalog = catalog
+        self.__programmer = programmer
+        self.__spi_device = spi_device
+        self.__gpio_pin = gpio_pin
+        self.__spi_restart_cmd = spi_restart_cmd
+        self.__settle_delay = settle_delay
+        self.__settle_timeout = settle_timeout
+        self.__progress = progress
+        self.__log_dir = log_dir
+        self.__history = history
+
+        self.__ids = itertools.count(1)
+        self.__jobs: dict[str, FlashJob] = {}
+        self.__queue: "asyncio.Queue[FlashJob]" = asyncio.Queue()
+        self.__current: (FlashJob | None) = None
+        self.__proc: (asyncio.subprocess.Process | None) = None  # pylint: disable=no-member
+        self.__gpio_lock = asyncio.Lock()
+
+        self.__notifier = aiotools.AioNotifier()
+        self.__changed = asyncio.Event()
+
+    # =====
+
+    async def add_job(self, path: str, sha256: str) -> FlashJob:
+        image = await self.__catalog.get_image(path)
+        if image is None and not os.path.isfile(path):
+            raise FlashError(f"Firmware file {path} does not exist.")
+        job = FlashJob(job_id=str(next(self.__ids)), path=path, sha256=sha256.lower())
+        self.__jobs[job.job_id] = job
+        self.__queue.put_nowait(job)
+        self.__cleanup_history()
+        self.__notify()
+        get_logger(0).info("Flash job %s is queued: %s", job.job_id, path)
+        return job
+
+    def get_job(self, job_id: str) -> FlashJob:
+        job = self.__jobs.get(job_id)
+        if job is None:
+            raise FlashJobNotFoundError()
+        return job
+
+    def get_jobs(self) -> list[FlashJob]:
+        return list(self.__jobs.values())
+
+    def is_busy(self) -> bool:
+        return (self.__current is not None or self.__gpio_lock.locked())
+
+    def get_gpio_lock(self) -> asyncio.Lock:
+        # Anyone who drives the SPI flash mux line must hold it, see PduSwitcher
+        return self.__gpio_lock
+
+    async def cancel_job(self, job_id: str) -> None:
+        job = self.get_job(job_id)
+        if job.state == "queued":
+            self.__finish(job, "cancelled")
+        elif job.state == "running":
+            job.state = "cancelling"
+            self.__notify()
+            if self.__proc is not None:
+                await aioproc.kill_process(self.__proc, 1, get_logger(0))
+
+    async def watch_job(self, job_id: str) -> AsyncGenerator[dict, None]:
+        job = self.get_job(job_id)
+        prev: dict = {}
+        while True:
+            changed = self.__changed
+            state = job.get_state()
+            if state != prev:
+                yield state
+                prev = state
+            if job.is_finished():
+                return
+            await changed.wait()
+
+    async def get_state(self) -> dict:
+        return {
+            "current": (self.__current.get_state() if self.__current else None),
+            "queue": [job.job_id for job in self.__jobs.values() if job.state == "queued"],
+        }
+
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
+        prev_state: dict = {}
+        while True:
+            state = await self.get_state()
+            if state != prev_state:
+                yield state
+                prev_state = state
+            await self.__notifier.wait()
+
+    async def systask(self) -> None:
+        while True:
+            job = await self.__queue.get()
+            if job.state != "queued":  # Cancelled while waiting
+                continue
+            self.__current = job
+            try:
+                await self.__run_job(job)
+            finally:
+                self.__current = None
+                self.__notify()
+
+    # =====
+
+    async def __run_job(self, job: FlashJob) -> None:
+        logger = get_logger(0)
+        logger.info("Starting flash job %s: %s", job.job_id, job.path)
+        job.state = "running"
+        job.started_ts = time.time()
+        self.__notify()
+        try:
+            self.__set_stage(job, "check")
+            await self.__check_image(job)
+
+            async with self.__gpio_lock:
+                self.__set_stage(job, "gpio")
+                await self.__run(job, ["raspi-gpio", "set", str(self.__gpio_pin), "op"])
+                try:
+                    await self.__reset_spi(job)
+
+                    self.__set_stage(job, "identify")
+                    output = await self.__run(job, ["flashrom", "-p", self.__programmer])
+                    if "unknown SPI chip" in output or "NOT WORKING" in output:
+                        raise FlashError("Unknown or unsupported SPI chip detected.")
+                    match = _CHIP_RE.search(output)
+                    if match:
+                        job.chip = f"{match.group('chip')} ({match.group('size')} kB)"
+
+                    self.__set_stage(job, "write")
+                    cmd = ["flashrom", "-p", self.__programmer, "-n", "-w", job.path]  # Verified below by the readback
+                    if self.__progress:
+                        cmd.append("--progress")
+                    output = await self.__run(job, cmd, on_progress=(lambda percent: self.__set_percent(job, percent)))
+                    if "Erase/write done" not in output:
+                        raise FlashError("Flashrom didn't report the end of erase/write")
+
+                    self.__set_stage(job, "verify")
+                    await self.__verify(job)
+                finally:
+                    # Give the SPI flash back to the target in any case
+                    await self.__run(job, ["raspi-gpio", "set", str(self.__gpio_pin), "ip"], check=False)
+            self.__finish(job, "done")
+        except _JobCancelled:
+            self.__finish(job, "cancelled")
+        except Exception as err:
+            if job.state == "cancelling":
+                self.__finish(job, "cancelled")
+            else:
+                logger.error("Flash job %s failed: %s", job.job_id, err)
+                self.__finish(job, "failed", str(err))
+        await self.__save_log(job)
+
+    async def __check_image(self, job: FlashJob) -> None:
+        if not job.sha256:
+            return
+        image = await self.__catalog.get_image(job.path)
+        if image is None or not (await self.__catalog.verify(image, job.sha256)):
+            raise FlashError("Firmware image doesn't match the expected SHA-256")
+        self.__log(job, "Firmware image SHA-256 matches.")
+
+    async def __reset_spi(self, job: FlashJob) -> None:
+        await self.__run(job, self.__spi_restart_cmd)
+        # The device node usually survives the restart, so it can't tell that the bus is ready.
+        # The minimal delay is required anyway, the node is checked after it.
+        await asyncio.sleep(self.__settle_delay)
+        deadline_ts = time.monotonic() + self.__settle_timeout
+        while not os.path.exists(self.__spi_device):
+            if time.monotonic() > deadline_ts:
+                raise FlashError(f"SPI device {self.__spi_device} didn't appear after the restart")
+            await asyncio.sleep(0.1)
+
+    async def __verify(self, job: FlashJob) -> None:
+        # The chip is read into a pipe and hashed on the fly, no readback file and no diff
+        image = await self.__catalog.get_image(job.path)
+        expected = (await self.__catalog.get_sha256(image) if image else "")
+        size = (image.size if image else (await aiotools.run_async(os.path.getsize, job.path)))
+        if not expected:
+            expected = job.sha256 or (await aiotools.run_async(sha256_file, job.path))
+
+        (read_fd, write_fd) = os.pipe()
+        try:
+            cmd = ["flashrom", "-p", self.__programmer, "-r", f"/dev/fd/{write_fd}"]
+            proc = await self.__spawn(job, cmd, pass_fds=[write_fd])
+        except Exception:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)  # Only the flashrom holds it now, so we get EOF on its exit
+        proc_task = asyncio.create_task(self.__communicate(job, proc, cmd))
+        digest = hashlib.sha256()
+        count = 0
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        (transport, _) = await loop.connect_read_pipe(
+            (lambda: asyncio.StreamReaderProtocol(reader)),
+            os.fdopen(read_fd, "rb", 0),
+        )
+        try:
+            while (chunk := await reader.read(65536)):
+                digest.update(chunk)
+                count += len(chunk)
+                self.__set_percent(job, (count * 100 // size if size else 0))
+        finally:
+            transport.close()
+        await proc_task
+        if count != size or digest.hexdigest() != expected:
+            raise FlashError(f"Verification failed: the readback ({count} bytes) doesn't match the image ({size} bytes)")
+        self.__log(job, "Flashing verification successful.")
+
+    async def __run(
+        self,
+        job: FlashJob,
+        cmd: list[str],
+        check: bool=True,
+        pass_fds: (list[int] | None)=None,
+        on_progress: (Callable[[int], None] | None)=None,
+    ) -> str:
+
+        if check and job.state == "cancelling":
+            raise _JobCancelled()
+        proc = await self.__spawn(job, cmd, pass_fds)
+        return (await self.__communicate(job, proc, cmd, check, on_progress))
+
+    async def __spawn(
+        self,
+        job: FlashJob,
+        cmd: list[str],
+        pass_fds: (list[int] | None)=None,
+    ) -> asyncio.subprocess.Process:  # pylint: disable=no-member
+
+        self.__log(job, "$ " + " ".join(cmd))
+        proc = self.__proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            preexec_fn=os.setpgrp,
+            pass_fds=(pass_fds or ()),
+        )
+        return proc
+
+    async def __communicate(
+        self,
+        job: FlashJob,
+        proc: asyncio.subprocess.Process,  # pylint: disable=no-member
+        cmd: list[str],
+        check: bool=True,
+        on_progress: (Callable[[int], None] | None)=None,
+    ) -> str:
+
+        try:
+            assert proc.stdout is not None
+            output = b""
+            while (data := await proc.stdout.read(4096)):
+                output += data
+                if on_progress:
+                    # Progress bars are redrawn with \r, take the last value
+                    percents = _PERCENT_RE.findall(data)
+                    if percents:
+                        on_progress(min(int(percents[-1]), 100))
+            await proc.wait()
+        finally:
+            self.__proc = None
+            if proc.returncode is None:
+                await aioproc.kill_process(proc, 1, get_logger(0))
+        text = output.decode(errors="ignore")
+        for line in text.replace("\r", "\n").split("\n"):
+            if line.strip():
+                self.__log(job, line.rstrip())
+        if job.state == "cancelling" and check:
+            raise _JobCancelled()
+        if check and proc.returncode != 0:
+            if proc.returncode in [-signal.SIGTERM, -signal.SIGKILL]:
+                raise _JobCancelled()
+            raise FlashError(f"Command {cmd[0]} failed with code {proc.returncode}")
+        return text
+
+    # =====
+
+    def __set_stage(self, job: FlashJob, stage: str) -> None:
+        job.stage = stage
+        job.percent = 0
+        self.__notify()
+
+    def __set_percent(self, job: FlashJob, percent: int) -> None:
+        if percent != job.percent:
+            job.percent = percent
+            self.__notify()
+
+    def __finish(self, job: FlashJob, state: str, error: str="") -> None:
+        job.state = state
+        job.error = error
+        if state == "done":
+            job.percent = 100
+        job.finished_ts = time.time()
+        self.__log(job, f"Job is {state}" + (f": {error}" if error else ""))
+        get_logger(0).info("Flash job %s is %s", job.job_id, state)
+        self.__notify()
+
+    def __log(self, job: FlashJob, line: str) -> None:
+        job.log.append(line)
+
+    def __notify(self) -> None:
+        self.__notifier.notify()
+        (changed, self.__changed) = (self.__changed, asyncio.Event())
+        changed.set()
+
+    def __cleanup_history(self) -> None:
+        finished = [job for job in self.__jobs.values() if job.is_finished()]
+        for job in finished[:max(len(finished) - self.__history, 0)]:
+            del self.__jobs[job.job_id]
+
+    async def __save_log(self, job: FlashJob) -> None:
+        if not self.__log_dir:
+            return
+        timestamp = datetime.datetime.fromtimestamp(job.started_ts).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.__log_dir, f"output_log_{timestamp}.txt")
+        try:
+            await aiotools.run_async(_write_lines, path, list(job.log))
+        except Exception as err:
+            get_logger(0).error("Can't save the flash log %s: %s", path, err)
+
+
+def _write_lines(path: str, lines: list[str]) -> None:
+    with open(path, "a") as file:
+        file.write("\n".join(lines) + "\n")
@@ -0,0 +1,262 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import fcntl
+import asyncio
+import contextlib
+import time
+
+from typing import Callable
+from typing import Generator
+from typing import AsyncGenerator
+from typing import TypeVar
+from typing import Any
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+
+from ... import aiotools
+
+
+# =====
+class I2cError(OperationError):
+    pass
+
+
+# =====
+_I2C_SLAVE = 0x0703
+
+_GPIO_IODIRA = 0x00
+_GPIO_GPPUA = 0x0C
+_GPIO_GPIOA = 0x12
+
+_RetvalT = TypeVar("_RetvalT")
+
+
+class I2cDevice:
+    # Raw reads/writes on the /dev/i2c-N descriptor, without any fork of i2cset/i2cget
+    def __init__(self, fd: int) -> None:
+        self.__fd = fd
+        self.__address = -1
+
+    def write_byte(self, address: int, value: int) -> None:
+        self.__set_address(address)
+        os.write(self.__fd, bytes([value]))
+
+    def write_byte_data(self, address: int, register: int, value: int) -> None:
+        self.__set_address(address)
+        os.write(self.__fd, bytes([register, value]))
+
+    def read_byte_data(self, address: int, register: int) -> int:
+        self.__set_address(address)
+        os.write(self.__fd, bytes([register]))
+        return os.read(self.__fd, 1)[0]
+
+    def __set_address(self, address: int) -> None:
+        if address != self.__address:
+            fcntl.ioctl(self.__fd, _I2C_SLAVE, address)
+            self.__address = address
+
+
+class I2cMux:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        bus: int,
+        mux_address: int,
+        idle_mask: int,
+        gpio_address: int,
+        gpio_channel: int,
+        state_poll: float,
+    ) -> None:
+
+        self.__device_path = f"/dev/i2c-{bus}"
+        self.__mux_address = mux_address
+        self.__idle_mask = idle_mask
+        self.__gpio_address = gpio_address
+        self.__gpio_channel = gpio_channel
+        self.__state_poll = state_poll
+
+        self.__lock = asyncio.Lock()
+        self.__fd = -1
+        self.__device: (I2cDevice | None) = None
+        self.__mask = -1  # Currently selected channels, -1 if unknown
+
+        self.__input_status: (int | None) = None
+        self.__input_status_ts = 0.0
+
+    async def run(self, channel: int, func: Callable[[I2cDevice], _RetvalT]) -> _RetvalT:
+        # The mux is shared by all the users, so every access to the devices behind it
+        # must go through this method. Otherwise the tracked channel will be wrong.
+        async with self.__lock:
+            return (await self.__run_locked(self.__inner_run, channel, func))
+
+    @contextlib.asynccontextmanager
+    async def selected(self, channel: int) -> AsyncGenerator[None, None]:
+        # For the users with their own handle of the bus, like the camera focuser.
+        # The channel stays selected and the other users wait until the context is closed.
+        async with self.__lock:
+            await self.__run_locked(self.__inner_select, channel)
+            try:
+                yield
+            finally:
+                await self.__run_locked(self.__inner_unselect)
+
+    async def pulse_gpio(self, value: int, hold: float) -> None:
+        # The bus stays locked while the outputs are held, the polling can't reset them
+        def pulse(device: I2cDevice) -> None:
+            device.write_byte_data(self.__gpio_address, _GPIO_IODIRA, 0x3F)
+            device.write_byte_data(self.__gpio_address, _GPIO_GPPUA, 0xC0)
+            device.write_byte_data(self.__gpio_address, _GPIO_GPIOA, value)
+            try:
+                time.sleep(hold)
+            finally:
+                device.write_byte_data(self.__gpio_address, _GPIO_GPIOA, 0x00)
+
+        await self.run(self.__gpio_channel, pulse)
+
+    async def get_input_status(self) -> int:
+        if self.__input_status is None or self.__is_stale():
+            await self.__update_input_status()
+        assert self.__input_status is not None
+        return self.__input_status
+
+    async def get_state(self) -> dict:
+        if self.__is_stale():
+            try:
+                await self.__update_input_status()
+            except I2cError:
+                pass
+        return self.__make_state()
+
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
+        prev_state: dict = {}
+        while True:
+            try:
+                await self.__update_input_status()
+            except I2cError:
+                pass
+            state = self.__make_state()
+            if state != prev_state:
+                yield state
+                prev_state = state
+            await asyncio.sleep(self.__state_poll)
+
+    async def cleanup(self) -> None:
+        async with self.__lock:
+            self.__close()
+
+    # =====
+
+    async def __update_input_status(self) -> None:
+        def read_input_status(device: I2cDevice) -> int:
+            device.write_byte_data(self.__gpio_address, _GPIO_IODIRA, 0x3F)
+            device.write_byte_data(self.__gpio_address, _GPIO_GPPUA, 0xFF)
+            status = device.read_byte_data(self.__gpio_address, _GPIO_GPIOA)
+            device.write_byte_data(self.__gpio_address, _GPIO_GPIOA, 0x00)
+            return status
+
+        try:
+            self.__input_status = await self.run(self.__gpio_channel, read_input_status)
+        except I2cError:
+            self.__input_status = None
+            raise
+        finally:
+            self.__input_status_ts = time.monotonic()
+
+    def __is_stale(self) -> bool:
+        return (time.monotonic() - self.__input_status_ts >= self.__state_poll)
+
+    def __make_state(self) -> dict:
+        if self.__input_status is None:
+            return {"online": False, "input_status": None}
+        return {"online": True, "input_status": make_input_status(self.__input_status)}
+
+    async def __run_locked(self, func: Callable[..., _RetvalT], *args: Any) -> _RetvalT:
+        # The thread can't be interrupted, so the bus stays locked until it's finished
+        # even if the caller was cancelled. Otherwise another user could switch the channel under it.
+        fut = asyncio.ensure_future(aiotools.run_async(func, *args))
+        try:
+            return (await asyncio.shield(fut))
+        finally:
+            if not fut.done():
+                await asyncio.wait([fut])
+
+    def __inner_run(self, channel: int, func: Callable[[I2cDevice], _RetvalT]) -> _RetvalT:
+        with self.__handling_errors():
+            device = self.__ensure_device()
+            self.__select(device, 1 << channel)
+            try:
+                return func(device)
+            finally:
+                if self.__idle_mask >= 0:
+                    self.__select(device, self.__idle_mask)  # Other users of the bus expect this
+
+    def __inner_select(self, channel: int) -> None:
+        with self.__handling_errors():
+            self.__select(self.__ensure_device(), 1 << channel)
+
+    def __inner_unselect(self) -> None:
+        if self.__idle_mask >= 0:
+            with self.__handling_errors():
+                self.__select(self.__ensure_device(), self.__idle_mask)
+
+    @contextlib.contextmanager
+    def __handling_errors(self) -> Generator[None, None, None]:
+        try:
+            yield
+        except OSError as err:
+            self.__close()
+            get_logger(0).error("I2C error on %s: %s", self.__device_path, err)
+            raise I2cError(f"I2C error: {err}")
+
+    def __select(self, device: I2cDevice, mask: int) -> None:
+        if mask != self.__mask:
+            self.__mask = -1
+            device.write_byte(self.__mux_address, mask)
+            self.__mask = mask
+
+    def __ensure_device(self) -> I2cDevice:
+        if self.__device is None:
+            self.__fd = os.open(self.__device_path, os.O_RDWR)
+            self.__device = I2cDevice(self.__fd)
+            self.__mask = -1
+        return self.__device
+
+    def __close(self) -> None:
+        if self.__fd >= 0:
+            try:
+                os.close(self.__fd)
+            except Exception:
+                pass
+        self.__fd = -1
+        self.__device = None
+        self.__mask = -1
+
+
+def make_input_status(status: int) -> dict:
+    return {
+        "binary": f"{status:08b}",
+        "hexadecimal": f"0x{status:02x}",
+    }
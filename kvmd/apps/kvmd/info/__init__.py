@@ -48,56 +48,3 @@ class InfoManager:
 
     def get_submanager(self, name: str) -> BaseInfoSubmanager:
         return self.__subs[name]
-    
-class InfoManager2:
-    def __init__(self, config: Section) -> None:
-        self.__subs = {
-            "system": SystemInfoSubmanager(config.kvmd.streamer2.cmd),
-            "auth": AuthInfoSubmanager(config.kvmd.auth.enabled),
-            "meta": MetaInfoSubmanager(config.kvmd.info.meta),
-            "extras": ExtrasInfoSubmanager(config),
-            "hw": HwInfoSubmanager(**config.kvmd.info.hw._unpack()),
-            "fan": FanInfoSubmanager(**config.kvmd.info.fan._unpack()),
-        }
-
-    def get_subs(self) -> set[str]:
-        return set(self.__subs)
-
-    def get_submanager(self, name: str) -> BaseInfoSubmanager:
-        return self.__subs[name]
-
-
-class InfoManager3:
-    def __init__(self, config: Section) -> None:
-        self.__subs = {
-            "system": SystemInfoSubmanager(config.kvmd.streamer3.cmd),
-            "auth": AuthInfoSubmanager(config.kvmd.auth.enabled),
-            "meta": MetaInfoSubmanager(config.kvmd.info.meta),
-            "extras": ExtrasInfoSubmanager(config),
-            "hw": HwInfoSubmanager(**config.kvmd.info.hw._unpack()),
-            "fan": FanInfoSubmanager(**config.kvmd.info.fan._unpack()),
-        }
-
-    def get_subs(self) -> set[str]:
-        return set(self.__subs)
-
-    def get_submanager(self, name: str) -> BaseInfoSubmanager:
-        return self.__subs[name]
-
-
-class InfoManager4:
-    def __init__(self, config: Section) -> None:
-        self.__subs = {
-            "system": SystemInfoSubmanager(config.kvmd.streamer4.cmd),
-            "auth": AuthInfoSubmanager(config.kvmd.auth.enabled),
-            "meta": MetaInfoSubmanager(config.kvmd.info.meta),
-            "extras": ExtrasInfoSubmanager(config),
-            "hw": HwInfoSubmanager(**config.kvmd.info.hw._unpack()),
-            "fan": FanInfoSubmanager(**config.kvmd.info.fan._unpack()),
-        }
-
-    def get_subs(self) -> set[str]:
-        return set(self.__subs)
-
-    def get_submanager(self, name: str) -> BaseInfoSubmanager:
-        return self.__subs[name]
@@ -23,6 +23,12 @@
 import os
 import stat
 import io
+import time
+import hashlib
+import asyncio
+import threading
+import collections
+import concurrent.futures
 import ctypes
 import ctypes.util
 import contextlib
@@ -39,8 +45,11 @@ from ctypes import c_char
 from typing import Generator
 
 from PIL import ImageOps
+from PIL import ImageChops
 from PIL import Image as PilImage
 
+from ...logging import get_logger
+
 from ...errors import OperationError
 
 from ... import libc
@@ -65,6 +74,8 @@ def _load_libtesseract() -> (ctypes.CDLL | None):
         lib = ctypes.CDLL(path)
         for (name, restype, argtypes) in [
             ("TessBaseAPICreate", POINTER(_TessBaseAPI), []),
+            ("TessBaseAPIDelete", None, [POINTER(_TessBaseAPI)]),
+            ("TessBaseAPIClear", None, [POINTER(_TessBaseAPI)]),
             ("TessBaseAPIInit3", c_int, [POINTER(_TessBaseAPI), c_char_p, c_char_p]),
             ("TessBaseAPISetImage", None, [POINTER(_TessBaseAPI), c_void_p, c_int, c_int, c_int, c_int]),
             ("TessBaseAPIGetUTF8Text", POINTER(c_char), [POINTER(_TessBaseAPI)]),
@@ -84,8 +95,7 @@ def _load_libtesseract() -> (ctypes.CDLL | None):
 _libtess = _load_libtesseract()
 
 
-@contextlib.contextmanager
-def _tess_api(data_dir_path: str, langs: list[str]) -> Generator[_TessBaseAPI, None, None]:
+def _create_tess_api(data_dir_path: str, langs: list[str]) -> _TessBaseAPI:
     if not _libtess:
         raise OcrError("Tesseract is not available")
     api = _libtess.TessBaseAPICreate()
@@ -94,20 +104,143 @@ def _tess_api(data_dir_path: str, langs: list[str]) -> Generator[_TessBaseAPI, N
             raise OcrError("Can't initialize Tesseract")
         if not _libtess.TessBaseAPISetVariable(api, b"debug_file", b"/dev/null"):
             raise OcrError("Can't set debug_file=/dev/null")
-        yield api
-    finally:
+        return api
+    except Exception:
         _libtess.TessBaseAPIDelete(api)
+        raise
+
+
+class _TessPool:  # Initialized engines to avoid loading of traineddata on each recognition
+    def __init__(self, data_dir_path: str, max_engines: int) -> None:
+        self.__data_dir_path = data_dir_path
+        self.__max_engines = max_engines
+
+        # Langs to idle engines, the least recently used first
+        self.__idle: collections.OrderedDict[tuple[str, ...], list[_TessBaseAPI]] = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def get_api(self, langs: list[str]) -> Generator[_TessBaseAPI, None, None]:
+        assert _libtess
+        key = tuple(langs)
+        api = self.__pop_idle(key)
+        if api is None:
+            api = _create_tess_api(self.__data_dir_path, langs)
+        try:
+            yield api
+        except BaseException:
+            _libtess.TessBaseAPIDelete(api)  # Don't reuse the engine in an unknown state
+            raise
+        _libtess.TessBaseAPIClear(api)
+        self.__push_idle(key, api)
+
+    def warm(self, langs: list[str]) -> None:
+        with self.get_api(langs):
+            pass
+
+    def clear(self) -> None:
+        assert _libtess
+        with self.__lock:
+            apis = [api for apis in self.__idle.values() for api in apis]
+            self.__idle.clear()
+        for api in apis:
+            _libtess.TessBaseAPIDelete(api)
+
+    def __pop_idle(self, key: tuple[str, ...]) -> (_TessBaseAPI | None):
+        with self.__lock:
+            apis = self.__idle.get(key)
+            if not apis:
+                return None
+            api = apis.pop()
+            if not apis:
+                del self.__idle[key]
+            return api
+
+    def __push_idle(self, key: tuple[str, ...], api: _TessBaseAPI) -> None:
+        assert _libtess
+        evicted: list[_TessBaseAPI] = []
+        with self.__lock:
+            self.__idle.setdefault(key, []).append(api)
+            self.__idle.move_to_end(key)
+            count = sum(map(len, self.__idle.values()))
+            while count > self.__max_engines:
+                (old_key, apis) = next(iter(self.__idle.items()))
+                evicted.append(apis.pop(0))
+                if not apis:
+                    del self.__idle[old_key]
+                count -= 1
+        for api in evicted:
+            _libtess.TessBaseAPIDelete(api)
 
 
 _LANG_SUFFIX = ".traineddata"
 
+_ROI_THUMBNAIL_SIZE = (64, 64)
+_ROI_MAX_DRAFT_SCALE = 8
+_ROI_DIFF_THRESHOLD = 10  # Max absolute difference of the thumbnails pixels
+
+
+def _get_roi_box(width: int, height: int, left: int, top: int, right: int, bottom: int) -> (tuple[int, int, int, int] | None):
+    if left >= 0 or top >= 0 or right >= 0 or bottom >= 0:
+        left = (0 if left < 0 else min(width, left))
+        top = (0 if top < 0 else min(height, top))
+        right = (width if right < 0 else min(width, right))
+        bottom = (height if bottom < 0 else min(height, bottom))
+        if left < right and top < bottom:
+            return (left, top, right, bottom)
+    return None
+
+
+class _OcrCache:  # Recognized texts by the hash of the cropped region and langs
+    def __init__(self, size: int, ttl: float) -> None:
+        self.__size = size
+        self.__ttl = ttl
+
+        self.__texts: collections.OrderedDict[tuple[bytes, tuple[str, ...]], tuple[float, str]] = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: tuple[bytes, tuple[str, ...]]) -> (str | None):
+        with self.__lock:
+            item = self.__texts.get(key)
+            if item is None:
+                return None
+            if item[0] + self.__ttl < time.monotonic():
+                del self.__texts[key]
+                return None
+            self.__texts.move_to_end(key)
+            return item[1]
+
+    def put(self, key: tuple[bytes, tuple[str, ...]], text: str) -> None:
+        if self.__size > 0:
+            with self.__lock:
+                self.__texts[key] = (time.monotonic(), text)
+                self.__texts.move_to_end(key)
+                while len(self.__texts) > self.__size:
+                    self.__texts.popitem(last=False)
+
 
 # =====
 class Ocr:
-    def __init__(self, data_dir_path: str, default_langs: list[str]) -> None:
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        data_dir_path: str,
+        default_langs: list[str],
+        max_engines: int,
+        workers: int,
+        cache_size: int,
+        cache_ttl: float,
+    ) -> None:
+
         self.__data_dir_path = data_dir_path
         self.__default_langs = default_langs
 
+        self.__pool = _TessPool(data_dir_path, max_engines)
+        self.__cache = _OcrCache(cache_size, cache_ttl)
+        self.__executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=(workers or os.cpu_count() or 1),
+            thread_name_prefix="kvmd-ocr",
+        )
+
     def is_available(self) -> bool:
         return bool(_libtess)
 
@@ -129,39 +262,107 @@ class Ocr:
     async def recognize(self, data: bytes, langs: list[str], left: int, top: int, right: int, bottom: int) -> str:
         if not langs:
             langs = self.__default_langs
-        return (await aiotools.run_async(self.__inner_recognize, data, langs, left, top, right, bottom))
+        return (await asyncio.get_running_loop().run_in_executor(
+            self.__executor,
+            self.__inner_recognize,
+            data, langs, left, top, right, bottom,
+        ))
+
+    async def make_roi_thumbnail(self, data: bytes, left: int, top: int, right: int, bottom: int) -> bytes:
+        return (await asyncio.get_running_loop().run_in_executor(
+            self.__executor,
+            self.__inner_make_roi_thumbnail,
+            data, left, top, right, bottom,
+        ))
+
+    def is_roi_changed(self, prev: bytes, cur: bytes) -> bool:
+        if len(prev) != len(cur):
+            return True
+        with PilImage.frombytes("L", _ROI_THUMBNAIL_SIZE, prev) as prev_image:
+            with PilImage.frombytes("L", _ROI_THUMBNAIL_SIZE, cur) as cur_image:
+                with ImageChops.difference(prev_image, cur_image) as diff:
+                    return (diff.getextrema()[1] >= _ROI_DIFF_THRESHOLD)
+
+    # =====
+
+    async def systask(self) -> None:
+        if self.is_available():
+            try:
+                await asyncio.get_running_loop().run_in_executor(self.__executor, self.__pool.warm, self.__default_langs)
+                get_logger(0).info("OCR engine is ready for langs: %s", "+".join(self.__default_langs))
+            except Exception as err:
+                get_logger(0).error("Can't warm up OCR engine: %s", err)
+        await aiotools.wait_infinite()
+
+    async def cleanup(self) -> None:
+        # The engines can be freed only after the running job, but the loop must not be blocked
+        await aiotools.run_async(self.__executor.shutdown, True)
+        if self.is_available():
+            self.__pool.clear()
+
+    # =====
 
     def __inner_recognize(self, data: bytes, langs: list[str], left: int, top: int, right: int, bottom: int) -> str:
-        with _tess_api(self.__data_dir_path, langs) as api:
+        with io.BytesIO(data) as bio:
+            image = PilImage.open(bio)
+            try:
+                box = _get_roi_box(image.width, image.height, left, top, right, bottom)
+                if box:
+                    image_cropped = image.crop(box)
+                    image.close()
+                    image = image_cropped
+
+                digest = hashlib.blake2b(f"{image.mode}:{image.width}x{image.height}:".encode(), digest_size=16)
+                digest.update(image.tobytes())
+                key = (digest.digest(), tuple(langs))
+                text = self.__cache.get(key)
+                if text is None:
+                    text = self.__inner_recognize_image(image, langs)
+                    self.__cache.put(key, text)
+                return text
+            finally:
+                image.close()
+
+    def __inner_recognize_image(self, image: PilImage.Image, langs: list[str]) -> str:
+        with self.__pool.get_api(langs) as api:
             assert _libtess
-            with io.BytesIO(data) as bio:
-                image = PilImage.open(bio)
+            ImageOps.grayscale(image)
+            image = image.resize((int(image.size[0] * 2), int(image.size[1] * 2)), PilImage.Resampling.BICUBIC)
+            try:
+                _libtess.TessBaseAPISetImage(api, image.tobytes("raw", "RGB"), image.width, image.height, 3, image.width * 3)
+                text_ptr = None
                 try:
-                    if left >= 0 or top >= 0 or right >= 0 or bottom >= 0:
-                        left = (0 if left < 0 else min(image.width, left))
-                        top = (0 if top < 0 else min(image.height, top))
-                        right = (image.width if right < 0 else min(image.width, right))
-                        bottom = (image.height if bottom < 0 else min(image.height, bottom))
-                        if left < right and top < bottom:
-                            image_cropped = image.crop((left, top, right, bottom))
-                            image.close()
-                            image = image_cropped
-
-                    ImageOps.grayscale(image)
-                    image_resized = image.resize((int(image.size[0] * 2), int(image.size[1] * 2)), PilImage.Resampling.BICUBIC)
-                    image.close()
-                    image = image_resized
-
-                    _libtess.TessBaseAPISetImage(api, image.tobytes("raw", "RGB"), image.width, image.height, 3, image.width * 3)
-                    text_ptr = None
-                    try:
-                        text_ptr = _libtess.TessBaseAPIGetUTF8Text(api)
-                        text = ctypes.cast(text_ptr, c_char_p).value
-                        if text is None:
-                            raise OcrError("Can't recognize image")
-                        return text.decode("utf-8")
-                    finally:
-                        if text_ptr is not None:
-                            libc.free(text_ptr)
+                    text_ptr = _libtess.TessBaseAPIGetUTF8Text(api)
+                    text = ctypes.cast(text_ptr, c_char_p).value
+                    if text is None:
+                        raise OcrError("Can't recognize image")
+                    return text.decode("utf-8")
                 finally:
-                    image.close()
+                    if text_ptr is not None:
+                        libc.free(text_ptr)
+            finally:
+                image.close()
+
+    def __inner_make_roi_thumbnail(self, data: bytes, left: int, top: int, right: int, bottom: int) -> bytes:
+        with io.BytesIO(data) as bio:
+            with PilImage.open(bio) as image:
+                (width, height) = image.size
+                box = (_get_roi_box(width, height, left, top, right, bottom) or (0, 0, width, height))
+                # Decode JPEG in the reduced scale, it's much cheaper than the full decoding.
+                # The region still should have at least a thumbnail size to notice small glyphs changes.
+                scale = max(min(
+                    _ROI_MAX_DRAFT_SCALE,
+                    (box[2] - box[0]) // _ROI_THUMBNAIL_SIZE[0],
+                    (box[3] - box[1]) // _ROI_THUMBNAIL_SIZE[1],
+                ), 1)
+                image.draft("L", (width // scale, height // scale))
+                (scale_x, scale_y) = (image.width / width, image.height / height)
+                with image.crop((
+                    int(box[0] * scale_x),
+                    int(box[1] * scale_y),
+                    max(int(box[2] * scale_x), int(box[0] * scale_x) + 1),
+                    max(int(box[3] * scale_y), int(box[1] * scale_y) + 1),
+                )) as roi:
+                    with roi.convert("L") as gray:
+                        with gray.resize(_ROI_THUMBNAIL_SIZE, PilImage.Resampling.BILINEAR) as thumbnail:
+                            return thumbnail.tobytes()
@@ -0,0 +1,115 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import re
+import json
+import gzip
+import hashlib
+import dataclasses
+
+from ...htserver import HttpExposed
+
+
+# =====
+_BASE_PATH = os.path.join(os.path.dirname(__file__), "openapi.json")
+
+_ROUTE_PARAM_RE = re.compile(r"\{(\w+)(?::((?:[^{}]|\{[^{}]*\})+))?\}")
+
+
+@dataclasses.dataclass(frozen=True)
+class OpenApiDocument:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def make_openapi_document(exposed: list[HttpExposed]) -> OpenApiDocument:
+    # The hand-written descriptions from openapi.json are used where they exist.
+    # The operations without the registered handlers are dropped, and the handlers
+    # without the descriptions get a stub made of the handler docstring.
+    with open(_BASE_PATH, encoding="utf-8") as file:
+        doc = json.load(file)
+
+    routes = [(item.method.lower(), _compile_route(item.path)) for item in exposed]
+    paths: dict[str, dict] = {}
+    tags: dict[str, list[str]] = {}
+    for (path, item) in doc.get("paths", {}).items():
+        ops = {
+            key: op for (key, op) in item.items()
+            if not _is_method(key) or any(
+                method == key and regex.fullmatch(path)
+                for (method, regex) in routes
+            )
+        }
+        if any(map(_is_method, ops)):
+            paths[path] = ops
+            for (key, op) in ops.items():
+                if _is_method(key) and op.get("tags"):
+                    tags.setdefault(_get_section(path), op["tags"])
+
+    for item in exposed:
+        method = item.method.lower()
+        if any(
+            method in ops and _compile_route(item.path).fullmatch(path)
+            for (path, ops) in paths.items()
+        ):
+            continue
+        path = _ROUTE_PARAM_RE.sub(r"{\1}", item.path)
+        summary = (item.handler.__doc__ or "").strip().split("\n")[0]
+        paths.setdefault(path, {})[method] = {
+            "tags": tags.get(_get_section(path), []),
+            "summary": (summary or f"{item.method} {path}"),
+            "parameters": [
+                {"name": name, "in": "path", "required": True, "schema": {"type": "string"}}
+                for (name, _) in _ROUTE_PARAM_RE.findall(item.path)
+            ],
+            "responses": {"200": {"description": "Successful operation"}},
+        }
+
+    doc["paths"] = dict(sorted(paths.items()))
+    body = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return OpenApiDocument(
+        body=body,
+        gzipped=gzip.compress(body, mtime=0),
+        etag=f"\"{hashlib.sha1(body).hexdigest()}\"",
+    )
+
+
+def _is_method(key: str) -> bool:
+    return (key in ["get", "put", "post", "delete", "options", "head", "patch", "trace"])
+
+
+def _get_section(path: str) -> str:
+    return re.sub(r"[\d{}].*$", "", path.strip("/").split("/")[0])
+
+
+def _compile_route(path: str) -> re.Pattern:
+    parts: list[str] = []
+    pos = 0
+    for match in _ROUTE_PARAM_RE.finditer(path):
+        parts.append(re.escape(path[pos:match.start()]))
+        parts.append(f"(?:{match.group(2) or '[^/]+'})")
+        pos = match.end()
+    parts.append(re.escape(path[pos:]))
+    return re.compile("".join(parts))
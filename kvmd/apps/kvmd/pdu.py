@@ -0,0 +1,192 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+
+import asyncio
+import dataclasses
+import itertools
+import time
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+from ...errors import IsBusyError
+
+from ... import aioproc
+
+from ...clients.pdu import PduError
+from ...clients.pdu import get_pdu_client
+from ...clients.pdu import close_pdu_clients
+
+from .flasher import FlashJobQueue
+
+
+# =====
+class PduJobNotFoundError(OperationError):
+    def __init__(self) -> None:
+        super().__init__("PDU job is not found")
+
+
+class PduFlashIsBusyError(IsBusyError):
+    def __init__(self) -> None:
+        super().__init__("The SPI flash is being written, please try again later")
+
+
+@dataclasses.dataclass
+class PduJob:  # pylint: disable=too-many-instance-attributes
+    job_id: str
+    host: str
+    outlet: str
+    power: bool
+    state: str = "running"  # running, done, failed
+    error: str = ""
+    created_ts: float = dataclasses.field(default_factory=time.time)
+    finished_ts: float = 0.0
+    task: (asyncio.Task | None) = dataclasses.field(default=None, repr=False)
+
+    def is_finished(self) -> bool:
+        return (self.state in ["done", "failed"])
+
+    def get_state(self) -> dict:
+        return {
+            "id": self.job_id,
+            "host": self.host,
+            "outlet": self.outlet,
+            "power": self.power,
+            "state": self.state,
+            "error": self.error,
+            "created_ts": self.created_ts,
+            "finished_ts": self.finished_ts,
+        }
+
+
+class PduSwitcher:  # pylint: disable=too-many-instance-attributes
+    # The outlet is switched in the background, the job is done when the PDU reports
+    # the target state via the status command, not after the worst-case delay.
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        type: str,  # pylint: disable=redefined-builtin
+        outlet: str,
+        port: int,
+        known_hosts: str,
+        timeout: float,
+        switch_timeout: float,
+        state_poll: float,
+        gpio_pin: int,
+        history: int,
+        flasher: FlashJobQueue,
+    ) -> None:
+
+        self.__type = type
+        self.__outlet = outlet
+        self.__port = port
+        self.__known_hosts = known_hosts
+        self.__timeout = timeout
+        self.__switch_timeout = switch_timeout
+        self.__state_poll = state_poll
+        self.__gpio_pin = gpio_pin
+        self.__history = history
+        self.__flasher = flasher
+
+        self.__ids = itertools.count(1)
+        self.__jobs: dict[str, PduJob] = {}
+
+    def add_job(  # pylint: disable=too-many-arguments
+        self,
+        host: str,
+        user: str,
+        passwd: str,
+        power: bool,
+        outlet: str="",
+        pdu_type: str="",
+    ) -> PduJob:
+
+        if power and self.__flasher.is_busy():
+            raise PduFlashIsBusyError()
+        client = get_pdu_client(
+            pdu_type=(pdu_type or self.__type),
+            host=host,
+            port=self.__port,
+            user=user,
+            passwd=passwd,
+            known_hosts=self.__known_hosts,
+            timeout=self.__timeout,
+        )
+        job = PduJob(job_id=str(next(self.__ids)), host=host, outlet=(outlet or self.__outlet), power=power)
+
+        async def run_job() -> None:
+            try:
+                if power:
+                    # The flasher can't take the SPI flash until the target is powered on
+                    async with self.__flasher.get_gpio_lock():
+                        await self.__release_gpio()
+                        await client.set_outlet(job.outlet, power)
+                else:
+                    await client.set_outlet(job.outlet, power)
+                await client.wait_outlet(job.outlet, power, self.__switch_timeout, self.__state_poll)
+                job.state = "done"
+            except Exception as err:
+                get_logger(0).error("PDU job %s failed: %s", job.job_id, err)
+                job.state = "failed"
+                job.error = str(err)
+            job.finished_ts = time.time()
+
+        job.task = asyncio.create_task(run_job())
+        self.__jobs[job.job_id] = job
+        self.__cleanup_history()
+        get_logger(0).info("PDU job %s: switching %s outlet %s %s ...",
+                           job.job_id, host, job.outlet, ("on" if power else "off"))
+        return job
+
+    def get_job(self, job_id: str) -> PduJob:
+        job = self.__jobs.get(job_id)
+        if job is None:
+            raise PduJobNotFoundError()
+        return job
+
+    async def wait_job(self, job: PduJob) -> None:
+        assert job.task is not None
+        await asyncio.shield(job.task)
+        if job.state == "failed":
+            raise PduError(job.error)
+
+    async def cleanup(self) -> None:
+        tasks = [job.task for job in self.__jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_pdu_clients()
+
+    # =====
+
+    async def __release_gpio(self) -> None:
+        # The SPI flash mux line must be given back to the target before it's powered on
+        (proc, text) = await aioproc.read_process(["raspi-gpio", "set", str(self.__gpio_pin), "ip"])
+        if proc.returncode != 0:
+            raise PduError(f"Error executing GPIO command: {text.strip()}")
+
+    def __cleanup_history(self) -> None:
+        finished = [job for job in self.__jobs.values() if job.is_finished()]
+        for job in finished[:max(len(finished) - self.__history, 0)]:
+            del self.__jobs[job.job_id]
@@ -0,0 +1,241 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+import os
+import re
+import array
+import asyncio
+import dataclasses
+import datetime
+
+from typing import AsyncGenerator
+
+from ...logging import get_logger
+
+from ...inotify import InotifyMask
+from ...inotify import Inotify
+
+from ... import aiotools
+
+
+# =====
+_HEADER_RE = re.compile(r"--- (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) ---")
+
+
+# The archive is written by kvmd-webterm/logcpy.py: a directory of day segments
+# postcodes-YYYY-MM-DD.log with "YYYY-MM-DD HH:MM:SS --- <line>" records.
+_ARCHIVE_SEGMENT_RE = re.compile(r"^postcodes-(\d{4}-\d{2}-\d{2})\.log$")
+_ARCHIVE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_ARCHIVE_TIME_LEN = 19
+
+
+def parse_postcode_line(line: bytes) -> tuple[bool, str]:
+    text = line.decode("utf-8", errors="ignore").strip()
+    if _HEADER_RE.search(text):
+        return (True, "")
+    return (False, text[-4:])
+
+
+@dataclasses.dataclass
+class _Update:
+    reset: bool = False  # The file was recreated/truncated or a new boot header was found
+    codes: list[str] = dataclasses.field(default_factory=list)
+
+    def merge(self, other: "_Update") -> None:
+        if other.reset:
+            self.reset = True
+            self.codes = list(other.codes)
+        else:
+            self.codes.extend(other.codes)
+
+
+class PostcodeReader:
+    def __init__(self, log_path: str, archive_path: str) -> None:
+        self.__log_path = os.path.normpath(log_path)
+        self.__archive_path = archive_path
+
+        self.__lock = asyncio.Lock()
+        self.__file_id = (0, 0)
+        self.__offsets = array.array("Q")  # Line N (1-based) starts at self.__offsets[N - 1]
+        self.__end = 0  # End of the last complete line
+        self.__last_header = 0  # Line number of the last boot header, 0 if none
+
+        self.__pending = _Update()
+        self.__notifier = aiotools.AioNotifier()
+
+    async def get_codes(self, line: int) -> tuple[int, list[str]]:
+        # Returns the next line number and the codes from the line N and further,
+        # but only after the last boot header. Only the tail of the file is read.
+        async with self.__lock:
+            self.__push_update(await aiotools.run_async(self.__read_new_lines))
+            return (len(self.__offsets) + 1, (await aiotools.run_async(self.__read_codes, line)))
+
+    async def read_archive(
+        self,
+        since: (datetime.datetime | None),
+        until: (datetime.datetime | None),
+    ) -> list[str]:
+
+        return (await aiotools.run_async(self.__read_archive, since, until))
+
+    async def get_state(self) -> dict:
+        (line, codes) = await self.get_codes(1)
+        return {"line": line, "reset": True, "codes": codes}
+
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
+        while True:
+            await self.__notifier.wait()
+            (update, self.__pending) = (self.__pending, _Update())
+            if update.reset or update.codes:
+                yield {
+                    "line": len(self.__offsets) + 1,
+                    "reset": update.reset,
+                    "codes": update.codes,
+                }
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        dir_path = os.path.dirname(self.__log_path)
+        prev_error = ""
+        while True:
+            try:
+                with Inotify() as inotify:
+                    await inotify.watch(InotifyMask.ALL_MODIFY_EVENTS, dir_path)
+                    prev_error = ""
+                    await self.__refresh()  # Don't miss the changes made before the watching
+                    while True:
+                        event = await inotify.get_event(timeout=1)
+                        if event is None:
+                            continue
+                        if event.mask & (InotifyMask.DELETE_SELF | InotifyMask.MOVE_SELF | InotifyMask.UNMOUNT):
+                            logger.info("Got a big inotify event: %s; rewatching the post-codes log ...", event)
+                            break
+                        if event.path == self.__log_path:
+                            await self.__refresh()
+            except Exception as err:
+                if str(err) != prev_error:
+                    logger.error("Can't watch the post-codes log %s: %s", self.__log_path, err)
+                    prev_error = str(err)
+            await asyncio.sleep(1)
+
+    # =====
+
+    async def __refresh(self) -> None:
+        async with self.__lock:
+            self.__push_update(await aiotools.run_async(self.__read_new_lines))
+
+    def __push_update(self, update: _Update) -> None:
+        if update.reset or update.codes:
+            self.__pending.merge(update)
+            self.__notifier.notify()
+
+    def __read_new_lines(self) -> _Update:
+        update = _Update()
+        try:
+            st = os.stat(self.__log_path)
+        except FileNotFoundError:
+            if self.__file_id != (0, 0):
+                self.__reset((0, 0))
+                update.reset = True
+            return update
+
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self.__file_id or st.st_size < self.__end:
+            if len(self.__offsets) > 0:
+                update.reset = True
+            self.__reset(file_id)
+        if st.st_size == self.__end:
+            return update
+
+        with open(self.__log_path, "rb") as file:
+            file.seek(self.__end)
+            data = file.read(st.st_size - self.__end)
+
+        pos = 0
+        while (end := data.find(b"\n", pos)) >= 0:
+            self.__offsets.append(self.__end + pos)
+            (is_header, code) = parse_postcode_line(data[pos:end])
+            if is_header:
+                self.__last_header = len(self.__offsets)
+                update.reset = True
+                update.codes = []
+            elif code:
+                update.codes.append(code)
+            pos = end + 1
+        self.__end += pos  # The incomplete line will be read again on the next time
+        return update
+
+    def __read_codes(self, line: int) -> list[str]:
+        # Everything before the last boot header is dropped by the client anyway
+        start = max(line, self.__last_header + 1)
+        if start > len(self.__offsets):
+            return []
+        codes: list[str] = []
+        with open(self.__log_path, "rb") as file:
+            file.seek(self.__offsets[start - 1])
+            for line_data in file.read(self.__end - self.__offsets[start - 1]).splitlines():
+                (_, code) = parse_postcode_line(line_data)
+                if code:
+                    codes.append(code)
+        return codes
+
+    def __read_archive(
+        self,
+        since: (datetime.datetime | None),
+        until: (datetime.datetime | None),
+    ) -> list[str]:
+
+        since_str = (since.strftime(_ARCHIVE_TIME_FORMAT) if since else "")
+        until_str = (until.strftime(_ARCHIVE_TIME_FORMAT) if until else "")
+        segments: list[tuple[str, str]] = []
+        try:
+            names = os.listdir(self.__archive_path)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            match = _ARCHIVE_SEGMENT_RE.match(name)
+            if match:
+                day = match.group(1)
+                # Only the segments intersecting the range are opened
+                if (not since_str or day >= since_str[:10]) and (not until_str or day <= until_str[:10]):
+                    segments.append((day, name))
+
+        records: list[str] = []
+        for (_, name) in sorted(segments):
+            with open(os.path.join(self.__archive_path, name), "r", encoding="utf-8", errors="ignore") as file:
+                for record in file:
+                    record = record.strip()
+                    if not record:
+                        continue
+                    ts = record[:_ARCHIVE_TIME_LEN]
+                    if since_str and ts < since_str:
+                        continue
+                    if until_str and ts > until_str:
+                        break  # The records are appended in time order
+                    records.append(record)
+        return records
+
+    def __reset(self, file_id: tuple[int, int]) -> None:
+        self.__file_id = file_id
+        self.__offsets = array.array("Q")
+        self.__end = 0
+        self.__last_header = 0
@@ -0,0 +1,175 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import asyncio
+import collections
+import dataclasses
+import itertools
+import time
+
+from typing import Callable
+
+import serial_asyncio
+
+from ...logging import get_logger
+
+from ... import aiotools
+
+from .postcode import parse_postcode_line
+
+
+# =====
+@dataclasses.dataclass(frozen=True)
+class PostcodeRecord:
+    seq: int
+    ts: float
+    code: str
+
+
+class PostcodeCapture:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        device_path: str,
+        speed: int,
+        ring_size: int,
+        log_path: str,
+        flush_interval: float,
+        reconnect_delay: float,
+    ) -> None:
+
+        self.__device_path = device_path
+        self.__speed = speed
+        self.__log_path = log_path
+        self.__flush_interval = flush_interval
+        self.__reconnect_delay = reconnect_delay
+
+        self.__ring: collections.deque[PostcodeRecord] = collections.deque(maxlen=ring_size)
+        self.__seq = 0
+        self.__unflushed: list[bytes] = []
+
+        # The port is shared with the battery simulator link, see BatteryLink
+        self.__writer: (asyncio.StreamWriter | None) = None
+        self.__line_handlers: list[Callable[[bytes], bool]] = []
+
+    def get_device_path(self) -> str:
+        return self.__device_path
+
+    def is_online(self) -> bool:
+        return (self.__writer is not None)
+
+    def add_line_handler(self, handler: Callable[[bytes], bool]) -> None:
+        # The handler returns True if the line is consumed and isn't a post-code
+        self.__line_handlers.append(handler)
+
+    async def write(self, data: bytes) -> None:
+        assert self.__writer is not None
+        self.__writer.write(data)
+        await self.__writer.drain()
+
+    def get_seq(self) -> int:
+        return self.__seq
+
+    def get_latest(self, count: int) -> list[PostcodeRecord]:
+        records = list(itertools.islice(reversed(self.__ring), count))
+        records.reverse()
+        return records
+
+    def get_since(self, seq: int) -> list[PostcodeRecord]:
+        # The ring holds the contiguous sequence, so only the newer records are touched
+        records: list[PostcodeRecord] = []
+        for record in reversed(self.__ring):
+            if record.seq <= seq:
+                break
+            records.append(record)
+        records.reverse()
+        return records
+
+    # =====
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        flusher = asyncio.create_task(self.__flush_loop())
+        try:
+            prev_error = ""
+            while True:
+                try:
+                    (reader, writer) = await serial_asyncio.open_serial_connection(
+                        url=self.__device_path,
+                        baudrate=self.__speed,
+                    )
+                except Exception as err:
+                    if str(err) != prev_error:
+                        logger.error("Can't open post-codes port %s: %s", self.__device_path, err)
+                        prev_error = str(err)
+                    await asyncio.sleep(self.__reconnect_delay)
+                    continue
+                prev_error = ""
+
+                logger.info("Post-codes port %s is opened", self.__device_path)
+                self.__writer = writer
+                try:
+                    await self.__read_loop(reader)
+                except Exception as err:
+                    logger.error("Post-codes port %s error: %s", self.__device_path, err)
+                finally:
+                    self.__writer = None
+                    await aiotools.close_writer(writer)
+                logger.error("Post-codes port %s is closed, reconnecting ...", self.__device_path)
+                await asyncio.sleep(self.__reconnect_delay)
+        finally:
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+
+    async def cleanup(self) -> None:
+        await self.__flush()
+
+    async def __read_loop(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if any(handler(line) for handler in self.__line_handlers):
+                continue
+            self.__unflushed.append(line)
+            (is_header, code) = parse_postcode_line(line)
+            if not is_header and code:
+                self.__seq += 1
+                self.__ring.append(PostcodeRecord(self.__seq, time.time(), code))
+
+    async def __flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            try:
+                await self.__flush()
+            except Exception as err:
+                get_logger(0).error("Can't write post-codes log %s: %s", self.__log_path, err)
+
+    async def __flush(self) -> None:
+        count = len(self.__unflushed)
+        if count > 0:
+            await aiotools.run_async(self.__append_log, b"".join(self.__unflushed[:count]))
+            del self.__unflushed[:count]  # Keep the batch on errors to retry it later
+
+    def __append_log(self, data: bytes) -> None:
+        with open(self.__log_path, "ab") as file:
+            file.write(data)
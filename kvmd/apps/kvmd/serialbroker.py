@@ -0,0 +1,233 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+import re
+import asyncio
+import contextlib
+import contextvars
+import dataclasses
+import time
+
+from typing import AsyncGenerator
+
+import serial_asyncio
+
+from ...logging import get_logger
+
+from ...errors import OperationError
+
+from ... import aiotools
+
+
+# =====
+class SerialBrokerError(OperationError):
+    pass
+
+
+class SerialBrokerUnavailableError(SerialBrokerError):
+    def __init__(self) -> None:
+        super().__init__("Serial port is not available")
+
+
+# =====
+_ANSI_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+# The broker whose session is held by the current task, see SerialBroker.session()
+_session_broker: contextvars.ContextVar["SerialBroker | None"] = contextvars.ContextVar("_session_broker", default=None)
+
+
+@dataclasses.dataclass(frozen=True)
+class SerialResult:
+    response: str
+    completed: bool  # False if the prompt was not seen before the timeout
+    duration: float
+
+
+@dataclasses.dataclass(frozen=True)
+class _SerialCommand:
+    cmd: str
+    prompt: re.Pattern
+    timeout: float
+    future: asyncio.Future
+
+
+class SerialBroker:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        device_path: str,
+        speed: int,
+        prompt: str,
+        eol: str,
+        timeout: float,
+        reconnect_delay: float,
+    ) -> None:
+
+        self.__device_path = device_path
+        self.__speed = speed
+        self.__prompt = re.compile(prompt)
+        self.__eol = eol
+        self.__timeout = timeout
+        self.__reconnect_delay = reconnect_delay
+
+        self.__queue: "asyncio.Queue[_SerialCommand]" = asyncio.Queue()
+        self.__session_lock = asyncio.Lock()
+        self.__notifier = aiotools.AioNotifier()
+        self.__buf = ""
+        self.__collecting = False
+        self.__online = False
+
+    def is_online(self) -> bool:
+        return self.__online
+
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncGenerator[None, None]:
+        # Commands from the session owner (and its subtasks) go straight to the port,
+        # the other callers wait until the session is closed.
+        if _session_broker.get() is self:
+            yield
+            return
+        async with self.__session_lock:
+            token = _session_broker.set(self)
+            try:
+                yield
+            finally:
+                _session_broker.reset(token)
+
+    async def execute(self, cmd: str, prompt: str="", timeout: float=0.0) -> SerialResult:
+        async with self.session():
+            return (await self.__execute(cmd, prompt, timeout))
+
+    async def __execute(self, cmd: str, prompt: str, timeout: float) -> SerialResult:
+        if not self.__online:
+            raise SerialBrokerUnavailableError()
+        command = _SerialCommand(
+            cmd=cmd,
+            prompt=(re.compile(prompt) if prompt else self.__prompt),
+            timeout=(timeout or self.__timeout),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        await self.__queue.put(command)
+        return (await command.future)
+
+    # =====
+
+    async def systask(self) -> None:
+        logger = get_logger(0)
+        prev_error = ""
+        while True:
+            try:
+                (reader, writer) = await serial_asyncio.open_serial_connection(
+                    url=self.__device_path,
+                    baudrate=self.__speed,
+                )
+            except Exception as err:
+                if str(err) != prev_error:
+                    logger.error("Can't open serial port %s: %s", self.__device_path, err)
+                    prev_error = str(err)
+                await asyncio.sleep(self.__reconnect_delay)
+                continue
+            prev_error = ""
+
+            logger.info("Serial port %s is opened", self.__device_path)
+            self.__online = True
+            tasks = [
+                asyncio.create_task(self.__read_loop(reader)),
+                asyncio.create_task(self.__commands_loop(writer)),
+            ]
+            try:
+                await aiotools.wait_first(*tasks)
+            finally:
+                self.__online = False
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await aiotools.close_writer(writer)
+                self.__fail_pending()
+            logger.error("Serial port %s is closed, reconnecting ...", self.__device_path)
+            await asyncio.sleep(self.__reconnect_delay)
+
+    async def __read_loop(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            data = await reader.read(1024)
+            if not data:
+                return
+            if self.__collecting:
+                self.__buf += _ANSI_RE.sub("", data.decode("utf-8", errors="ignore"))
+                self.__notifier.notify()
+
+    async def __commands_loop(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            command = await self.__queue.get()
+            if command.future.done():  # Cancelled by the caller
+                continue
+            try:
+                result = await self.__run_command(writer, command)
+                if not command.future.done():
+                    command.future.set_result(result)
+            except asyncio.CancelledError:
+                if not command.future.done():
+                    command.future.set_exception(SerialBrokerUnavailableError())
+                raise
+            except Exception as err:
+                if not command.future.done():
+                    command.future.set_exception(SerialBrokerError(f"Serial error: {err}"))
+                raise
+
+    async def __run_command(self, writer: asyncio.StreamWriter, command: _SerialCommand) -> SerialResult:
+        self.__buf = ""
+        self.__collecting = True
+        try:
+            started_ts = time.monotonic()
+            deadline_ts = started_ts + command.timeout
+            writer.write((command.cmd + self.__eol).encode("utf-8"))
+            await writer.drain()
+
+            completed = False
+            while True:
+                match = command.prompt.search(self.__buf)
+                if match:
+                    completed = True
+                    response = self.__buf[:match.start()]
+                    break
+                remaining = deadline_ts - time.monotonic()
+                if remaining <= 0:
+                    response = self.__buf
+                    break
+                await self.__notifier.wait(remaining)
+
+            response = response.strip()
+            if command.cmd and response.startswith(command.cmd):  # Echo
+                response = response[len(command.cmd):].lstrip()
+            return SerialResult(
+                response=response,
+                completed=completed,
+                duration=(time.monotonic() - started_ts),
+            )
+        finally:
+            self.__collecting = False
+            self.__buf = ""
+
+    def __fail_pending(self) -> None:
+        while not self.__queue.empty():
+            command = self.__queue.get_nowait()
+            if not command.future.done():
+                command.future.set_exception(SerialBrokerUnavailableError())
@@ -21,11 +21,13 @@
 
 
 import io
-import signal
 import asyncio
 import asyncio.subprocess
+import time
+import hashlib
 import dataclasses
-import functools
+
+from collections import OrderedDict
 
 from typing import AsyncGenerator
 from typing import Any
@@ -51,32 +53,73 @@ class StreamerSnapshot:
     headers: tuple[tuple[str, str], ...]
     data: bytes
 
-    async def make_preview(self, max_width: int, max_height: int, quality: int) -> bytes:
+    def get_preview_size(self, max_width: int, max_height: int) -> tuple[int, int]:
         assert max_width >= 0
         assert max_height >= 0
-        assert quality > 0
-
         if max_width == 0 and max_height == 0:
-            max_width = self.width // 5
-            max_height = self.height // 5
-        else:
-            max_width = min((max_width or self.width), self.width)
-            max_height = min((max_height or self.height), self.height)
-
-        if (max_width, max_height) == (self.width, self.height):
-            return self.data
-        return (await aiotools.run_async(self.__inner_make_preview, max_width, max_height, quality))
-
-    @functools.lru_cache(maxsize=1)
-    def __inner_make_preview(self, max_width: int, max_height: int, quality: int) -> bytes:
+            return (self.width // 5, self.height // 5)
+        return (
+            min((max_width or self.width), self.width),
+            min((max_height or self.height), self.height),
+        )
+
+    def make_preview(self, max_width: int, max_height: int, quality: int) -> bytes:
+        assert quality > 0
         with io.BytesIO(self.data) as snapshot_bio:
             with io.BytesIO() as preview_bio:
                 with PilImage.open(snapshot_bio) as image:
+                    # JPEG DCT scaling is much cheaper than LANCZOS on the full frame,
+                    # so the decoder reduces the image first and LANCZOS finishes the rest.
+                    image.draft("RGB", (max_width, max_height))
                     image.thumbnail((max_width, max_height), PilImage.Resampling.LANCZOS)
                     image.save(preview_bio, format="jpeg", quality=quality)
                     return preview_bio.getvalue()
 
 
+class _StreamerPreviewCache:
+    def __init__(self, max_size: int) -> None:
+        self.__max_size = max_size
+
+        self.__previews: OrderedDict[tuple, bytes] = OrderedDict()
+        self.__size = 0
+        self.__tasks: dict[tuple, asyncio.Task] = {}
+
+    async def get(self, snapshot: StreamerSnapshot, max_width: int, max_height: int, quality: int) -> bytes:
+        # The hash() is truncated and can collide, the preview is keyed on the real digest of the frame
+        digest = hashlib.blake2b(snapshot.data, digest_size=16).digest()
+        key = (digest, max_width, max_height, quality)
+        preview = self.__previews.get(key)
+        if preview is not None:
+            self.__previews.move_to_end(key)
+            return preview
+
+        task = self.__tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(self.__make_preview(key, snapshot, max_width, max_height, quality))
+            self.__tasks[key] = task
+        return (await asyncio.shield(task))
+
+    async def __make_preview(
+        self,
+        key: tuple,
+        snapshot: StreamerSnapshot,
+        max_width: int,
+        max_height: int,
+        quality: int,
+    ) -> bytes:
+
+        try:
+            preview = await aiotools.run_async(snapshot.make_preview, max_width, max_height, quality)
+            if len(preview) <= self.__max_size:
+                self.__previews[key] = preview
+                self.__size += len(preview)
+                while self.__size > self.__max_size:
+                    self.__size -= len(self.__previews.popitem(last=False)[1])
+            return preview
+        finally:
+            self.__tasks.pop(key, None)
+
+
 class _StreamerParams:
     __DESIRED_FPS = "desired_fps"
 
@@ -176,11 +219,12 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
         reset_delay: float,
         shutdown_delay: float,
         state_poll: float,
-        
+
         unix_path: str,
         timeout: float,
 
         process_name_prefix: str,
+        sink: str,
 
         pre_start_cmd: list[str],
         pre_start_cmd_remove: list[str],
@@ -194,16 +238,20 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
         post_stop_cmd_remove: list[str],
         post_stop_cmd_append: list[str],
 
+        snapshot_fresh: float,
+        preview_cache_size: int,
+
         **params_kwargs: Any,
     ) -> None:
 
         self.__reset_delay = reset_delay
         self.__shutdown_delay = shutdown_delay
         self.__state_poll = state_poll
-        
+
         self.__unix_path = unix_path
         self.__timeout = timeout
         self.__process_name_prefix = process_name_prefix
+        self.__sink = sink
 
         self.__pre_start_cmd = tools.build_cmd(pre_start_cmd, pre_start_cmd_remove, pre_start_cmd_append)
         self.__cmd = tools.build_cmd(cmd, cmd_remove, cmd_append)
@@ -221,6 +269,13 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
 
         self.__snapshot: (StreamerSnapshot | None) = None
 
+        self.__snapshot_fresh = snapshot_fresh
+        self.__fresh_snapshot: (StreamerSnapshot | None) = None
+        self.__fresh_snapshot_ts = 0.0
+        self.__snapshot_task: (asyncio.Task | None) = None
+
+        self.__preview_cache = _StreamerPreviewCache(preview_cache_size)
+
         self.__notifier = aiotools.AioNotifier()
 
     # =====
@@ -299,10 +354,8 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
             session = self.__ensure_http_session()
             try:
                 async with session.get(self.__make_url("state")) as response:
-                    logger = get_logger()
                     htclient.raise_not_200(response)
                     streamer_state = (await response.json())["result"]
-                    #logger.info(streamer_state)
             except (aiohttp.ClientConnectionError, aiohttp.ServerConnectionError):
                 pass
             except Exception:
@@ -322,14 +375,10 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
             "features": self.__params.get_features(),
         }
 
-    async def poll_state(self) -> AsyncGenerator[dict, None]:
-        def signal_handler(*_: Any) -> None:
-            get_logger(0).info("Got SIGUSR2, checking the stream state ...")
-            self.__notifier.notify()
-
-        get_logger(0).info("Installing SIGUSR2 streamer handler ...")
-        asyncio.get_event_loop().add_signal_handler(signal.SIGUSR2, signal_handler)
+    def notify_state(self) -> None:
+        self.__notifier.notify()
 
+    async def poll_state(self) -> AsyncGenerator[dict, None]:
         waiter_task: (asyncio.Task | None) = None
         prev_state: dict = {}
         while True:
@@ -351,41 +400,68 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
     async def take_snapshot(self, save: bool, load: bool, allow_offline: bool) -> (StreamerSnapshot | None):
         if load:
             return self.__snapshot
-        else:
-            logger = get_logger()
-            session = self.__ensure_http_session()
-            try:
-                async with session.get(self.__make_url("snapshot")) as response:
-                    htclient.raise_not_200(response)
-                    online = (response.headers["X-UStreamer-Online"] == "true")
-                    if online or allow_offline:
-                        snapshot = StreamerSnapshot(
-                            online=online,
-                            width=int(response.headers["X-UStreamer-Width"]),
-                            height=int(response.headers["X-UStreamer-Height"]),
-                            headers=tuple(
-                                (key, value)
-                                for (key, value) in tools.sorted_kvs(dict(response.headers))
-                                if key.lower().startswith("x-ustreamer-") or key.lower() in [
-                                    "x-timestamp",
-                                    "access-control-allow-origin",
-                                    "cache-control",
-                                    "pragma",
-                                    "expires",
-                                ]
-                            ),
-                            data=bytes(await response.read()),
-                        )
-                        if save:
-                            self.__snapshot = snapshot
-                            self.__notifier.notify()
-                        return snapshot
-                    logger.error("Stream is offline, no signal or so")
-            except (aiohttp.ClientConnectionError, aiohttp.ServerConnectionError) as err:
-                logger.error("Can't connect to streamer: %s", tools.efmt(err))
-            except Exception:
-                logger.exception("Invalid streamer response from /snapshot")
-            return None
+        snapshot = await self.__get_fresh_snapshot()
+        if snapshot is not None:
+            if snapshot.online or allow_offline:
+                if save:
+                    self.__snapshot = snapshot
+                    self.__notifier.notify()
+                return snapshot
+            get_logger().error("Stream is offline, no signal or so")
+        return None
+
+    async def make_preview(self, snapshot: StreamerSnapshot, max_width: int, max_height: int, quality: int) -> bytes:
+        (max_width, max_height) = snapshot.get_preview_size(max_width, max_height)
+        if (max_width, max_height) == (snapshot.width, snapshot.height):
+            return snapshot.data
+        return (await self.__preview_cache.get(snapshot, max_width, max_height, quality))
+
+    async def __get_fresh_snapshot(self) -> (StreamerSnapshot | None):
+        # Concurrent clients share a single in-flight request to the streamer,
+        # and the result is reused by everyone within the freshness window.
+        if (
+            self.__fresh_snapshot is not None
+            and time.monotonic() - self.__fresh_snapshot_ts < self.__snapshot_fresh
+        ):
+            return self.__fresh_snapshot
+        if self.__snapshot_task is None:
+            self.__snapshot_task = asyncio.create_task(self.__fetch_snapshot())
+        return (await asyncio.shield(self.__snapshot_task))
+
+    async def __fetch_snapshot(self) -> (StreamerSnapshot | None):
+        logger = get_logger()
+        session = self.__ensure_http_session()
+        try:
+            started_ts = time.monotonic()
+            async with session.get(self.__make_url("snapshot")) as response:
+                htclient.raise_not_200(response)
+                snapshot = StreamerSnapshot(
+                    online=(response.headers["X-UStreamer-Online"] == "true"),
+                    width=int(response.headers["X-UStreamer-Width"]),
+                    height=int(response.headers["X-UStreamer-Height"]),
+                    headers=tuple(
+                        (key, value)
+                        for (key, value) in tools.sorted_kvs(dict(response.headers))
+                        if key.lower().startswith("x-ustreamer-") or key.lower() in [
+                            "x-timestamp",
+                            "access-control-allow-origin",
+                            "cache-control",
+                            "pragma",
+                            "expires",
+                        ]
+                    ),
+                    data=bytes(await response.read()),
+                )
+                self.__fresh_snapshot = snapshot
+                self.__fresh_snapshot_ts = started_ts
+                return snapshot
+        except (aiohttp.ClientConnectionError, aiohttp.ServerConnectionError) as err:
+            logger.error("Can't connect to streamer: %s", tools.efmt(err))
+        except Exception:
+            logger.exception("Invalid streamer response from /snapshot")
+        finally:
+            self.__snapshot_task = None
+        return None
 
     def remove_snapshot(self) -> None:
         self.__snapshot = None
@@ -395,6 +471,9 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
     @aiotools.atomic_fg
     async def cleanup(self) -> None:
         await self.ensure_stop(immediately=True)
+        if self.__snapshot_task:
+            self.__snapshot_task.cancel()
+            await asyncio.gather(self.__snapshot_task, return_exceptions=True)
         if self.__http_session:
             await self.__http_session.close()
             self.__http_session = None
@@ -455,9 +534,9 @@ class Streamer:  # pylint: disable=too-many-instance-attributes
     def __make_cmd(self, cmd: list[str]) -> list[str]:
         return [
             part.format(
-            
                 unix=self.__unix_path,
                 process_name_prefix=self.__process_name_prefix,
+                sink=self.__sink,
                 **self.__params.get_params(),
             )
             for part in cmd
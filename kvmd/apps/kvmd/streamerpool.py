@@ -0,0 +1,131 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+import signal
+import asyncio
+import dataclasses
+
+from typing import Callable
+from typing import Any
+
+from ...logging import get_logger
+
+from ... import aiotools
+
+from .streamer import Streamer
+from .snapshoter import Snapshoter
+
+
+# =====
+@dataclasses.dataclass(frozen=True)
+class StreamerPoolItem:
+    streamer: Streamer
+    snapshoter: Snapshoter
+    forever: bool
+
+
+@dataclasses.dataclass
+class _StreamControl:
+    notifier: aiotools.AioNotifier = dataclasses.field(default_factory=aiotools.AioNotifier)
+    reset: bool = False
+    new_params: dict = dataclasses.field(default_factory=dict)
+
+
+class StreamerPool:
+    PRIMARY_ID = "1"
+
+    def __init__(self, items: dict[str, StreamerPoolItem]) -> None:
+        assert self.PRIMARY_ID in items, items
+        self.__items = dict(sorted(items.items(), key=(lambda item: int(item[0]))))
+        self.__controls = {stream_id: _StreamControl() for stream_id in self.__items}
+
+    def get_ids(self) -> list[str]:
+        return list(self.__items)
+
+    def get_streamer(self, stream_id: str) -> Streamer:
+        return self.__items[stream_id].streamer
+
+    def get_snapshoter(self, stream_id: str) -> Snapshoter:
+        return self.__items[stream_id].snapshoter
+
+    @classmethod
+    def get_event_type(cls, stream_id: str) -> str:
+        # The primary stream keeps the plain name for the compatibility with old clients
+        return ("streamer_state" if stream_id == cls.PRIMARY_ID else f"streamer{stream_id}_state")
+
+    # =====
+
+    def set_params(self, stream_id: str, params: dict) -> None:
+        control = self.__controls[stream_id]
+        control.new_params.update(params)
+        control.notifier.notify()
+
+    def reset(self, stream_id: str) -> None:
+        control = self.__controls[stream_id]
+        control.reset = True
+        control.notifier.notify()
+
+    def notify(self) -> None:
+        for control in self.__controls.values():
+            control.notifier.notify()
+
+    # =====
+
+    async def systask(self) -> None:
+        def signal_handler(*_: Any) -> None:
+            get_logger(0).info("Got SIGUSR2, checking the streams state ...")
+            for item in self.__items.values():
+                item.streamer.notify_state()
+
+        get_logger(0).info("Installing SIGUSR2 streamer handler ...")
+        asyncio.get_event_loop().add_signal_handler(signal.SIGUSR2, signal_handler)
+        await aiotools.wait_infinite()
+
+    async def run_controller(self, stream_id: str, has_clients: Callable[[], bool]) -> None:
+        item = self.__items[stream_id]
+        control = self.__controls[stream_id]
+        prev = False
+        while True:
+            cur = (has_clients() or item.snapshoter.snapshoting() or item.forever)
+            if not prev and cur:
+                await item.streamer.ensure_start(reset=False)
+            elif prev and not cur:
+                await item.streamer.ensure_stop(immediately=False)
+
+            if control.reset or control.new_params:
+                start = item.streamer.is_working()
+                await item.streamer.ensure_stop(immediately=True)
+                if control.new_params:
+                    item.streamer.set_params(control.new_params)
+                    control.new_params = {}
+                if start:
+                    await item.streamer.ensure_start(reset=control.reset)
+                control.reset = False
+
+            prev = cur
+            await control.notifier.wait()
+
+    async def run_snapshoter(self, stream_id: str, is_live: Callable[[], bool]) -> None:
+        await self.__items[stream_id].snapshoter.run(
+            is_live=is_live,
+            notifier=self.__controls[stream_id].notifier,
+        )
@@ -0,0 +1,179 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import secrets
+import dataclasses
+
+from ...logging import get_logger
+
+from ... import aiotools
+
+
+# =====
+@dataclasses.dataclass
+class _Token:
+    user: str
+    created_ts: float
+    used_ts: float
+    raw: str = ""  # Known only for the tokens issued by this process
+
+
+class TokenStore:  # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        idle_ttl: float,
+        max_ttl: float,
+        path: str,
+        evict_interval: float=60.0,
+        flush_interval: float=5.0,
+    ) -> None:
+
+        self.__idle_ttl = idle_ttl
+        self.__max_ttl = max_ttl
+        self.__path = path
+        self.__evict_interval = evict_interval
+        self.__flush_interval = flush_interval
+
+        # Only the digests are kept as the keys, so the file doesn't contain the raw tokens
+        self.__tokens: dict[str, _Token] = {}
+        self.__by_user: dict[str, set[str]] = {}
+        self.__dirty = False
+
+        if path:
+            self.__load()
+
+    def issue(self, user: str) -> str:
+        now_ts = time.time()
+        for key in self.__by_user.get(user, set()):
+            token = self.__tokens[key]
+            if token.raw and self.__is_alive(token, now_ts):
+                return token.raw
+        raw = secrets.token_hex(32)
+        self.__add(_make_key(raw), _Token(user, now_ts, now_ts, raw))
+        return raw
+
+    def check(self, raw: str) -> (str | None):
+        key = _make_key(raw)
+        token = self.__tokens.get(key)
+        if token is None:
+            return None
+        now_ts = time.time()
+        if not self.__is_alive(token, now_ts):
+            self.__remove(key)
+            return None
+        token.used_ts = now_ts
+        if not token.raw:
+            token.raw = raw  # Restored from the file and presented by the client again
+        self.__dirty = True
+        return token.user
+
+    def remove(self, raw: str) -> str:
+        token = self.__remove(_make_key(raw))
+        return (token.user if token else "")
+
+    # =====
+
+    async def systask(self) -> None:
+        evict_ts = time.monotonic() + self.__evict_interval
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            if time.monotonic() >= evict_ts:
+                self.__evict()
+                evict_ts = time.monotonic() + self.__evict_interval
+            await self.flush()
+
+    async def flush(self) -> None:
+        if self.__path and self.__dirty:
+            self.__dirty = False
+            try:
+                await aiotools.run_async(self.__save, {
+                    key: {"user": token.user, "created_ts": token.created_ts, "used_ts": token.used_ts}
+                    for (key, token) in self.__tokens.items()
+                })
+            except Exception as err:
+                get_logger(0).error("Can't save auth tokens to %s: %s", self.__path, err)
+                self.__dirty = True
+
+    # =====
+
+    def __is_alive(self, token: _Token, now_ts: float) -> bool:
+        return (
+            (self.__idle_ttl <= 0 or now_ts - token.used_ts < self.__idle_ttl)
+            and (self.__max_ttl <= 0 or now_ts - token.created_ts < self.__max_ttl)
+        )
+
+    def __evict(self) -> None:
+        now_ts = time.time()
+        expired = [key for (key, token) in self.__tokens.items() if not self.__is_alive(token, now_ts)]
+        for key in expired:
+            self.__remove(key)
+        if expired:
+            get_logger(0).info("Evicted %d expired auth tokens", len(expired))
+
+    def __add(self, key: str, token: _Token) -> None:
+        self.__tokens[key] = token
+        self.__by_user.setdefault(token.user, set()).add(key)
+        self.__dirty = True
+
+    def __remove(self, key: str) -> (_Token | None):
+        token = self.__tokens.pop(key, None)
+        if token is not None:
+            keys = self.__by_user[token.user]
+            keys.discard(key)
+            if not keys:
+                del self.__by_user[token.user]
+            self.__dirty = True
+        return token
+
+    def __load(self) -> None:
+        logger = get_logger(0)
+        try:
+            with open(self.__path) as file:
+                tokens = json.load(file)
+            now_ts = time.time()
+            for (key, item) in tokens.items():
+                token = _Token(str(item["user"]), float(item["created_ts"]), float(item["used_ts"]))
+                if self.__is_alive(token, now_ts):
+                    self.__add(key, token)
+            self.__dirty = False
+            logger.info("Restored %d auth tokens from %s", len(self.__tokens), self.__path)
+        except FileNotFoundError:
+            pass
+        except Exception as err:
+            logger.error("Can't load auth tokens from %s, ignored: %s", self.__path, err)
+
+    def __save(self, tokens: dict) -> None:
+        tmp_path = f"{self.__path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as file:
+            json.dump(tokens, file)
+        os.rename(tmp_path, self.__path)
+
+
+def _make_key(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
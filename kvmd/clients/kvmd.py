@@ -51,28 +51,25 @@ class _AuthApiPart(_BaseApiPart):
 
 
 class _StreamerApiPart(_BaseApiPart):
-    async def get_state(self) -> dict:
-        session = self._ensure_http_session()
-        async with session.get(self._make_url("streamer")) as response:
-            htclient.raise_not_200(response)
-            return (await response.json())["result"]
+    def __init__(
+        self,
+        ensure_http_session: Callable[[], aiohttp.ClientSession],
+        make_url: Callable[[str], str],
+        stream_id: str="",
+    ) -> None:
+
+        super().__init__(ensure_http_session, make_url)
+        self.__prefix = (f"streamer/{stream_id}" if stream_id else "streamer")
 
-    async def set_params(self, quality: (int | None)=None, desired_fps: (int | None)=None) -> None:
-        await self._set_params(
-            "streamer/set_params",
-            quality=quality,
-            desired_fps=desired_fps,
-        )
-class _StreamerApiPart2(_BaseApiPart):
     async def get_state(self) -> dict:
         session = self._ensure_http_session()
-        async with session.get(self._make_url("streamer2")) as response:
+        async with session.get(self._make_url(self.__prefix)) as response:
             htclient.raise_not_200(response)
             return (await response.json())["result"]
 
     async def set_params(self, quality: (int | None)=None, desired_fps: (int | None)=None) -> None:
         await self._set_params(
-            "streamer2/set_params",
+            f"{self.__prefix}/set_params",
             quality=quality,
             desired_fps=desired_fps,
         )
@@ -207,7 +204,7 @@ class KvmdClientSession:
 
         self.auth = _AuthApiPart(*args)
         self.streamer = _StreamerApiPart(*args)
-        self.streamer2 = _StreamerApiPart2(*args)
+        self.streamer2 = _StreamerApiPart(*args, stream_id="2")
         self.hid = _HidApiPart(*args)
         self.atx = _AtxApiPart(*args)
 
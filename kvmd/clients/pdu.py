@@ -0,0 +1,336 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+
+import re
+import asyncio
+import contextlib
+import concurrent.futures
+import time
+
+from collections import OrderedDict
+
+from typing import Callable
+from typing import Generator
+from typing import Any
+
+import paramiko
+
+from ..logging import get_logger
+
+from ..errors import OperationError
+
+from .. import aiotools
+
+
+# =====
+class PduError(OperationError):
+    pass
+
+
+# =====
+_APC_ERROR_RE = re.compile(r"^E[1-9]\d\d:\s*(.*)$", re.MULTILINE)
+_APC_OUTLET_RE = re.compile(r"^\s*(\d+):[^:\n]*:\s*(On|Off)\b", re.MULTILINE | re.IGNORECASE)
+_RARITAN_OUTLET_RE = re.compile(r"^\s*Outlet\s+(\d+)", re.IGNORECASE)
+_RARITAN_STATE_RE = re.compile(r"^\s*Power state:\s*(On|Off)\b", re.IGNORECASE)
+_RARITAN_PROMPT_RE = re.compile(rb"[#>] ?$")
+
+
+class PduClient:  # pylint: disable=too-many-instance-attributes
+    # One SSH session per PDU is kept open and reused by all the requests.
+    # Paramiko is blocking, so all the I/O goes through the single thread of the client.
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        pdu_type: str,
+        host: str,
+        port: int,
+        user: str,
+        passwd: str,
+        known_hosts: str,
+        timeout: float,
+        idle_timeout: float=0.0,
+        on_expire: (Callable[["PduClient"], None] | None)=None,
+    ) -> None:
+
+        assert pdu_type in ["apc", "raritan"], pdu_type
+        self.__pdu_type = pdu_type
+        self.__host = host
+        self.__port = port
+        self.__user = user
+        self.__passwd = passwd
+        self.__known_hosts = known_hosts
+        self.__timeout = timeout
+        self.__idle_timeout = idle_timeout
+        self.__on_expire = on_expire
+
+        self.__users = 0
+        self.__closed = False
+        self.__auth_failed = False
+        self.__expire_timer: (asyncio.TimerHandle | None) = None
+        self.__schedule_expire()
+
+        self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"kvmd-pdu-{host}")
+        self.__ssh: (paramiko.SSHClient | None) = None
+        self.__shell: (paramiko.Channel | None) = None
+
+    def is_busy(self) -> bool:
+        return (self.__users > 0)
+
+    async def set_outlet(self, outlet: str, state: bool) -> None:
+        with self.__using():
+            if self.__pdu_type == "apc":
+                output = await self.__execute(f"{'olOn' if state else 'olOff'} {outlet}")
+            else:
+                output = await self.__execute(f"power outlets {outlet} {'on' if state else 'off'} /y")
+        get_logger(0).info("%s: outlet %s is switched %s: %s", self, outlet, ("on" if state else "off"), output.strip())
+
+    async def get_outlets(self) -> dict[str, bool]:
+        with self.__using():
+            if self.__pdu_type == "apc":
+                return _parse_apc_outlets(await self.__execute("olStatus all"))
+            return _parse_raritan_outlets(await self.__execute("show outlets"))
+
+    async def wait_outlet(self, outlet: str, state: bool, timeout: float, interval: float) -> None:
+        # The switching is finished when the PDU reports it, the delay of Raritan may be long
+        with self.__using():
+            deadline_ts = time.monotonic() + timeout
+            while True:
+                outlets = await self.get_outlets()
+                if outlet not in outlets:
+                    raise PduError(f"PDU outlet {outlet} is not found")
+                if outlets[outlet] == state:
+                    return
+                if time.monotonic() >= deadline_ts:
+                    raise PduError(f"PDU outlet {outlet} is not switched {'on' if state else 'off'} in {timeout} seconds")
+                await asyncio.sleep(interval)
+
+    async def close(self) -> None:
+        self.__cancel_expire()
+        if self.__closed:
+            return
+        self.__closed = True
+        await self.__run(self.__close)
+        self.__executor.shutdown(wait=False)
+
+    # =====
+
+    @contextlib.contextmanager
+    def __using(self) -> Generator[None, None, None]:
+        # The client is expired when it's not used for a while or the credentials are wrong,
+        # the pool closes it to release the thread and the SSH session.
+        self.__cancel_expire()
+        self.__users += 1
+        try:
+            yield
+        finally:
+            self.__users -= 1
+            if self.__users == 0:
+                if self.__auth_failed and self.__on_expire is not None:
+                    self.__on_expire(self)
+                else:
+                    self.__schedule_expire()
+
+    def __schedule_expire(self) -> None:
+        if self.__on_expire is not None and self.__idle_timeout > 0:
+            self.__expire_timer = asyncio.get_running_loop().call_later(self.__idle_timeout, self.__on_expire, self)
+
+    def __cancel_expire(self) -> None:
+        if self.__expire_timer is not None:
+            self.__expire_timer.cancel()
+            self.__expire_timer = None
+
+    # =====
+
+    async def __execute(self, cmd: str) -> str:
+        try:
+            return (await self.__run(self.__execute_sync, cmd))
+        except paramiko.AuthenticationException:
+            self.__auth_failed = True
+            raise PduError(f"Authentication failed on PDU {self.__host}, please check your credentials")
+        except PduError:
+            raise
+        except Exception as err:
+            raise PduError(f"PDU {self.__host} error: {err}")
+
+    async def __run(self, func: Callable, *args: Any) -> Any:
+        return (await asyncio.get_running_loop().run_in_executor(self.__executor, func, *args))
+
+    def __execute_sync(self, cmd: str) -> str:
+        # The saved session may be dropped by the PDU at any time, so retry it once with the new one
+        for attempt in range(2):
+            try:
+                ssh = self.__ensure_ssh()
+                if self.__pdu_type == "apc":
+                    output = self.__exec_apc(ssh, cmd)
+                else:
+                    output = self.__exec_raritan(ssh, cmd)
+            except paramiko.AuthenticationException:
+                self.__close()
+                raise
+            except (paramiko.SSHException, OSError, EOFError):
+                self.__close()
+                if attempt > 0:
+                    raise
+                continue
+            match = _APC_ERROR_RE.search(output)
+            if match:
+                raise PduError(f"PDU {self.__host} error: {match.group(1).strip()}")
+            return output
+        raise RuntimeError("Unreachable")
+
+    def __ensure_ssh(self) -> paramiko.SSHClient:
+        if self.__ssh is not None:
+            transport = self.__ssh.get_transport()
+            if transport is not None and transport.is_active():
+                return self.__ssh
+            self.__close()
+        ssh = paramiko.SSHClient()
+        if self.__known_hosts:
+            ssh.load_host_keys(self.__known_hosts)
+            ssh.set_missing_host_key_policy(paramiko.RejectPolicy())
+        else:
+            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        ssh.connect(
+            hostname=self.__host,
+            port=self.__port,
+            username=self.__user,
+            password=self.__passwd,
+            timeout=self.__timeout,
+            banner_timeout=self.__timeout,
+            auth_timeout=self.__timeout,
+            look_for_keys=False,
+            allow_agent=False,
+        )
+        ssh.get_transport().set_keepalive(30)  # type: ignore
+        get_logger(0).info("%s: SSH session is opened", self)
+        self.__ssh = ssh
+        return ssh
+
+    def __exec_apc(self, ssh: paramiko.SSHClient, cmd: str) -> str:
+        (_, stdout, _) = ssh.exec_command(cmd, timeout=self.__timeout)
+        return stdout.read().decode("utf-8", errors="ignore")
+
+    def __exec_raritan(self, ssh: paramiko.SSHClient, cmd: str) -> str:
+        if self.__shell is None or self.__shell.closed:
+            self.__shell = ssh.invoke_shell()
+            self.__shell.settimeout(self.__timeout)
+            self.__read_prompt(self.__shell)
+        self.__shell.send(f"{cmd}\n".encode())
+        output = self.__read_prompt(self.__shell)
+        return output.split("\n", 1)[-1]  # Echo
+
+    def __read_prompt(self, shell: paramiko.Channel) -> str:
+        deadline_ts = time.monotonic() + self.__timeout
+        data = b""
+        while not _RARITAN_PROMPT_RE.search(data):
+            if time.monotonic() >= deadline_ts:
+                raise PduError(f"No CLI prompt from PDU {self.__host}")
+            chunk = shell.recv(4096)
+            if not chunk:
+                raise EOFError("The PDU shell is closed")
+            data += chunk
+        return data.decode("utf-8", errors="ignore").replace("\r", "")
+
+    def __close(self) -> None:
+        if self.__shell is not None:
+            self.__shell.close()
+            self.__shell = None
+        if self.__ssh is not None:
+            self.__ssh.close()
+            self.__ssh = None
+            get_logger(0).info("%s: SSH session is closed", self)
+
+    def __str__(self) -> str:
+        return f"PDU({self.__pdu_type}, {self.__host}:{self.__port})"
+
+    __repr__ = __str__
+
+
+def _parse_apc_outlets(output: str) -> dict[str, bool]:
+    return {
+        outlet: (state.lower() == "on")
+        for (outlet, state) in _APC_OUTLET_RE.findall(output)
+    }
+
+
+def _parse_raritan_outlets(output: str) -> dict[str, bool]:
+    outlets: dict[str, bool] = {}
+    outlet = ""
+    for line in output.splitlines():
+        match = _RARITAN_OUTLET_RE.match(line)
+        if match:
+            outlet = match.group(1)
+        elif outlet and (match := _RARITAN_STATE_RE.match(line)):
+            outlets[outlet] = (match.group(1).lower() == "on")
+    return outlets
+
+
+# =====
+_MAX_CLIENTS = 8
+_IDLE_TIMEOUT = 300.0
+
+_clients: OrderedDict[tuple, PduClient] = OrderedDict()  # The least recently used first
+
+
+def get_pdu_client(  # pylint: disable=too-many-arguments
+    pdu_type: str,
+    host: str,
+    port: int,
+    user: str,
+    passwd: str,
+    known_hosts: str,
+    timeout: float,
+) -> PduClient:
+
+    # The key comes from the request, so the pool is bounded and the failed or idle clients are closed
+    key = (pdu_type, host, port, user, passwd, known_hosts)
+    client = _clients.get(key)
+    if client is None:
+        client = _clients[key] = PduClient(
+            pdu_type, host, port, user, passwd, known_hosts, timeout,
+            idle_timeout=_IDLE_TIMEOUT,
+            on_expire=_expire_pdu_client,
+        )
+        for (old_key, old_client) in list(_clients.items()):
+            if len(_clients) <= _MAX_CLIENTS:
+                break
+            if old_client is not client and not old_client.is_busy():
+                del _clients[old_key]
+                aiotools.create_short_task(old_client.close())
+    else:
+        _clients.move_to_end(key)
+    return client
+
+
+def _expire_pdu_client(client: PduClient) -> None:
+    for (key, pooled) in list(_clients.items()):
+        if pooled is client:
+            del _clients[key]
+    aiotools.create_short_task(client.close())
+
+
+async def close_pdu_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*[client.close() for client in clients], return_exceptions=True)
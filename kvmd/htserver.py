@@ -25,9 +25,12 @@ import socket
 import asyncio
 import contextlib
 import dataclasses
+import collections
+import itertools
+import time
 import inspect
+import contextvars
 import urllib.parse
-import json
 
 from typing import Callable
 from typing import AsyncGenerator
@@ -40,6 +43,7 @@ from aiohttp.web import Response
 from aiohttp.web import StreamResponse
 from aiohttp.web import WebSocketResponse
 from aiohttp.web import WSMsgType
+from aiohttp import WSCloseCode
 from aiohttp.web import Application
 from aiohttp.web import AccessLogger
 from aiohttp.web import run_app
@@ -51,8 +55,10 @@ from .errors import OperationError
 from .errors import IsBusyError
 
 from .validators import ValidatorError
+from .validators.basic import valid_bool
 
 from . import aiotools
+from . import jsonenc
 
 
 # =====
@@ -150,6 +156,9 @@ def _get_exposed_ws(obj: object) -> list[WsExposed]:
 
 
 # =====
+_json_pretty: contextvars.ContextVar[bool] = contextvars.ContextVar("_json_pretty", default=False)
+
+
 def make_json_response(
     result: (dict | None)=None,
     status: int=200,
@@ -158,12 +167,13 @@ def make_json_response(
 ) -> Response:
 
     response = Response(
-        text=json.dumps(({
+        body=jsonenc.encode(({
             "ok": (status == 200),
             "result": (result or {}),
-        } if wrap_result else result), sort_keys=True, indent=4),
+        } if wrap_result else result), _json_pretty.get()),
         status=status,
         content_type="application/json",
+        charset="utf-8",
     )
     if set_cookies:
         for (key, value) in set_cookies.items():
@@ -204,10 +214,10 @@ async def start_streaming(
 
 
 async def stream_json(response: StreamResponse, result: dict, ok: bool=True) -> None:
-    await response.write(json.dumps({
+    await response.write(jsonenc.encode({
         "ok": ok,
         "result": result,
-    }).encode("utf-8") + b"\r\n")
+    }) + b"\r\n")
 
 
 async def stream_json_exception(response: StreamResponse, err: Exception) -> None:
@@ -226,14 +236,39 @@ async def send_ws_event(
     event: (dict | None),
 ) -> None:
 
-    await wsr.send_str(json.dumps({
+    await wsr.send_str(make_ws_event(event_type, event))
+
+
+def make_ws_event(event_type: str, event: (dict | None)) -> str:
+    return jsonenc.encode_str({
         "event_type": event_type,
         "event": event,
-    }))
+    })
+
+
+def make_ws_state_patch(prev: dict, state: dict) -> tuple[dict, list[list[str]]]:
+    # A merge-patch style delta: the nested dicts are merged, the other values are replaced.
+    # The null is a value here, so the removed keys are listed as the paths separately.
+    patch: dict = {}
+    removed: list[list[str]] = []
+    for (key, value) in state.items():
+        if key not in prev:
+            patch[key] = value
+        else:
+            prev_value = prev[key]
+            if isinstance(value, dict) and isinstance(prev_value, dict):
+                (sub_patch, sub_removed) = make_ws_state_patch(prev_value, value)
+                if sub_patch:
+                    patch[key] = sub_patch
+                removed.extend([key, *path] for path in sub_removed)
+            elif value != prev_value or type(value) is not type(prev_value):
+                patch[key] = value
+    removed.extend([key] for key in prev if key not in state)
+    return (patch, removed)
 
 
 def parse_ws_event(msg: str) -> tuple[str, dict]:
-    data = json.loads(msg)
+    data = jsonenc.decode(msg)
     if not isinstance(data, dict):
         raise RuntimeError("Top-level event structure is not a dict")
     event_type = data.get("event_type")
@@ -261,36 +296,85 @@ def set_request_auth_info(request: BaseRequest, info: str) -> None:
 
 
 # =====
+class _WsOutbox:
+    # The frames are sent by the session sender, so a slow client doesn't hold up the others.
+    # The broadcasted full states are coalesced by the event type, the client needs only the latest one.
+    # The incremental events are queued as is, the client that can't take them is dropped by the sender.
+
+    def __init__(self) -> None:
+        self.__frames: collections.OrderedDict[(str | int), tuple[float, str]] = collections.OrderedDict()
+        self.__ids = itertools.count()
+        self.__notifier = aiotools.AioNotifier()
+        self.coalesced = 0
+
+    def put(self, text: str, state_type: str="", get_coalesced: (Callable[[], str] | None)=None) -> None:
+        # The delta can't replace the unsent one, so get_coalesced() returns the full state for that
+        key: (str | int) = (state_type or next(self.__ids))
+        ts = time.monotonic()
+        if state_type and state_type in self.__frames:
+            ts = self.__frames.pop(state_type)[0]  # The lag is counted from the oldest unsent state
+            if get_coalesced is not None:
+                text = get_coalesced()
+            self.coalesced += 1
+        self.__frames[key] = (ts, text)
+        self.__notifier.notify()
+
+    def get_depth(self) -> int:
+        return len(self.__frames)
+
+    def get_lag(self) -> float:
+        if self.__frames:
+            return (time.monotonic() - next(iter(self.__frames.values()))[0])
+        return 0.0
+
+    async def get(self) -> tuple[float, str]:
+        while not self.__frames:
+            await self.__notifier.wait()
+        return self.__frames.popitem(last=False)[1]
+
+
 @dataclasses.dataclass(frozen=True)
 class WsSession:
     wsr: WebSocketResponse
     kwargs: dict[str, Any]
+    deltas: bool = False
+    outbox: _WsOutbox = dataclasses.field(default_factory=_WsOutbox, compare=False)
+    synced: set[str] = dataclasses.field(default_factory=set, compare=False)  # Got the full state for the deltas
 
     def __str__(self) -> str:
         return f"WsSession(id={id(self)}, {self.kwargs})"
 
     async def send_event(self, event_type: str, event: (dict | None)) -> None:
-        await send_ws_event(self.wsr, event_type, event)
+        self.outbox.put(make_ws_event(event_type, event))
 
 
 class HttpServer:
     def __init__(self) -> None:
+        self.__http_exposed: list[HttpExposed] = []
         self.__ws_heartbeat: (float | None) = None
         self.__ws_handlers: dict[str, Callable] = {}
         self.__ws_bin_handlers: dict[int, Callable] = {}
         self.__ws_sessions: list[WsSession] = []
         self.__ws_sessions_lock = asyncio.Lock()
+        self.__ws_queue = 0
+        self.__ws_lag = 0.0
+        self.__ws_dropped = 0
+        self.__ws_states: dict[str, tuple[int, (dict | None)]] = {}  # Seq and the last broadcasted event
 
-    def run(
+    def run(  # pylint: disable=too-many-arguments
         self,
         unix_path: str,
         unix_rm: bool,
         unix_mode: int,
         heartbeat: float,
+        ws_queue: int,
+        ws_lag: float,
         access_log_format: str,
     ) -> None:
 
         self.__ws_heartbeat = heartbeat
+        self.__ws_queue = ws_queue
+        self.__ws_lag = ws_lag
 
         if unix_rm and os.path.exists(unix_path):
             os.remove(unix_path)
@@ -317,9 +401,13 @@ class HttpServer:
             for ws_exposed in _get_exposed_ws(obj):
                 self.__add_exposed_ws(ws_exposed)
 
+    def _get_exposed_http(self) -> list[HttpExposed]:
+        return list(self.__http_exposed)
+
     def __add_exposed_http(self, exposed: HttpExposed) -> None:
         async def wrapper(request: Request) -> Response:
             try:
+                _json_pretty.set(valid_bool(request.query.get("pretty", False)))
                 await self._check_request_auth(exposed, request)
                 return (await exposed.handler(request))
             except IsBusyError as err:
@@ -329,6 +417,7 @@ class HttpServer:
             except HttpError as err:
                 return make_json_exception(err)
         self.__app.router.add_route(exposed.method, exposed.path, wrapper)
+        self.__http_exposed.append(exposed)
 
     def __add_exposed_ws(self, exposed: WsExposed) -> None:
         if exposed.binary:
@@ -342,7 +431,7 @@ class HttpServer:
     # =====
 
     @contextlib.asynccontextmanager
-    async def _ws_session(self, request: Request, **kwargs: Any) -> AsyncGenerator[WsSession, None]:
+    async def _ws_session(self, request: Request, deltas: bool=False, **kwargs: Any) -> AsyncGenerator[WsSession, None]:
         assert self.__ws_heartbeat is not None
    #     wsr = WebSocketResponse(heartbeat=self.__ws_heartbeat)
     #    await wsr.prepare(request)
@@ -351,16 +440,38 @@ class HttpServer:
         async with self.__ws_sessions_lock:
             wsr = WebSocketResponse(heartbeat=self.__ws_heartbeat)
             await wsr.prepare(request)
-            ws = WsSession(wsr, kwargs)
+            ws = WsSession(wsr, kwargs, deltas)
             self.__ws_sessions.append(ws)
             get_logger(2).info("Registered new client session: %s; clients now: %d", ws, len(self.__ws_sessions))
 
+        sender = asyncio.create_task(self.__ws_sender(ws))
         try:
             await self._on_ws_opened()
             yield ws
         finally:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
             await aiotools.shield_fg(self.__close_ws(ws))
 
+    async def __ws_sender(self, ws: WsSession) -> None:
+        logger = get_logger(0)
+        while True:
+            (ts, text) = await ws.outbox.get()
+            try:
+                # The client that can't take the events within the lag budget is dropped
+                await asyncio.wait_for(ws.wsr.send_str(text), timeout=max(ts + self.__ws_lag - time.monotonic(), 0.1))
+                overflow = (ws.outbox.get_depth() > self.__ws_queue or ws.outbox.get_lag() > self.__ws_lag)
+            except asyncio.TimeoutError:
+                overflow = True
+            except Exception:
+                return  # Closed by the client, the session is removed by the ws loop
+            if overflow:
+                self.__ws_dropped += 1
+                logger.error("Client session %s is lagging for too long, dropping it (queue=%d, lag=%.1f)",
+                             ws, ws.outbox.get_depth(), ws.outbox.get_lag())
+                await ws.wsr.close(code=WSCloseCode.TRY_AGAIN_LATER, message=b"Lagging client")
+                return
+
     async def _ws_loop(self, ws: WsSession) -> WebSocketResponse:
         logger = get_logger()
         async for msg in ws.wsr:
@@ -387,17 +498,59 @@ class HttpServer:
                 break
         return ws.wsr
 
-    async def _broadcast_ws_event(self, event_type: str, event: (dict | None)) -> None:
-        if self.__ws_sessions:
-            await asyncio.gather(*[
-                ws.send_event(event_type, event)
-                for ws in self.__ws_sessions
-                if (
-                    not ws.wsr.closed
-                    and ws.wsr._req is not None  # pylint: disable=protected-access
-                    and ws.wsr._req.transport is not None  # pylint: disable=protected-access
-                )
-            ], return_exceptions=True)
+    async def _broadcast_ws_event(self, event_type: str, event: (dict | None), incremental: bool=False) -> None:
+        # The frames are encoded once for all the clients and only if someone needs them.
+        # The delta sessions get the full state with the seq first, and then the patches
+        # against the previous event of the same type.
+        # The incremental events carry only the new data, so they can't replace each other
+        # and can't be patched against the previous one. They are always sent as is.
+        coalesce_type = ("" if incremental else event_type)
+        (seq, prev) = self.__ws_states.get(event_type, (0, None))
+        seq += 1
+        self.__ws_states[event_type] = (seq, event)
+        frames: dict[str, str] = {}
+
+        def get_frame(kind: str) -> str:
+            if kind not in frames:
+                if kind == "full":
+                    frames[kind] = make_ws_event(event_type, event)
+                elif kind == "full_seq":
+                    frames[kind] = jsonenc.encode_str({"event_type": event_type, "event": event, "seq": seq})
+                else:
+                    assert isinstance(prev, dict) and isinstance(event, dict)
+                    (patch, removed) = make_ws_state_patch(prev, event)
+                    frames[kind] = jsonenc.encode_str({
+                        "event_type": event_type,
+                        "event": patch,
+                        "seq": seq,
+                        "delta": True,
+                        **({"removed": removed} if removed else {}),
+                    })
+            return frames[kind]
+
+        for ws in self.__ws_sessions:
+            if (
+                not ws.wsr.closed
+                and ws.wsr._req is not None  # pylint: disable=protected-access
+                and ws.wsr._req.transport is not None  # pylint: disable=protected-access
+            ):
+                if incremental or not ws.deltas:
+                    ws.outbox.put(get_frame("full"), coalesce_type)
+                elif event_type in ws.synced and isinstance(prev, dict) and isinstance(event, dict):
+                    ws.outbox.put(get_frame("delta"), coalesce_type, (lambda: get_frame("full_seq")))
+                else:
+                    ws.outbox.put(get_frame("full_seq"), coalesce_type)
+                    ws.synced.add(event_type)
+
+    def _get_ws_stats(self) -> dict:
+        depths = [ws.outbox.get_depth() for ws in self.__ws_sessions]
+        return {
+            "clients": len(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_total": sum(depths),
+            "coalesced": sum(ws.outbox.coalesced for ws in self.__ws_sessions),
+            "dropped": self.__ws_dropped,
+        }
 
     async def _close_all_wss(self) -> bool:
         wss = self._get_wss()
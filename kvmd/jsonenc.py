@@ -0,0 +1,63 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+
+import json
+
+from typing import Any
+
+try:
+    import orjson
+    _ORJSON_COMPACT = orjson.OPT_NON_STR_KEYS
+    _ORJSON_PRETTY = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+except ImportError:
+    orjson = None  # pylint: disable=invalid-name
+
+
+# =====
+def get_backend() -> str:
+    return ("orjson" if orjson is not None else "json")
+
+
+def encode(obj: Any, pretty: bool=False) -> bytes:
+    # Compact by default, the pretty output is for humans only
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=(_ORJSON_PRETTY if pretty else _ORJSON_COMPACT))
+        except TypeError:
+            pass  # Big integers and the other rare things that orjson can't handle
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, sort_keys=True, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_str(obj: Any) -> str:
+    if orjson is not None:
+        return encode(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(data: (str | bytes)) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -29,6 +29,12 @@ class BaseAuthService(BasePlugin):
     async def authorize(self, user: str, passwd: str) -> bool:
         raise NotImplementedError  # pragma: nocover
 
+    def get_watchable_paths(self) -> list[str]:
+        return []
+
+    async def reload(self) -> None:
+        pass
+
     async def cleanup(self) -> None:
         pass
 
@@ -26,6 +26,8 @@ from ...yamlconf import Option
 
 from ...validators.os import valid_abs_file
 
+from ... import aiotools
+
 from . import BaseAuthService
 
 
@@ -33,6 +35,7 @@ from . import BaseAuthService
 class Plugin(BaseAuthService):
     def __init__(self, path: str) -> None:  # pylint: disable=super-init-not-called
         self.__path = path
+        self.__htpasswd = passlib.apache.HtpasswdFile(path)
 
     @classmethod
     def get_plugin_options(cls) -> dict:
@@ -40,8 +43,13 @@ class Plugin(BaseAuthService):
             "file": Option("/etc/kvmd/htpasswd", type=valid_abs_file, unpack_as="path"),
         }
 
+    def get_watchable_paths(self) -> list[str]:
+        return [self.__path]
+
+    async def reload(self) -> None:
+        self.__htpasswd = await aiotools.run_async(passlib.apache.HtpasswdFile, self.__path)
+
     async def authorize(self, user: str, passwd: str) -> bool:
         assert user == user.strip()
         assert user
-        htpasswd = passlib.apache.HtpasswdFile(self.__path)
-        return htpasswd.check_password(user, passwd)
+        return self.__htpasswd.check_password(user, passwd)
@@ -0,0 +1,160 @@
+# ========================================================================== #
+#                                                                            #
+#    KVMD - The main PiKVM daemon.                                           #
+#                                                                            #
+#    Copyright (C) 2018-2023  Maxim Devaev <mdevaev@gmail.com>               #
+#                                                                            #
+#    This program is free software: you can redistribute it and/or modify    #
+#    it under the terms of the GNU General Public License as published by    #
+#    the Free Software Foundation, either version 3 of the License, or       #
+#    (at your option) any later version.                                     #
+#                                                                            #
+#    This program is distributed in the hope that it will be useful,         #
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of          #
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the           #
+#    GNU General Public License for more details.                            #
+#                                                                            #
+#    You should have received a copy of the GNU General Public License       #
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.  #
+#                                                                            #
+# ========================================================================== #
+
+
+
+
+import asyncio
+import functools
+
+from typing import Callable
+from typing import Any
+
+from ...logging import get_logger
+
+from ... import tools
+from ... import aiotools
+
+from ...yamlconf import Option
+
+from ...validators.basic import valid_number
+from ...validators.basic import valid_float_f01
+from ...validators.net import valid_ip_or_host
+from ...validators.net import valid_port
+from ...validators.os import valid_abs_path
+from ...validators.kvm import valid_pdu_type
+
+from ...clients.pdu import PduClient
+from ...clients.pdu import get_pdu_client
+
+from . import BaseUserGpioDriver
+from . import GpioDriverOfflineError
+
+
+# =====
+class Plugin(BaseUserGpioDriver):  # pylint: disable=too-many-instance-attributes
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        instance_name: str,
+        notifier: aiotools.AioNotifier,
+
+        type: str,  # pylint: disable=redefined-builtin
+        host: str,
+        port: int,
+        user: str,
+        passwd: str,
+        known_hosts: str,
+        state_poll: float,
+        timeout: float,
+    ) -> None:
+
+        super().__init__(instance_name, notifier)
+
+        self.__type = type
+        self.__host = host
+        self.__port = port
+        self.__user = user
+        self.__passwd = passwd
+        self.__known_hosts = known_hosts
+        self.__state_poll = state_poll
+        self.__timeout = timeout
+
+        self.__initial: dict[str, (bool | None)] = {}
+
+        self.__state: dict[str, (bool | None)] = {}
+        self.__update_notifier = aiotools.AioNotifier()
+
+    @classmethod
+    def get_plugin_options(cls) -> dict[str, Option]:
+        return {
+            "type":        Option("apc", type=valid_pdu_type),
+            "host":        Option("",    type=valid_ip_or_host),
+            "port":        Option(22,    type=valid_port),
+            "user":        Option(""),
+            "passwd":      Option(""),
+            "known_hosts": Option("",    type=valid_abs_path, if_empty=""),
+            "state_poll":  Option(5.0,   type=valid_float_f01),
+            "timeout":     Option(10.0,  type=valid_float_f01),
+        }
+
+    @classmethod
+    def get_pin_validator(cls) -> Callable[[Any], Any]:
+        return functools.partial(valid_number, min=1, max=255, name="PDU outlet")
+
+    def register_input(self, pin: str, debounce: float) -> None:
+        _ = debounce
+        self.__state[pin] = None
+
+    def register_output(self, pin: str, initial: (bool | None)) -> None:
+        self.__initial[pin] = initial
+        self.__state[pin] = None
+
+    def prepare(self) -> None:
+        async def inner_prepare() -> None:
+            await asyncio.gather(*[
+                self.write(pin, state)
+                for (pin, state) in self.__initial.items()
+                if state is not None
+            ], return_exceptions=True)
+        aiotools.run_sync(inner_prepare())
+
+    async def run(self) -> None:
+        prev_state: (dict | None) = None
+        while True:
+            try:
+                outlets = await self.__get_client().get_outlets()
+                self.__state = {pin: outlets.get(pin) for pin in self.__state}
+            except Exception as err:
+                get_logger().error("Failed PDU outlets status request: %s", tools.efmt(err))
+                self.__state = dict.fromkeys(self.__state, None)
+            if self.__state != prev_state:
+                self._notifier.notify()
+                prev_state = self.__state
+            await self.__update_notifier.wait(self.__state_poll)
+
+    async def read(self, pin: str) -> bool:
+        if self.__state[pin] is None:
+            raise GpioDriverOfflineError(self)
+        return self.__state[pin]  # type: ignore
+
+    async def write(self, pin: str, state: bool) -> None:
+        try:
+            await self.__get_client().set_outlet(pin, state)
+        except Exception as err:
+            get_logger().error("Failed PDU request to outlet %s: %s", pin, tools.efmt(err))
+            raise GpioDriverOfflineError(self)
+        self.__update_notifier.notify()
+
+    def __get_client(self) -> PduClient:
+        return get_pdu_client(
+            pdu_type=self.__type,
+            host=self.__host,
+            port=self.__port,
+            user=self.__user,
+            passwd=self.__passwd,
+            known_hosts=self.__known_hosts,
+            timeout=self.__timeout,
+        )
+
+    def __str__(self) -> str:
+        return f"PDU({self._instance_name})"
+
+    __repr__ = __str__
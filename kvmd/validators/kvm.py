@@ -20,10 +20,14 @@
 # ========================================================================== #
 
 
+import re
+import datetime
+
 from typing import Any
 
 from . import raise_error
 from . import check_string_in_list
+from . import check_re_match
 
 from .basic import valid_stripped_string_not_empty
 from .basic import valid_number
@@ -63,6 +67,30 @@ def valid_log_seek(arg: Any) -> int:
     return int(valid_number(arg, min=0, name="log seek"))
 
 
+def valid_stream_id(arg: Any) -> str:
+    return check_re_match(arg, "stream id", r"^[1-9][0-9]{0,2}$")
+
+
+def valid_ocr_regex(arg: Any) -> re.Pattern:
+    name = "OCR regex"
+    arg = valid_stripped_string_not_empty(arg, name)
+    try:
+        return re.compile(arg)
+    except re.error:
+        raise_error(arg, name)
+
+
+def valid_serial_prompt(arg: Any) -> str:
+    # Empty for the default prompt of the serial broker
+    name = "serial prompt regex"
+    arg = ("" if arg is None else str(arg))
+    try:
+        re.compile(arg)
+    except re.error:
+        raise_error(arg, name)
+    return arg
+
+
 def valid_stream_quality(arg: Any) -> int:
     return int(valid_number(arg, min=1, max=100, name="stream quality"))
 
@@ -88,3 +116,20 @@ def valid_stream_h264_bitrate(arg: Any) -> int:
 
 def valid_stream_h264_gop(arg: Any) -> int:
     return int(valid_number(arg, min=0, max=60, name="stream H264 GOP"))
+
+
+def valid_postcode_time(arg: Any) -> datetime.datetime:
+    name = "post-codes time"
+    arg = valid_stripped_string_not_empty(arg, name)
+    try:
+        return datetime.datetime.fromisoformat(arg)
+    except ValueError:
+        raise_error(arg, name)
+
+
+def valid_pdu_type(arg: Any) -> str:
+    return check_string_in_list(arg, "PDU type", ["apc", "raritan"])
+
+
+def valid_pdu_outlet(arg: Any) -> str:
+    return str(int(valid_number(arg, min=1, max=255, name="PDU outlet")))
@@ -421,7 +421,10 @@ export function Session() {
 			case "hid_state": __hid.setState(data.event);__hid2.setState(data.event);__hid3.setState(data.event);__hid4.setState(data.event); break;
 			case "atx_state": __atx.setState(data.event); __atx2.setState(data.event);__atx4.setState(data.event);break;
 			case "msd_state": __msd.setState(data.event); __msd2.setState(data.event); __msd4.setState(data.event); break;
-			case "streamer_state": __streamer.setState(data.event);console.log(data.event);__streamer2.setState(data.event);console.log(data.event);__streamer3.setState(data.event); __streamer4.setState(data.event); break;
+			case "streamer_state": __streamer.setState(data.event); break;
+			case "streamer2_state": __streamer2.setState(data.event); break;
+			case "streamer3_state": __streamer3.setState(data.event); break;
+			case "streamer4_state": __streamer4.setState(data.event); break;
 		        
 			case "streamer_ocr_state": __ocr.setState(data.event); break;
 		}
@@ -904,7 +904,7 @@ var __flashifwi2 = function () {
                         let query = `ifwi_file=${ifwi_file}`;
 
                         // Use the updated makeRequest function with the query string
-                        tools.makeRequest("GET", `/api/flash_ifwi?${query}`, function () {
+                        tools.makeRequest("POST", `/api/flash_ifwi?${query}`, function () {
                                 if (this.readyState === 4) {
                                         if (this.status !== 200) {
                                                 wm.error("Click error:<br>", this.responseText);
@@ -924,7 +924,7 @@ var __flashifwi4 = function () {
                         let query = `ifwi_file=${ifwi_file}`;
 
                         // Use the updated makeRequest function with the query string
-                        tools.makeRequest("GET", `/api/flash_ifwi?${query}`, function () {
+                        tools.makeRequest("POST", `/api/flash_ifwi?${query}`, function () {
                                 if (this.readyState === 4) {
                                         if (this.status !== 200) {
                                                 wm.error("Click error:<br>", this.responseText);
@@ -945,7 +945,7 @@ var __flashifwi4 = function () {
             let query = `ifwi_file=${ifwi_file}`;
 
             // Use the updated makeRequest function with the query string
-            tools.makeRequest("GET", `/api/flash_ifwi?${query}`, function () {
+            tools.makeRequest("POST", `/api/flash_ifwi?${query}`, function () {
                 if (this.readyState === 4) {
                     if (this.status !== 200) {
                         wm.error("Click error:<br>", this.responseText);